@@ -4,7 +4,7 @@ import { useEffect, useState } from 'react'
 import { useRouter } from 'next/navigation'
 import Link from 'next/link'
 import { FiPackage, FiPrinter, FiCopy, FiDollarSign, FiShoppingBag, FiImage, FiLogOut, FiMenu, FiX, FiHome, FiTrendingUp, FiClock, FiCheckCircle, FiXCircle, FiEye, FiTrash2 } from 'react-icons/fi'
-import { apiClient } from '@/lib/api'
+import { apiClient, streamOrderEvents, OrderEvent } from '@/lib/api'
 
 interface OrderItem {
   id: string
@@ -54,6 +54,58 @@ export default function AdminDashboard() {
     verifyAdmin()
   }, [])
 
+  // Live order updates instead of reloading the whole order list
+  useEffect(() => {
+    if (loading) return
+    const controller = new AbortController()
+    let retry: ReturnType<typeof setTimeout>
+
+    const connect = () => {
+      streamOrderEvents(handleOrderEvent, controller.signal)
+        .catch((error) => {
+          if (!controller.signal.aborted) console.error('Order stream error:', error)
+        })
+        .finally(() => {
+          if (!controller.signal.aborted) retry = setTimeout(connect, 5000)
+        })
+    }
+    connect()
+
+    return () => {
+      controller.abort()
+      clearTimeout(retry)
+    }
+  }, [loading])
+
+  const handleOrderEvent = async (event: OrderEvent) => {
+    if (event.type === 'order.created') {
+      try {
+        const response = await apiClient.getOrder(event.order_id.toString())
+        setOrders((current) =>
+          current.some((o) => o.id === event.order_id) ? current : [response.data, ...current]
+        )
+      } catch (error) {
+        console.error('Error fetching new order:', error)
+      }
+    } else if (event.type === 'order.status') {
+      setOrders((current) =>
+        current.map((o) => (o.id === event.order_id ? { ...o, status: event.status } : o))
+      )
+    } else if (event.type === 'order.deleted') {
+      setOrders((current) => current.filter((o) => o.id !== event.order_id))
+    }
+    fetchRevenue()
+  }
+
+  const fetchRevenue = async () => {
+    try {
+      const response = await apiClient.getRevenue()
+      setRevenue(response.data)
+    } catch (error) {
+      console.error('Error fetching revenue:', error)
+    }
+  }
+
   const verifyAdmin = async () => {
     try {
       const token = localStorage.getItem('admin_token')
@@ -93,7 +145,6 @@ export default function AdminDashboard() {
   const handleUpdateStatus = async (orderId: number, status: string) => {
     try {
       await apiClient.updateOrderStatus(orderId.toString(), status)
-      fetchData()
     } catch (error) {
       console.error('Error updating order:', error)
       alert('Failed to update order status')
@@ -105,7 +156,6 @@ export default function AdminDashboard() {
 
     try {
       await apiClient.deleteOrder(orderId.toString())
-      fetchData()
     } catch (error) {
       console.error('Error deleting order:', error)
       alert('Failed to delete order')
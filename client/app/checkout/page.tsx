@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useRouter } from 'next/navigation'
 import { FiPackage, FiScissors, FiCheck } from 'react-icons/fi'
 import { useCartStore } from '@/store/cartStore'
@@ -38,6 +38,8 @@ export default function CheckoutPage() {
 
   const [loading, setLoading] = useState(false)
   const [showSuccess, setShowSuccess] = useState(false)
+  const [checkoutSessionId, setCheckoutSessionId] = useState<string | null>(null)
+  const orderPlaced = useRef(false)
 
   useEffect(() => {
     setMounted(true)
@@ -49,6 +51,42 @@ export default function CheckoutPage() {
     }
   }, [mounted, items.length, showSuccess, router])
 
+  // Hold the cart's stock while the customer fills in their details
+  useEffect(() => {
+    if (!mounted || items.length === 0) return
+    const sessionId = sessionStorage.getItem('checkoutSessionId')
+    apiClient
+      .reserveCart({
+        checkout_session_id: sessionId,
+        items: items.map((item) => ({
+          id: item.id,
+          type: item.type,
+          quantity: item.quantity,
+          details: item.details,
+        })),
+      })
+      .then((response) => {
+        sessionStorage.setItem('checkoutSessionId', response.data.checkout_session_id)
+        setCheckoutSessionId(response.data.checkout_session_id)
+      })
+      .catch((error) => console.error('Error reserving cart:', error))
+  }, [mounted, items])
+
+  // Give the held stock back when the customer leaves checkout without ordering
+  useEffect(() => {
+    const releaseHolds = () => {
+      const sessionId = sessionStorage.getItem('checkoutSessionId')
+      if (!sessionId || orderPlaced.current) return
+      sessionStorage.removeItem('checkoutSessionId')
+      apiClient.releaseCart(sessionId).catch((error) => console.error('Error releasing cart:', error))
+    }
+    window.addEventListener('pagehide', releaseHolds)
+    return () => {
+      window.removeEventListener('pagehide', releaseHolds)
+      releaseHolds()
+    }
+  }, [])
+
   // Calculation Logic
   const subtotal = getTotalPrice()
   const customItems = items.filter(item => item.type === 'custom')
@@ -83,9 +121,12 @@ export default function CheckoutPage() {
         stitching_cost: totalStitchingCost,
         delivery_charges: deliveryCharges,
         total,
+        checkout_session_id: checkoutSessionId,
       }
 
       await apiClient.createOrder(orderData)
+      orderPlaced.current = true
+      sessionStorage.removeItem('checkoutSessionId')
       
       setShowSuccess(true)
       clearCart()
@@ -97,7 +97,7 @@ export default function NewCollectionDetailPage() {
     if (!selectedSize) { alert('Please select a size'); return }
     if (availableColors.length > 0 && !selectedColor) { alert('Please select a color'); return }
     addItem({
-      id: `ready-made-${product.id}-${selectedSize}-${selectedColor}-${Date.now()}`,
+      id: `new-collection-${product.id}-${selectedSize}-${selectedColor}-${Date.now()}`,
       type: 'ready-made',
       name: product.name,
       price: product.price,
@@ -58,6 +58,48 @@ api.interceptors.response.use(
   }
 )
 
+export interface OrderEvent {
+  type: 'order.created' | 'order.status' | 'order.deleted'
+  order_id: number
+  status: string
+  previous_status?: string
+  [key: string]: any
+}
+
+// EventSource cannot send the admin bearer token, so read the SSE stream with fetch
+export const streamOrderEvents = async (
+  onEvent: (event: OrderEvent) => void,
+  signal: AbortSignal
+): Promise<void> => {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('admin_token') : null
+  const response = await fetch(`${API_BASE_URL}/orders/stream`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+    signal,
+  })
+  if (!response.ok || !response.body) {
+    throw new Error(`Order stream failed: ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    const messages = buffer.split('\n\n')
+    buffer = messages.pop() || ''
+    for (const message of messages) {
+      const data = message
+        .split('\n')
+        .filter((line) => line.startsWith('data:'))
+        .map((line) => line.slice(5).trim())
+        .join('\n')
+      if (data) onEvent(JSON.parse(data))
+    }
+  }
+}
+
 export const apiClient = {
   // Landing page images
   getLandingImages: () => api.get('/landing-images'),
@@ -126,6 +168,12 @@ export const apiClient = {
   // Custom Fabrics for stitching
   getCustomFabrics: () => api.get('/custom-fabrics'),
 
+  // Cart
+  trackAddToCart: (productType: string, productId: number) =>
+    api.post(`/products/${productType}/${productId}/add-to-cart`),
+  reserveCart: (data: any) => api.post('/cart/reserve', data),
+  releaseCart: (sessionId: string) => api.delete(`/cart/reserve/${sessionId}`),
+
   // Orders
   createOrder: (data: any) => api.post('/orders', data),
   getOrders: () => api.get('/orders'),
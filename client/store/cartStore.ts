@@ -1,5 +1,6 @@
 import { create } from 'zustand'
 import { persist } from 'zustand/middleware'
+import { apiClient } from '@/lib/api'
 
 export interface CartItem {
   id: string
@@ -11,6 +12,18 @@ export interface CartItem {
   details?: any
 }
 
+// Catalog types counted by the add-to-cart tracker, longest prefix first
+// so "new-collection-" isn't read as something shorter
+const TRACKED_TYPES = ['new-collection', 'ready-made', 'waist-coat', 'fabric']
+
+// Cart line ids start with the product reference, e.g. "ready-made-12-M-Black-1718000000000"
+const productRef = (id: string): [string, number] | null => {
+  const productType = TRACKED_TYPES.find((type) => id.startsWith(`${type}-`))
+  if (!productType) return null
+  const productId = parseInt(id.slice(productType.length + 1).split('-')[0], 10)
+  return Number.isNaN(productId) ? null : [productType, productId]
+}
+
 interface CartStore {
   items: CartItem[]
   addItem: (item: CartItem) => void
@@ -26,6 +39,12 @@ export const useCartStore = create<CartStore>()(
       items: [],
       
       addItem: (item) => {
+        // Fire and forget: feeds the popularity counters, never blocks the cart
+        const ref = productRef(item.id)
+        if (ref) {
+          apiClient.trackAddToCart(ref[0], ref[1]).catch(() => {})
+        }
+
         set((state) => {
           const existingItem = state.items.find((i) => i.id === item.id)
           
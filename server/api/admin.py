@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import List, Optional
 
-from database import get_db
-from models import Admin, Order, OrderStatus
-from schemas import AdminLogin, AdminToken, RevenueResponse
+from database import get_db, get_report_db
+from models import Admin, Order, OrderStatus, OrderLineItem, ProductCounter
+from schemas import AdminLogin, AdminToken, RevenueResponse, ProductSalesResponse, ProductStatsResponse
 from auth import verify_password, create_access_token, get_current_admin, ACCESS_TOKEN_EXPIRE_MINUTES, init_admin
 
 router = APIRouter()
@@ -31,7 +33,7 @@ async def login(credentials: AdminLogin, db: Session = Depends(get_db)):
 @router.get("/revenue", response_model=RevenueResponse)
 async def get_revenue(
     admin: Admin = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_report_db)
 ):
     completed_orders = db.query(Order).filter(Order.status == OrderStatus.COMPLETED).all()
     pending_orders = db.query(Order).filter(Order.status == OrderStatus.PENDING).all()
@@ -49,3 +51,68 @@ async def get_revenue(
 @router.get("/verify")
 async def verify_admin(admin: Admin = Depends(get_current_admin)):
     return {"username": admin.username}
+
+def _sales_query(db: Session):
+    # Cancelled orders never shipped, so they do not count as sales
+    return db.query(
+        OrderLineItem.product_type,
+        OrderLineItem.product_id,
+        func.max(OrderLineItem.name).label("name"),
+        func.coalesce(func.sum(OrderLineItem.quantity), 0).label("units_sold"),
+        func.coalesce(func.sum(OrderLineItem.line_total), 0).label("revenue"),
+        func.count(func.distinct(OrderLineItem.order_id)).label("order_count")
+    ).join(Order, Order.id == OrderLineItem.order_id).filter(
+        Order.status != OrderStatus.CANCELLED
+    ).group_by(OrderLineItem.product_type, OrderLineItem.product_id)
+
+@router.get("/sales", response_model=List[ProductSalesResponse])
+async def get_product_sales(
+    product_type: Optional[str] = None,
+    limit: int = 50,
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_report_db)
+):
+    """Units sold and revenue per product, best sellers first"""
+    query = _sales_query(db)
+    if product_type:
+        query = query.filter(OrderLineItem.product_type == product_type)
+    rows = query.order_by(func.sum(OrderLineItem.quantity).desc()).limit(limit).all()
+    return [row._asdict() for row in rows]
+
+@router.get("/sales/{product_type}/{product_id}", response_model=ProductSalesResponse)
+async def get_single_product_sales(
+    product_type: str,
+    product_id: int,
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_report_db)
+):
+    """Units sold and revenue for one product (served by ix_order_items_product)"""
+    row = _sales_query(db).filter(
+        OrderLineItem.product_type == product_type,
+        OrderLineItem.product_id == product_id
+    ).first()
+    if not row:
+        return {
+            "product_type": product_type,
+            "product_id": product_id,
+            "name": None,
+            "units_sold": 0,
+            "revenue": 0.0,
+            "order_count": 0
+        }
+    return row._asdict()
+
+@router.get("/product-stats", response_model=List[ProductStatsResponse])
+async def get_product_stats(
+    product_type: Optional[str] = None,
+    sort: str = Query("views", pattern="^(views|add_to_cart)$"),
+    limit: int = 50,
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_report_db)
+):
+    """View and add-to-cart counters per product (lag by up to one flush interval)"""
+    query = db.query(ProductCounter)
+    if product_type:
+        query = query.filter(ProductCounter.product_type == product_type)
+    sort_column = ProductCounter.views if sort == "views" else ProductCounter.add_to_cart
+    return query.order_by(sort_column.desc(), ProductCounter.id).limit(limit).all()
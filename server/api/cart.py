@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from database import get_db
+from models import Admin
+from schemas import CartQuoteRequest, CartQuoteResponse, CartReservationResponse, ReservationStatsResponse
+from auth import get_current_admin
+from pricing import quote_cart
+from reservations import reserve, release, reservation_stats, InsufficientStock, ReservationLimitExceeded
+
+router = APIRouter()
+
+def _check_quantities(request: CartQuoteRequest):
+    if any(item.quantity <= 0 for item in request.items):
+        raise HTTPException(status_code=400, detail="Quantities must be positive")
+
+@router.post("/quote", response_model=CartQuoteResponse)
+async def get_cart_quote(request: CartQuoteRequest, db: Session = Depends(get_db)):
+    """Price the cart against current prices, stock and delivery rules"""
+    _check_quantities(request)
+    return quote_cart(db, request.items, request.city, request.state, request.checkout_session_id)
+
+@router.post("/reserve", response_model=CartReservationResponse)
+async def reserve_cart(request: CartQuoteRequest, http_request: Request, db: Session = Depends(get_db)):
+    """
+    Hold the cart's stock for the checkout session (a new session id is issued
+    when none is given). Nothing is held unless every line is available.
+    """
+    _check_quantities(request)
+    session_id = request.checkout_session_id or uuid4().hex
+    quote = quote_cart(db, request.items, request.city, request.state, session_id)
+    
+    expires_at = None
+    if quote["all_available"]:
+        try:
+            # The caller's address; behind the local proxy uvicorn takes it from X-Forwarded-For
+            client = http_request.client.host if http_request.client else None
+            expires_at = reserve(db, session_id, quote["lines"], client)
+        except ReservationLimitExceeded as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except InsufficientStock as e:
+            # Taken by another checkout since the quote
+            raise HTTPException(status_code=409, detail={"message": "Not enough stock", "shortages": e.shortages})
+        db.commit()
+    
+    return {**quote, "checkout_session_id": session_id, "reserved": expires_at is not None, "expires_at": expires_at}
+
+@router.delete("/reserve/{session_id}")
+async def release_cart(session_id: str, db: Session = Depends(get_db)):
+    """Give back the stock held by an abandoned checkout"""
+    released = release(db, session_id)
+    db.commit()
+    return {"released": released}
+
+@router.get("/reservations/stats", response_model=ReservationStatsResponse)
+async def get_reservation_stats(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Holds created in the last `hours`, by outcome (admin only)"""
+    return reservation_stats(db, since=datetime.now(timezone.utc) - timedelta(hours=hours))
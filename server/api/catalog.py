@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
+import zipfile
+
+from database import get_db
+from models import Admin
+from schemas import CatalogImportResponse
+from auth import get_current_admin
+from catalog_io import import_catalog, export_archive, export_csv, CatalogFormatError
+
+router = APIRouter()
+
+@router.post("/import", response_model=CatalogImportResponse)
+async def import_catalog_file(
+    catalog: Optional[UploadFile] = File(None),
+    images: Optional[UploadFile] = File(None),
+    dry_run: bool = Form(False),
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk create products from a CSV and a ZIP of the images it references
+    (admin only). An archive from /catalog/export can be uploaded on its own
+    as `images`. Rows with errors are skipped and reported by line number.
+    """
+    archive = None
+    if images is not None:
+        try:
+            archive = zipfile.ZipFile(images.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="images must be a ZIP file")
+    
+    try:
+        # Parsing, image processing and inserts are blocking work
+        return await run_in_threadpool(import_catalog, db, catalog.file if catalog else None, archive, dry_run)
+    except CatalogFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if archive is not None:
+            archive.close()
+
+@router.get("/export")
+async def export_catalog(
+    format: str = Query("zip", pattern="^(zip|csv)$"),
+    admin: Admin = Depends(get_current_admin)
+):
+    """Stream the whole catalog as a re-importable ZIP, or as CSV with image URLs (admin only)"""
+    filename = f"darven-catalog-{date.today().isoformat()}"
+    if format == "csv":
+        return StreamingResponse(
+            export_csv(),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+        )
+    return StreamingResponse(
+        export_archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.zip"'}
+    )
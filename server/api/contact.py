@@ -6,6 +6,8 @@ from email.mime.multipart import MIMEMultipart
 import os
 import logging
 
+from tracing import span, CLIENT
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -103,11 +105,12 @@ This email was sent from the ShopDarven contact form.
         
         # Send email
         logger.info(f"Attempting to send email via {smtp_server}:{smtp_port}")
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-            logger.info(f"Contact form email sent successfully from {contact_data.email}")
+        with span("smtp.send", {"server.address": smtp_server, "server.port": smtp_port}, CLIENT):
+            with smtplib.SMTP(smtp_server, smtp_port) as server:
+                server.starttls()
+                server.login(sender_email, sender_password)
+                server.send_message(msg)
+                logger.info(f"Contact form email sent successfully from {contact_data.email}")
         
         return True
         
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
 import json
+import logging
 from typing import List
 import os
 from uuid import uuid4
@@ -11,6 +12,9 @@ from models import CustomFabric, Admin
 from schemas import CustomFabricResponse
 from auth import get_current_admin
 from file_utils import upload_file_local, delete_file_local
+from cache_invalidation import invalidate, catalog_key, CATALOG
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -20,9 +24,6 @@ FRONTEND_URL = os.getenv("FRONTEND_URL", "https://shopdarven.pk").rstrip("/")
 @router.get("", response_model=List[CustomFabricResponse])
 async def get_custom_fabrics(db: Session = Depends(get_db)):
     fabrics = db.query(CustomFabric).all()
-    print(f"📋 Fetching {len(fabrics)} custom fabrics")
-    for fabric in fabrics:
-        print(f"  - {fabric.name}: colors={fabric.colors}, image={fabric.image_url}")
 
     if not fabrics:
         default_fabrics = [
@@ -83,13 +84,9 @@ async def create_custom_fabric(
     admin: Admin = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    print(f"📝 Creating custom fabric: {name}")
-    print(f"Colors received (raw): {colors}")
-    
     file_extension = os.path.splitext(file.filename)[1]
     filename = f"{uuid4()}{file_extension}"
     image_url = await upload_file_local(file, "custom-fabrics", filename)
-    print(f"Image uploaded to: {image_url}")
 
     # Parse colors from JSON string
     colors_list = None
@@ -97,12 +94,9 @@ async def create_custom_fabric(
         import json
         try:
             colors_list = json.loads(colors)
-            print(f"Colors parsed successfully: {colors_list}")
         except Exception as e:
-            print(f"Failed to parse colors: {e}")
+            logger.warning(f"Ignoring unparseable colors for new custom fabric {name!r}: {str(e)}")
             colors_list = None
-    else:
-        print("No colors provided")
 
     custom_fabric = CustomFabric(
         name=name,
@@ -113,14 +107,12 @@ async def create_custom_fabric(
         image_url=image_url
     )
 
-    print(f"About to commit. Fabric colors before commit: {custom_fabric.colors}")
     db.add(custom_fabric)
+    db.flush()
+    invalidate(db, CATALOG, catalog_key("custom", custom_fabric.id))
     db.commit()
-    print(f"Committed to database")
     db.refresh(custom_fabric)
-    print(f"After refresh from DB. Fabric colors: {custom_fabric.colors}, type: {type(custom_fabric.colors)}")
-    
-    print(f"✅ Created fabric with colors: {custom_fabric.colors}")
+    logger.info(f"Created custom fabric {custom_fabric.id}", extra={"fabric_id": custom_fabric.id})
 
     return custom_fabric
 
@@ -137,26 +129,9 @@ async def update_custom_fabric(
     colors: str = Form(None),  # JSON string of color array
     file: UploadFile = File(None)
 ):
-    print(f"\n{'='*60}")
-    print(f"📝 UPDATE REQUEST for fabric ID: {fabric_id}")
-    print(f"{'='*60}")
-    print(f"Received parameters:")
-    print(f"  name: {name}")
-    print(f"  description: {description}")
-    print(f"  price: {price}")
-    print(f"  material: {material}")
-    print(f"  colors (raw): {colors}")
-    print(f"  file: {file.filename if file else 'None'}")
-    
     fabric = db.query(CustomFabric).filter(CustomFabric.id == fabric_id).first()
     if not fabric:
-        print(f"❌ ERROR: Fabric {fabric_id} not found!")
         raise HTTPException(status_code=404, detail="Custom fabric not found")
-    
-    print(f"\nCurrent fabric state:")
-    print(f"  Name: {fabric.name}")
-    print(f"  Colors: {fabric.colors}")
-    print(f"  Image: {fabric.image_url}")
 
     if name is not None:
         fabric.name = name
@@ -172,7 +147,6 @@ async def update_custom_fabric(
         import json
         try:
             colors_list = json.loads(colors)
-            print(f"Colors parsed: {colors_list}, type: {type(colors_list)}")
             # Explicitly set as a Python list
             fabric.colors = colors_list
             
@@ -180,33 +154,21 @@ async def update_custom_fabric(
             # Tell SQLAlchemy that the JSON column 'colors' has been modified
             flag_modified(fabric, "colors")
             # --- END OF FIX ---
-            
-            print(f"Colors updated to: {fabric.colors}, type: {type(fabric.colors)}")
         except Exception as e:
-            print(f"Failed to parse colors: {e}")
-            pass
-    else:
-        print("No colors in update request")
+            logger.warning(f"Ignoring unparseable colors for custom fabric {fabric_id}: {str(e)}")
 
     if file:
-        print(f"Uploading new file: {file.filename}")
         if fabric.image_url:
             delete_file_local(fabric.image_url)
 
         file_extension = os.path.splitext(file.filename)[1]
         filename = f"{uuid4()}{file_extension}"
         fabric.image_url = await upload_file_local(file, "custom-fabrics", filename)
-        print(f"New image URL: {fabric.image_url}")
-    else:
-        print(f"No new file, keeping existing: {fabric.image_url}")
 
-    print(f"About to commit. Fabric colors before commit: {fabric.colors}")
+    invalidate(db, CATALOG, catalog_key("custom", fabric.id))
     db.commit()
-    print(f"Committed to database")
     db.refresh(fabric)
-    print(f"After refresh from DB. Fabric colors: {fabric.colors}, type: {type(fabric.colors)}")
-    
-    print(f"✅ Updated fabric. Final colors: {fabric.colors}, Final image: {fabric.image_url}")
+    logger.info(f"Updated custom fabric {fabric.id}", extra={"fabric_id": fabric.id})
 
     return fabric
 
@@ -224,6 +186,7 @@ async def delete_custom_fabric(
     if fabric.image_url and fabric.image_url.startswith("https://api.shopdarven.pk"):
         delete_file_local(fabric.image_url)
 
+    invalidate(db, CATALOG, catalog_key("custom", fabric.id))
     db.delete(fabric)
     db.commit()
 
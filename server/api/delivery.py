@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from database import get_db
+from models import DeliveryRule, Admin
+from schemas import DeliveryRuleCreate, DeliveryRuleResponse
+from auth import get_current_admin
+from delivery_rules import normalize
+from cache_invalidation import invalidate, DELIVERY_RULES
+
+router = APIRouter()
+
+def _validate(rule_data: DeliveryRuleCreate):
+    if rule_data.base_charge < 0 or rule_data.per_meter_charge < 0:
+        raise HTTPException(status_code=400, detail="Charges cannot be negative")
+    if rule_data.free_shipping_threshold is not None and rule_data.free_shipping_threshold < 0:
+        raise HTTPException(status_code=400, detail="Free shipping threshold cannot be negative")
+
+def _find_duplicate(db: Session, rule_data: DeliveryRuleCreate, exclude_id: int = None):
+    # Rules are matched case-insensitively, so compare normalized names
+    city, state = normalize(rule_data.city), normalize(rule_data.state)
+    for rule in db.query(DeliveryRule).all():
+        if rule.id != exclude_id and normalize(rule.city) == city and normalize(rule.state) == state:
+            return rule
+    return None
+
+@router.get("", response_model=List[DeliveryRuleResponse])
+async def get_delivery_rules(
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """List all delivery rules (admin only)"""
+    return db.query(DeliveryRule).order_by(DeliveryRule.id).all()
+
+@router.post("", response_model=DeliveryRuleResponse)
+async def create_delivery_rule(
+    rule_data: DeliveryRuleCreate,
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Create a delivery rule for a city, a state, or the default (admin only)"""
+    _validate(rule_data)
+    if _find_duplicate(db, rule_data):
+        raise HTTPException(status_code=400, detail="A rule for this city/state already exists")
+    
+    rule = DeliveryRule(**rule_data.dict())
+    db.add(rule)
+    invalidate(db, DELIVERY_RULES)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+@router.put("/{rule_id}", response_model=DeliveryRuleResponse)
+async def update_delivery_rule(
+    rule_id: int,
+    rule_data: DeliveryRuleCreate,
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Update a delivery rule (admin only)"""
+    rule = db.query(DeliveryRule).filter(DeliveryRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Delivery rule not found")
+    
+    _validate(rule_data)
+    if _find_duplicate(db, rule_data, exclude_id=rule_id):
+        raise HTTPException(status_code=400, detail="A rule for this city/state already exists")
+    
+    for field, value in rule_data.dict().items():
+        setattr(rule, field, value)
+    
+    invalidate(db, DELIVERY_RULES)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+@router.delete("/{rule_id}")
+async def delete_delivery_rule(
+    rule_id: int,
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Delete a delivery rule (admin only)"""
+    rule = db.query(DeliveryRule).filter(DeliveryRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Delivery rule not found")
+    
+    db.delete(rule)
+    invalidate(db, DELIVERY_RULES)
+    db.commit()
+    return {"message": "Delivery rule deleted successfully"}
@@ -1,28 +1,42 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
 import json
 from uuid import uuid4
 
-from database import get_db
+from database import get_db, get_read_db
 from models import Fabric, Admin
 from schemas import FabricResponse
 from auth import get_current_admin
+from projections import project_list, fast_list, FABRIC_CARD_FIELDS
+from counters import record_view, popularity
+from inventory import record_opening, set_stock
+from cache_invalidation import invalidate, catalog_key, CATALOG
 from file_utils import upload_file_local, delete_multiple_files_local
 
 router = APIRouter()
 
 @router.get("", response_model=List[FabricResponse])
-async def get_fabrics(db: Session = Depends(get_db)):
-    fabrics = db.query(Fabric).all()
-    return fabrics
+async def get_fabrics(
+    view: str = Query("full", pattern="^(full|card)$"),
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    sort: str = Query("default", pattern="^(default|popular)$"),
+    db: Session = Depends(get_read_db)
+):
+    order_by = popularity(Fabric, "fabric") if sort == "popular" else None
+    projected = project_list(db, Fabric, FabricResponse, FABRIC_CARD_FIELDS, view, fields, order_by)
+    if projected is not None:
+        return projected
+
+    return fast_list(db, Fabric, FabricResponse, order_by=order_by)
 
 @router.get("/{fabric_id}", response_model=FabricResponse)
-async def get_fabric(fabric_id: int, db: Session = Depends(get_db)):
+async def get_fabric(fabric_id: int, db: Session = Depends(get_read_db)):
     fabric = db.query(Fabric).filter(Fabric.id == fabric_id).first()
     if not fabric:
         raise HTTPException(status_code=404, detail="Fabric not found")
+    record_view("fabric", fabric_id)
     return fabric
 
 @router.post("", response_model=FabricResponse)
@@ -67,6 +81,9 @@ async def create_fabric(
     )
     
     db.add(fabric)
+    db.flush()
+    record_opening(db, "fabric", fabric.id, stock_meters)
+    invalidate(db, CATALOG, catalog_key("fabric", fabric.id))
     db.commit()
     db.refresh(fabric)
     
@@ -102,6 +119,7 @@ async def update_fabric(
     if fabric_category is not None:
         fabric.fabric_category = fabric_category
     if stock_meters is not None:
+        set_stock(db, "fabric", fabric.id, stock_meters)
         fabric.stock_meters = stock_meters
     
     # Update colors if provided
@@ -126,6 +144,7 @@ async def update_fabric(
         
         fabric.images = image_urls
     
+    invalidate(db, CATALOG, catalog_key("fabric", fabric.id))
     db.commit()
     db.refresh(fabric)
     
@@ -145,6 +164,7 @@ async def delete_fabric(
     delete_multiple_files_local(fabric.images)
     
     db.delete(fabric)
+    invalidate(db, CATALOG, catalog_key("fabric", fabric.id))
     db.commit()
     
     return {"message": "Fabric deleted successfully"}
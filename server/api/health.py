@@ -0,0 +1,25 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+import asyncio
+
+from health import CHECKS, summarize
+
+router = APIRouter()
+
+@router.get("")
+@router.get("/live")
+async def liveness():
+    """Liveness: the worker is up and its event loop answers; no dependencies are checked"""
+    return {"status": "healthy"}
+
+@router.get("/ready")
+async def readiness():
+    """Readiness: cached database, pool, disk and SMTP checks; 503 when a critical one fails"""
+    results = await asyncio.gather(*(run_in_threadpool(check.get) for check in CHECKS))
+    checks = {check.name: result for check, result in zip(CHECKS, results)}
+    status = summarize(checks)
+    return JSONResponse(
+        status_code=503 if status == "unready" else 200,
+        content={"status": status, "checks": checks},
+    )
@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from database import get_db
+from models import StockMovement, LowStockThreshold, StockAlert, Admin
+from schemas import StockHistoryResponse, LowStockThresholdUpdate, StockAlertResponse
+from auth import get_current_admin
+from inventory import STOCKED_TYPES, DEFAULT_LOW_STOCK_THRESHOLD, current_stock, ledger_balance, check_product
+
+router = APIRouter()
+
+def _check_type(product_type: str):
+    if product_type not in STOCKED_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid product type. Must be one of: {', '.join(STOCKED_TYPES)}")
+
+@router.get("/alerts", response_model=List[StockAlertResponse])
+async def get_stock_alerts(
+    include_resolved: bool = False,
+    limit: int = Query(100, ge=1, le=1000),
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Low-stock alerts raised by the scheduled scan, newest first (admin only)"""
+    query = db.query(StockAlert)
+    if not include_resolved:
+        query = query.filter(StockAlert.resolved_at.is_(None))
+    return query.order_by(StockAlert.id.desc()).limit(limit).all()
+
+@router.get("/{product_type}/{product_id}", response_model=StockHistoryResponse)
+async def get_stock_history(
+    product_type: str,
+    product_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Current stock and the most recent ledger movements of a product (admin only)"""
+    _check_type(product_type)
+    stock = current_stock(db, product_type, product_id)
+    if stock is None and not db.query(StockMovement.id).filter(
+        StockMovement.product_type == product_type,
+        StockMovement.product_id == product_id
+    ).first():
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    threshold = db.query(LowStockThreshold.threshold).filter(
+        LowStockThreshold.product_type == product_type,
+        LowStockThreshold.product_id == product_id
+    ).scalar()
+
+    movements = db.query(StockMovement).filter(
+        StockMovement.product_type == product_type,
+        StockMovement.product_id == product_id
+    ).order_by(StockMovement.id.desc()).limit(limit).all()
+
+    return {
+        "product_type": product_type,
+        "product_id": product_id,
+        "stock": stock,
+        "ledger_balance": ledger_balance(db, product_type, product_id),
+        "threshold": threshold if threshold is not None else DEFAULT_LOW_STOCK_THRESHOLD,
+        "movements": movements
+    }
+
+@router.put("/{product_type}/{product_id}/threshold")
+async def set_low_stock_threshold(
+    product_type: str,
+    product_id: int,
+    data: LowStockThresholdUpdate,
+    admin: Admin = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Set the stock level at or below which a product raises an alert (admin only)"""
+    _check_type(product_type)
+    if data.threshold < 0:
+        raise HTTPException(status_code=400, detail="Threshold cannot be negative")
+
+    row = db.query(LowStockThreshold).filter(
+        LowStockThreshold.product_type == product_type,
+        LowStockThreshold.product_id == product_id
+    ).first()
+    if row:
+        row.threshold = data.threshold
+    else:
+        db.add(LowStockThreshold(product_type=product_type, product_id=product_id, threshold=data.threshold))
+
+    # The scan only revisits products whose stock moved, so re-check this one now
+    if current_stock(db, product_type, product_id) is not None:
+        check_product(db, product_type, product_id, data.threshold)
+    db.commit()
+    return {"product_type": product_type, "product_id": product_id, "threshold": data.threshold}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import os
 from uuid import uuid4
 
@@ -9,12 +9,27 @@ from models import LandingImage, Admin
 from schemas import LandingImageResponse
 from auth import get_current_admin
 from file_utils import upload_file_local, delete_file_local
+from cache_invalidation import register, invalidate, LANDING
 
 router = APIRouter()
 
+# Landing images are read on every home page view and change rarely; the
+# cache is evicted on every worker when an admin changes an image
+_landing_cache: Optional[List[dict]] = None
+
+def _evict_landing_cache(key: Optional[str] = None):
+    global _landing_cache
+    _landing_cache = None
+
+register(LANDING, _evict_landing_cache)
+
 @router.get("", response_model=List[LandingImageResponse])
 async def get_landing_images(db: Session = Depends(get_db)):
-    images = db.query(LandingImage).all()
+    global _landing_cache
+    images = _landing_cache
+    if images is None:
+        images = [LandingImageResponse.model_validate(image).model_dump() for image in db.query(LandingImage).all()]
+        _landing_cache = images
     
     if not images:
         return [
@@ -84,6 +99,7 @@ async def update_landing_image(
             )
             db.add(landing_image)
 
+    invalidate(db, LANDING)
     db.commit()
     db.refresh(landing_image)
     
@@ -121,6 +137,7 @@ async def update_landing_portrait_image(
     
     landing_image.portrait_image_url = portrait_image_url
     
+    invalidate(db, LANDING)
     db.commit()
     db.refresh(landing_image)
     
@@ -143,6 +160,7 @@ async def delete_landing_image(
         delete_file_local(landing_image.portrait_image_url)
     
     db.delete(landing_image)
+    invalidate(db, LANDING)
     db.commit()
     
     return {"message": "Landing image deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import Response
+import hmac
+import os
+
+from metrics import render, CONTENT_TYPE
+
+router = APIRouter()
+
+# When set, scrapers must send "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Prometheus scrape endpoint for this worker"""
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(render(), media_type=CONTENT_TYPE)
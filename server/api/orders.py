@@ -1,16 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime, timezone
+import json
+import os
 
-from database import get_db
+from database import get_db, SessionLocal
 from models import Order, OrderStatus, Admin
 from schemas import OrderCreate, OrderResponse
-from auth import get_current_admin
+from auth import get_current_admin, security
+from projections import fast_list
+from order_items import insert_line_items
+from pricing import quote_cart
+from inventory import apply_order, ORDER, CANCELLATION
+from reservations import convert, lock_available, requested_amounts, InsufficientStock
+from events import publish, Subscription
 
 router = APIRouter()
 
+ORDER_EVENTS = "orders"
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+def _publish_order_event(db: Session, event_type: str, order: Order, **extra):
+    # Summary only: the dashboard fetches the full order when it needs it
+    publish(db, ORDER_EVENTS, {
+        "type": event_type,
+        "order_id": order.id,
+        "customer_name": order.customer_name,
+        "city": order.city,
+        "total": order.total,
+        "status": order.status.value,
+        "at": datetime.now(timezone.utc).isoformat(),
+        **extra
+    })
+
 @router.post("", response_model=OrderResponse)
 async def create_order(order: OrderCreate, db: Session = Depends(get_db)):
+    # Prices and delivery come from the catalog and the configured rules; the
+    # amounts the client sent are ignored
+    quote = quote_cart(db, order.items, order.city, order.state, order.checkout_session_id)
+    unavailable = [
+        {"id": line["id"], "message": line["message"]}
+        for line in quote["lines"] if not line["available"]
+    ]
+    if unavailable:
+        # Out of stock is a conflict; anything else (unknown product, missing
+        # fabric length) is a bad cart
+        out_of_stock = all(line["message"] == "Not enough stock" for line in unavailable)
+        raise HTTPException(
+            status_code=409 if out_of_stock else 400,
+            detail={"message": "Some items can't be ordered", "lines": unavailable}
+        )
+    
+    # The stored items (and the order_items rows built from them) carry the
+    # quoted unit prices; quote lines come back in cart order
+    items = []
+    for item, line in zip(order.items, quote["lines"]):
+        items.append({**item.dict(), "price": line["unit_price"]})
+    
+    # Stock held by other checkouts is not for sale; the product rows stay
+    # locked until the commit below, so the check can't be raced
+    try:
+        lock_available(db, requested_amounts(quote["lines"]), exclude_session=order.checkout_session_id)
+    except InsufficientStock as e:
+        raise HTTPException(status_code=409, detail={"message": "Not enough stock", "shortages": e.shortages})
+    
     # Create new order
     new_order = Order(
         customer_name=order.customer_name,
@@ -20,14 +76,23 @@ async def create_order(order: OrderCreate, db: Session = Depends(get_db)):
         city=order.city,
         state=order.state,
         landmark=order.landmark,
-        items=[item.dict() for item in order.items],
-        subtotal=order.subtotal,
-        delivery_charges=order.delivery_charges,
-        total=order.total,
+        items=items,
+        subtotal=quote["subtotal"],
+        delivery_charges=quote["delivery_charges"],
+        total=quote["total"],
         status=OrderStatus.PENDING
     )
     
     db.add(new_order)
+    db.flush()
+    
+    # Line items go in the same transaction as the order
+    insert_line_items(db, new_order.id, items)
+    apply_order(db, new_order.id, ORDER)
+    if order.checkout_session_id:
+        # The order now owns the stock the checkout was holding
+        convert(db, order.checkout_session_id, new_order.id)
+    _publish_order_event(db, "order.created", new_order)
     db.commit()
     db.refresh(new_order)
     
@@ -38,8 +103,42 @@ async def get_orders(
     admin: Admin = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    orders = db.query(Order).order_by(Order.created_at.desc()).all()
-    return orders
+    return fast_list(db, Order, OrderResponse, order_by=Order.created_at.desc())
+
+@router.get("/stream")
+async def stream_order_events(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Server-sent events for new orders, status changes and deletions (admin only)"""
+    # Authenticate with a short-lived session: the stream stays open for hours
+    # and must not pin a pooled connection
+    db = SessionLocal()
+    try:
+        get_current_admin(credentials, db)
+    finally:
+        db.close()
+    
+    subscription = Subscription(ORDER_EVENTS)
+    
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
@@ -69,7 +168,16 @@ async def update_order_status(
     except KeyError:
         raise HTTPException(status_code=400, detail="Invalid status")
     
+    # Cancelling puts the stock back; reopening a cancelled order takes it again
+    if new_status == OrderStatus.CANCELLED and order.status != OrderStatus.CANCELLED:
+        apply_order(db, order.id, CANCELLATION)
+    elif order.status == OrderStatus.CANCELLED and new_status != OrderStatus.CANCELLED:
+        apply_order(db, order.id, ORDER)
+    
+    previous_status = order.status
     order.status = new_status
+    if new_status != previous_status:
+        _publish_order_event(db, "order.status", order, previous_status=previous_status.value)
     db.commit()
     db.refresh(order)
     
@@ -85,6 +193,11 @@ async def delete_order(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    # Its ledger movements go with it; put back the stock it still holds
+    if order.status != OrderStatus.CANCELLED:
+        apply_order(db, order.id, CANCELLATION)
+    
+    _publish_order_event(db, "order.deleted", order)
     db.delete(order)
     db.commit()
     
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List
+
+from database import get_read_db
+from schemas import RankedProductResponse
+from rankings import get_ranking, resolve_cards, BEST_SELLERS, ALL_TYPES, CATALOG, RANKINGS_TOP_N
+from counters import record_add_to_cart
+
+router = APIRouter()
+
+@router.get("/best-sellers", response_model=List[RankedProductResponse])
+async def get_best_sellers(
+    product_type: str = Query(ALL_TYPES, description="ready-made, new-collection, waist-coat, fabric or all"),
+    limit: int = Query(12, ge=1, le=RANKINGS_TOP_N),
+    db: Session = Depends(get_read_db)
+):
+    """Best selling products by units sold, from the precomputed rankings"""
+    if product_type != ALL_TYPES and product_type not in CATALOG:
+        raise HTTPException(status_code=400, detail="Invalid product type")
+    
+    return resolve_cards(db, get_ranking(db, BEST_SELLERS, product_type), limit)
+
+@router.post("/{product_type}/{product_id}/add-to-cart")
+async def track_add_to_cart(product_type: str, product_id: int):
+    """Record an add-to-cart event (buffered, no database write per call)"""
+    if product_type not in CATALOG:
+        raise HTTPException(status_code=400, detail="Invalid product type")
+    
+    record_add_to_cart(product_type, product_id)
+    return {"message": "OK"}
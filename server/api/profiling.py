@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from typing import List
+import asyncio
+import os
+
+from models import Admin
+from auth import get_current_admin
+from profiling import Sampler, collapse, profile_path, PROFILE_DIR, PROFILE_INTERVAL_MS, PROFILE_MAX_SECONDS
+
+router = APIRouter()
+
+# One worker-wide profile at a time; overlapping samplers would skew each other
+_profile_lock = asyncio.Lock()
+
+@router.get("", response_class=PlainTextResponse)
+async def profile_worker(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(PROFILE_INTERVAL_MS, ge=1, le=1000),
+    include_idle: bool = False,
+    admin: Admin = Depends(get_current_admin)
+):
+    """Sample every thread of the worker serving this call for `seconds`; collapsed stacks (admin only)"""
+    if seconds > PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {PROFILE_MAX_SECONDS}")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running on this worker")
+
+    async with _profile_lock:
+        sampler = Sampler(interval_ms / 1000).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            stacks = sampler.stop()
+    return PlainTextResponse(
+        collapse(stacks, include_idle),
+        headers={"X-Profile-Samples": str(sampler.samples), "X-Profile-Worker": str(os.getpid())}
+    )
+
+@router.get("/requests", response_model=List[str])
+async def list_request_profiles(admin: Admin = Depends(get_current_admin)):
+    """Ids of saved per-request profiles, newest first (admin only)"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    names = [name[:-len(".folded")] for name in os.listdir(PROFILE_DIR) if name.endswith(".folded")]
+    return sorted(names, reverse=True)
+
+@router.get("/requests/{profile_id}")
+async def get_request_profile(profile_id: str, admin: Admin = Depends(get_current_admin)):
+    """Collapsed stacks of a request sent with X-Profile: 1 (admin only)"""
+    path = profile_path(profile_id)
+    if path is None or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
@@ -1,28 +1,53 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
 import json
 from uuid import uuid4
 
-from database import get_db
+from database import get_db, get_read_db
 from models import ReadyMadeProduct, Admin
-from schemas import ReadyMadeProductResponse
+from schemas import ReadyMadeProductResponse, RankedProductResponse
 from auth import get_current_admin
+from projections import project_list, fast_list, PRODUCT_CARD_FIELDS
+from rankings import get_ranking, resolve_cards, RELATED, RANKINGS_TOP_N
+from counters import record_view, popularity
+from inventory import record_opening, set_stock
+from cache_invalidation import invalidate, catalog_key, CATALOG
 from file_utils import upload_file_local, delete_file_local, delete_multiple_files_local
 
 router = APIRouter()
 
 @router.get("", response_model=List[ReadyMadeProductResponse])
-async def get_ready_made_products(db: Session = Depends(get_db)):
-    products = db.query(ReadyMadeProduct).all()
-    return products
+async def get_ready_made_products(
+    view: str = Query("full", pattern="^(full|card)$"),
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    sort: str = Query("default", pattern="^(default|popular)$"),
+    db: Session = Depends(get_read_db)
+):
+    order_by = popularity(ReadyMadeProduct, "ready-made") if sort == "popular" else None
+    projected = project_list(db, ReadyMadeProduct, ReadyMadeProductResponse, PRODUCT_CARD_FIELDS, view, fields, order_by)
+    if projected is not None:
+        return projected
+
+    return fast_list(db, ReadyMadeProduct, ReadyMadeProductResponse, order_by=order_by)
+
+@router.get("/{product_id}/related", response_model=List[RankedProductResponse])
+async def get_related_ready_made_products(
+    product_id: int,
+    limit: int = Query(8, ge=1, le=RANKINGS_TOP_N),
+    db: Session = Depends(get_read_db)
+):
+    """Ready-made products most often bought together with this one"""
+    ranked = get_ranking(db, RELATED, "ready-made", product_id)
+    return resolve_cards(db, [ref for ref in ranked if ref[0] == "ready-made"], limit)
 
 @router.get("/{product_id}", response_model=ReadyMadeProductResponse)
-async def get_ready_made_product(product_id: int, db: Session = Depends(get_db)):
+async def get_ready_made_product(product_id: int, db: Session = Depends(get_read_db)):
     product = db.query(ReadyMadeProduct).filter(ReadyMadeProduct.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    record_view("ready-made", product_id)
     return product
 
 @router.post("", response_model=ReadyMadeProductResponse)
@@ -66,6 +91,9 @@ async def create_ready_made_product(
     )
 
     db.add(product)
+    db.flush()
+    record_opening(db, "ready-made", product.id, stock)
+    invalidate(db, CATALOG, catalog_key("ready-made", product.id))
     db.commit()
     db.refresh(product)
     return product
@@ -108,6 +136,7 @@ async def update_ready_made_product(
     if size is not None:
         product.size = size
     if stock is not None:
+        set_stock(db, "ready-made", product.id, stock)
         product.stock = stock
 
     if colors is not None:
@@ -160,6 +189,7 @@ async def update_ready_made_product(
     product.images = current_images
     # ─────────────────────────────────────────────────────────────────────────
 
+    invalidate(db, CATALOG, catalog_key("ready-made", product.id))
     db.commit()
     db.refresh(product)
     return product
@@ -176,5 +206,6 @@ async def delete_ready_made_product(
 
     delete_multiple_files_local(product.images)
     db.delete(product)
+    invalidate(db, CATALOG, catalog_key("ready-made", product.id))
     db.commit()
     return {"message": "Product deleted successfully"}
\ No newline at end of file
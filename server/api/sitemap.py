@@ -0,0 +1,207 @@
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from xml.sax.saxutils import escape
+import json
+import logging
+import os
+import threading
+import time
+
+from database import get_db
+from models import ReadyMadeProduct, NewCollectionProduct, WaistCoatProduct, Fabric
+from cache_invalidation import register, CATALOG
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+FRONTEND_URL = os.getenv("FRONTEND_URL", "https://shopdarven.pk").rstrip("/")
+SITEMAP_CACHE_DIR = os.getenv("SITEMAP_CACHE_DIR", os.path.join("cache", "sitemap"))
+# Crawlers hitting the endpoints inside this window are served straight from disk
+SITEMAP_TTL_SECONDS = int(os.getenv("SITEMAP_TTL_SECONDS", "300"))
+# Timestamps are taken before commit, so a row can become visible after a
+# newer one has moved the watermark past it; every refresh re-reads this window
+SITEMAP_WATERMARK_LAG_SECONDS = int(os.getenv("SITEMAP_WATERMARK_LAG_SECONDS", "300"))
+
+# (cache key, model, frontend path, price column, stock column)
+SOURCES = [
+    ("ready-made", ReadyMadeProduct, "ready-made", "price", "stock"),
+    ("new-collection", NewCollectionProduct, "new-collection", "price", "stock"),
+    ("waist-coat", WaistCoatProduct, "waist-coat", "price", "stock"),
+    ("fabric", Fabric, "fabric", "price_per_meter", "stock_meters"),
+]
+
+SITEMAP_FILE = "sitemap.xml"
+FEED_FILE = "products.xml"
+
+_refresh_lock = threading.Lock()
+# Files written before the last catalog change are stale regardless of the TTL
+_catalog_changed_at = 0.0
+
+
+def _on_catalog_change(key: Optional[str]):
+    global _catalog_changed_at
+    _catalog_changed_at = time.time()
+
+
+register(CATALOG, _on_catalog_change)
+
+
+def _state_path(key: str) -> str:
+    return os.path.join(SITEMAP_CACHE_DIR, f"{key}.json")
+
+
+def _load_state(key: str) -> dict:
+    try:
+        with open(_state_path(key)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"watermark": None, "entries": {}}
+
+
+def _write_atomic(path: str, content: str):
+    # Other workers may be reading the file; swap it in with a rename
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def _refresh_source(db: Session, key: str, model, path: str, price_column: str, stock_column: str) -> dict:
+    """Merge rows changed since the stored watermark into the cached entries"""
+    state = _load_state(key)
+    entries: Dict[str, dict] = state["entries"]
+    watermark = state["watermark"]
+
+    # Primary key only: cheap way to notice deleted products
+    live_ids = {str(row_id) for row_id in db.execute(select(model.id)).scalars()}
+    for stale_id in set(entries) - live_ids:
+        del entries[stale_id]
+
+    stmt = select(
+        model.id, model.name, model.description, model.images,
+        getattr(model, price_column).label("price"),
+        getattr(model, stock_column).label("stock"),
+        model.created_at, model.updated_at,
+    )
+    if watermark:
+        since = datetime.fromisoformat(watermark) - timedelta(seconds=SITEMAP_WATERMARK_LAG_SECONDS)
+        stmt = stmt.where(or_(model.created_at >= since, model.updated_at >= since))
+
+    changed = 0
+    for row in db.execute(stmt):
+        lastmod = _isoformat(row.updated_at or row.created_at)
+        entries[str(row.id)] = {
+            "loc": f"{FRONTEND_URL}/{path}/{row.id}",
+            "lastmod": lastmod,
+            "title": row.name,
+            "description": row.description or "",
+            "image": (row.images or [None])[0],
+            "price": row.price or 0,
+            "in_stock": (row.stock or 0) > 0,
+        }
+        if lastmod and (watermark is None or lastmod > watermark):
+            watermark = lastmod
+        changed += 1
+
+    state = {"watermark": watermark, "entries": entries}
+    _write_atomic(_state_path(key), json.dumps(state))
+    logger.info(f"Sitemap source {key}: {changed} changed, {len(entries)} total")
+    return state
+
+
+def _render_sitemap(states: Dict[str, dict]) -> str:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for state in states.values():
+        for entry in state["entries"].values():
+            lines.append(f"<url><loc>{escape(entry['loc'])}</loc>")
+            if entry["lastmod"]:
+                lines.append(f"<lastmod>{entry['lastmod']}</lastmod>")
+            lines.append("<changefreq>weekly</changefreq><priority>0.7</priority></url>")
+    lines.append("</urlset>")
+    return "\n".join(lines)
+
+
+def _render_feed(states: Dict[str, dict]) -> str:
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0">',
+        "<channel>",
+        "<title>Darven</title>",
+        f"<link>{escape(FRONTEND_URL)}</link>",
+        "<description>Premium Kurta Pajama &amp; Shalwar Kameez</description>",
+    ]
+    for key, state in states.items():
+        for entry_id, entry in state["entries"].items():
+            lines.append("<item>")
+            lines.append(f"<g:id>{escape(key)}-{entry_id}</g:id>")
+            lines.append(f"<g:title>{escape(entry['title'] or '')}</g:title>")
+            lines.append(f"<g:description>{escape(entry['description'])}</g:description>")
+            lines.append(f"<g:link>{escape(entry['loc'])}</g:link>")
+            if entry["image"]:
+                lines.append(f"<g:image_link>{escape(entry['image'])}</g:image_link>")
+            lines.append(f"<g:price>{entry['price']:.2f} PKR</g:price>")
+            lines.append(f"<g:availability>{'in_stock' if entry['in_stock'] else 'out_of_stock'}</g:availability>")
+            lines.append("<g:condition>new</g:condition>")
+            lines.append("<g:brand>Darven</g:brand>")
+            lines.append("</item>")
+    lines.append("</channel>")
+    lines.append("</rss>")
+    return "\n".join(lines)
+
+
+def _is_fresh(path: str) -> bool:
+    try:
+        modified = os.path.getmtime(path)
+    except OSError:
+        return False
+    return modified > _catalog_changed_at and time.time() - modified < SITEMAP_TTL_SECONDS
+
+
+def ensure_feeds(db: Session) -> None:
+    """Regenerate the cached sitemap and feed files if they are older than the TTL.
+    Blocking (database reads, file writes, a thread lock): call it in a threadpool."""
+    sitemap_path = os.path.join(SITEMAP_CACHE_DIR, SITEMAP_FILE)
+    if _is_fresh(sitemap_path):
+        return
+
+    with _refresh_lock:
+        # Another request may have refreshed while we waited for the lock
+        if _is_fresh(sitemap_path):
+            return
+        os.makedirs(SITEMAP_CACHE_DIR, exist_ok=True)
+        states = {
+            key: _refresh_source(db, key, model, path, price_column, stock_column)
+            for key, model, path, price_column, stock_column in SOURCES
+        }
+        _write_atomic(os.path.join(SITEMAP_CACHE_DIR, FEED_FILE), _render_feed(states))
+        _write_atomic(sitemap_path, _render_sitemap(states))
+
+
+@router.get("/sitemap.xml")
+async def get_sitemap(db: Session = Depends(get_db)):
+    """Sitemap of every product and fabric detail page"""
+    await run_in_threadpool(ensure_feeds, db)
+    return FileResponse(os.path.join(SITEMAP_CACHE_DIR, SITEMAP_FILE), media_type="application/xml")
+
+
+@router.get("/feeds/products.xml")
+async def get_product_feed(db: Session = Depends(get_db)):
+    """Google Merchant style RSS product feed"""
+    await run_in_threadpool(ensure_feeds, db)
+    return FileResponse(os.path.join(SITEMAP_CACHE_DIR, FEED_FILE), media_type="application/xml")
@@ -1,21 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from database import get_db
+from database import get_db, get_read_db
 from models import KameezSize, ShalwarSize, PajamaSize, Admin, SizeType
 from schemas import (
     KameezSizeCreate, KameezSizeResponse,
     ShalwarSizeCreate, ShalwarSizeResponse,
     PajamaSizeCreate, PajamaSizeResponse,
-    UserMeasurements, SizeRecommendation
+    UserMeasurements, SizeRecommendation,
+    BatchSizeRequest, BatchSizeRecommendation
 )
 from auth import get_current_admin
+from size_recommender import load_chart, recommend
+from cache_invalidation import invalidate, SIZE_CHART
 
 router = APIRouter()
 
 # Kameez Size Endpoints
 @router.get("/kameez", response_model=List[KameezSizeResponse])
-async def get_kameez_sizes(db: Session = Depends(get_db)):
+async def get_kameez_sizes(db: Session = Depends(get_read_db)):
     """Get all Kameez sizes"""
     sizes = db.query(KameezSize).order_by(
         db.query(KameezSize).filter(KameezSize.size == SizeType.XS).exists(),
@@ -27,7 +30,7 @@ async def get_kameez_sizes(db: Session = Depends(get_db)):
     return sizes
 
 @router.get("/kameez/{size}", response_model=KameezSizeResponse)
-async def get_kameez_size(size: str, db: Session = Depends(get_db)):
+async def get_kameez_size(size: str, db: Session = Depends(get_read_db)):
     """Get specific Kameez size by size code"""
     try:
         size_enum = SizeType[size.upper()]
@@ -70,6 +73,7 @@ async def create_kameez_size(
     )
     
     db.add(new_size)
+    invalidate(db, SIZE_CHART)
     db.commit()
     db.refresh(new_size)
     return new_size
@@ -101,6 +105,7 @@ async def update_kameez_size(
     existing.sleeves = size_data.sleeves
     existing.length = size_data.length
     
+    invalidate(db, SIZE_CHART)
     db.commit()
     db.refresh(existing)
     return existing
@@ -122,18 +127,19 @@ async def delete_kameez_size(
         raise HTTPException(status_code=404, detail="Size not found")
     
     db.delete(existing)
+    invalidate(db, SIZE_CHART)
     db.commit()
     return {"message": "Size deleted successfully"}
 
 # Shalwar Size Endpoints
 @router.get("/shalwar", response_model=List[ShalwarSizeResponse])
-async def get_shalwar_sizes(db: Session = Depends(get_db)):
+async def get_shalwar_sizes(db: Session = Depends(get_read_db)):
     """Get all Shalwar sizes"""
     sizes = db.query(ShalwarSize).order_by(ShalwarSize.id).all()
     return sizes
 
 @router.get("/shalwar/{size}", response_model=ShalwarSizeResponse)
-async def get_shalwar_size(size: str, db: Session = Depends(get_db)):
+async def get_shalwar_size(size: str, db: Session = Depends(get_read_db)):
     """Get specific Shalwar size by size code"""
     try:
         size_enum = SizeType[size.upper()]
@@ -172,6 +178,7 @@ async def create_shalwar_size(
     )
     
     db.add(new_size)
+    invalidate(db, SIZE_CHART)
     db.commit()
     db.refresh(new_size)
     return new_size
@@ -199,6 +206,7 @@ async def update_shalwar_size(
     
     existing.length = size_data.length
     
+    invalidate(db, SIZE_CHART)
     db.commit()
     db.refresh(existing)
     return existing
@@ -220,18 +228,19 @@ async def delete_shalwar_size(
         raise HTTPException(status_code=404, detail="Size not found")
     
     db.delete(existing)
+    invalidate(db, SIZE_CHART)
     db.commit()
     return {"message": "Size deleted successfully"}
 
 # Pajama Size Endpoints
 @router.get("/pajama", response_model=List[PajamaSizeResponse])
-async def get_pajama_sizes(db: Session = Depends(get_db)):
+async def get_pajama_sizes(db: Session = Depends(get_read_db)):
     """Get all Pajama sizes"""
     sizes = db.query(PajamaSize).order_by(PajamaSize.id).all()
     return sizes
 
 @router.get("/pajama/{size}", response_model=PajamaSizeResponse)
-async def get_pajama_size(size: str, db: Session = Depends(get_db)):
+async def get_pajama_size(size: str, db: Session = Depends(get_read_db)):
     """Get specific Pajama size by size code"""
     try:
         size_enum = SizeType[size.upper()]
@@ -272,6 +281,7 @@ async def create_pajama_size(
     )
     
     db.add(new_size)
+    invalidate(db, SIZE_CHART)
     db.commit()
     db.refresh(new_size)
     return new_size
@@ -301,6 +311,7 @@ async def update_pajama_size(
     existing.waist = size_data.waist
     existing.hips = size_data.hips
     
+    invalidate(db, SIZE_CHART)
     db.commit()
     db.refresh(existing)
     return existing
@@ -322,77 +333,58 @@ async def delete_pajama_size(
         raise HTTPException(status_code=404, detail="Size not found")
     
     db.delete(existing)
+    invalidate(db, SIZE_CHART)
     db.commit()
     return {"message": "Size deleted successfully"}
 
 # Size Recommendation
+def _to_size_recommendation(garments: dict) -> Optional[dict]:
+    if not garments:
+        return None
+    primary = next(iter(garments.values()))
+    return {
+        "recommended_size": primary["recommended_size"],
+        "confidence": primary["confidence"],
+        "measurements": primary["measurements"],
+        "notes": primary["notes"],
+        "garments": garments
+    }
+
 @router.post("/recommend", response_model=SizeRecommendation)
 async def recommend_size(
     measurements: UserMeasurements,
     db: Session = Depends(get_db)
 ):
     """Get size recommendation based on user measurements"""
-    kameez_sizes = db.query(KameezSize).all()
-    
-    if not kameez_sizes:
+    chart = load_chart(db)
+    if chart.empty:
         raise HTTPException(status_code=404, detail="No size data available")
     
-    best_match = None
-    best_score = float('inf')
-    
-    # Calculate best fit based on measurements
-    for size in kameez_sizes:
-        score = 0
-        count = 0
-        
-        if measurements.collar:
-            score += abs(size.collar - measurements.collar)
-            count += 1
-        if measurements.shoulder:
-            score += abs(size.shoulder - measurements.shoulder)
-            count += 1
-        if measurements.chest:
-            score += abs(size.chest - measurements.chest)
-            count += 1
-        if measurements.sleeves:
-            score += abs(size.sleeves - measurements.sleeves)
-            count += 1
-        if measurements.length:
-            score += abs(size.length - measurements.length)
-            count += 1
-        
-        if count > 0:
-            avg_score = score / count
-            if avg_score < best_score:
-                best_score = avg_score
-                best_match = size
-    
-    if not best_match:
+    recommendation = _to_size_recommendation(recommend(chart, [measurements])[0])
+    if not recommendation:
         raise HTTPException(status_code=400, detail="Please provide at least one measurement")
     
-    # Determine confidence level
-    if best_score < 0.5:
-        confidence = "perfect"
-        notes = ["This size is an excellent match for your measurements!"]
-    elif best_score < 1.5:
-        confidence = "good"
-        notes = ["This size should fit you well.", "Minor adjustments may be needed."]
-    else:
-        confidence = "consider_custom"
-        notes = ["Your measurements fall between standard sizes.", "Consider our custom stitching service for the perfect fit."]
+    return recommendation
+
+@router.post("/recommend/batch", response_model=List[BatchSizeRecommendation])
+async def recommend_sizes_batch(
+    request: BatchSizeRequest,
+    db: Session = Depends(get_db)
+):
+    """Get size recommendations for many customers (e.g. a wholesale order) in one call"""
+    chart = load_chart(db)
+    if chart.empty:
+        raise HTTPException(status_code=404, detail="No size data available")
     
-    return {
-        "recommended_size": best_match.size.value,
-        "confidence": confidence,
-        "measurements": {
-            "collar": best_match.collar,
-            "shoulder": best_match.shoulder,
-            "chest": best_match.chest,
-            "sleeves": best_match.sleeves,
-            "length": best_match.length
-        },
-        "notes": notes
-    }
+    results = []
+    for customer, garments in zip(request.customers, recommend(chart, request.customers)):
+        recommendation = _to_size_recommendation(garments)
+        results.append({
+            "reference": customer.reference,
+            "recommendation": recommendation,
+            "error": None if recommendation else "Please provide at least one measurement"
+        })
+    return results
 
 # Utility endpoint for unit conversion
 @router.get("/convert")
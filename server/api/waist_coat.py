@@ -1,28 +1,42 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
 import json
 from uuid import uuid4
 
-from database import get_db
+from database import get_db, get_read_db
 from models import WaistCoatProduct, Admin
 from schemas import ReadyMadeProductResponse
 from auth import get_current_admin
+from projections import project_list, fast_list, PRODUCT_CARD_FIELDS
+from counters import record_view, popularity
+from inventory import record_opening, set_stock
+from cache_invalidation import invalidate, catalog_key, CATALOG
 from file_utils import upload_file_local, delete_file_local, delete_multiple_files_local
 
 router = APIRouter()
 
 @router.get("", response_model=List[ReadyMadeProductResponse])
-async def get_waist_coat_products(db: Session = Depends(get_db)):
-    products = db.query(WaistCoatProduct).all()
-    return products
+async def get_waist_coat_products(
+    view: str = Query("full", pattern="^(full|card)$"),
+    fields: Optional[str] = Query(None, description="Comma separated list of fields to return"),
+    sort: str = Query("default", pattern="^(default|popular)$"),
+    db: Session = Depends(get_read_db)
+):
+    order_by = popularity(WaistCoatProduct, "waist-coat") if sort == "popular" else None
+    projected = project_list(db, WaistCoatProduct, ReadyMadeProductResponse, PRODUCT_CARD_FIELDS, view, fields, order_by)
+    if projected is not None:
+        return projected
+
+    return fast_list(db, WaistCoatProduct, ReadyMadeProductResponse, order_by=order_by)
 
 @router.get("/{product_id}", response_model=ReadyMadeProductResponse)
-async def get_waist_coat_product(product_id: int, db: Session = Depends(get_db)):
+async def get_waist_coat_product(product_id: int, db: Session = Depends(get_read_db)):
     product = db.query(WaistCoatProduct).filter(WaistCoatProduct.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    record_view("waist-coat", product_id)
     return product
 
 @router.post("", response_model=ReadyMadeProductResponse)
@@ -66,6 +80,9 @@ async def create_waist_coat_product(
     )
 
     db.add(product)
+    db.flush()
+    record_opening(db, "waist-coat", product.id, stock)
+    invalidate(db, CATALOG, catalog_key("waist-coat", product.id))
     db.commit()
     db.refresh(product)
     return product
@@ -105,6 +122,7 @@ async def update_waist_coat_product(
     if size is not None:
         product.size = size
     if stock is not None:
+        set_stock(db, "waist-coat", product.id, stock)
         product.stock = stock
 
     if colors is not None:
@@ -147,6 +165,7 @@ async def update_waist_coat_product(
 
     product.images = current_images
 
+    invalidate(db, CATALOG, catalog_key("waist-coat", product.id))
     db.commit()
     db.refresh(product)
     return product
@@ -163,5 +182,6 @@ async def delete_waist_coat_product(
 
     delete_multiple_files_local(product.images)
     db.delete(product)
+    invalidate(db, CATALOG, catalog_key("waist-coat", product.id))
     db.commit()
     return {"message": "Product deleted successfully"}
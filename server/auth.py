@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 import os
 from dotenv import load_dotenv
 
-from database import get_db
+from database import get_db, SessionLocal
 from models import Admin
 
 load_dotenv()
@@ -36,6 +36,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def decode_admin_token(token: str) -> Optional[str]:
+    """Username in a valid, unexpired token, or None; does not look the admin up"""
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+def admin_exists(username: str) -> bool:
+    """Whether an admin account still exists for a decoded token's username (blocking)"""
+    db = SessionLocal()
+    try:
+        return db.query(Admin.id).filter(Admin.username == username).first() is not None
+    finally:
+        db.close()
+
 def get_current_admin(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
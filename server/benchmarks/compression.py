@@ -0,0 +1,126 @@
+"""
+Benchmark: bytes on the wire and CPU cost of compressing catalog responses.
+
+Builds the real /ready-made and /fabrics list bodies from an in-memory SQLite
+database, then pushes each one through CompressionMiddleware for every
+encoding/level combination and reports compressed size and CPU per response.
+
+Usage (from the server directory):
+    python benchmarks/compression.py --items 500 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import ReadyMadeProduct, Fabric
+from schemas import ReadyMadeProductResponse, FabricResponse
+from projections import fast_list, project_list, PRODUCT_CARD_FIELDS
+from compression import CompressionMiddleware, brotli
+from serialization import seed
+
+
+def seed_fabrics(db, items: int):
+    db.bulk_save_objects([
+        Fabric(
+            name=f"Wash & Wear {i}",
+            description="Easy-care wash and wear fabric for everyday shalwar kameez. " * 6,
+            price_per_meter=900 + i,
+            material="Wash & Wear",
+            fabric_category="wash-n-wear",
+            colors=["white", "grey", "black"],
+            images=[f"https://api.shopdarven.pk/uploads/fabrics/{i}-{n}.jpg" for n in range(3)],
+            stock_meters=120,
+        )
+        for i in range(items)
+    ])
+    db.commit()
+
+
+def run_once(middleware_config: dict, encoding: str, body: bytes):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    middleware = CompressionMiddleware(app, **middleware_config)
+    scope = {
+        "type": "http",
+        "path": "/ready-made",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    asyncio.run(middleware(scope, receive, send))
+    return sum(len(m.get("body", b"")) for m in sent if m["type"] == "http.response.body")
+
+
+def measure(body: bytes, encoding: str, config: dict, repeat: int):
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        start = time.process_time()
+        size = run_once(config, encoding, body)
+        samples.append(time.process_time() - start)
+    samples.sort()
+    return {
+        "bytes": size,
+        "ratio": round(size / len(body), 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, args.items)
+    seed_fabrics(db, args.items)
+
+    bodies = {
+        "ready-made": fast_list(db, ReadyMadeProduct, ReadyMadeProductResponse).body,
+        "ready-made?view=card": project_list(db, ReadyMadeProduct, ReadyMadeProductResponse, PRODUCT_CARD_FIELDS, "card", None).body,
+        "fabrics": fast_list(db, Fabric, FabricResponse).body,
+    }
+    db.close()
+
+    variants = [("identity", "identity", {})]
+    variants += [(f"gzip-{level}", "gzip", {"gzip_level": level}) for level in (1, 5, 9)]
+    if brotli is not None:
+        variants += [(f"br-{quality}", "br", {"brotli_quality": quality}) for quality in (1, 4, 8, 11)]
+
+    results = {}
+    for endpoint, body in bodies.items():
+        results[endpoint] = {
+            name: measure(body, encoding, dict(config, minimum_size=0), args.repeat)
+            for name, encoding, config in variants
+        }
+
+    print(json.dumps({"items": args.items, "repeat": args.repeat, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
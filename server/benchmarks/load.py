@@ -0,0 +1,383 @@
+"""
+Load test: throughput and latency percentiles of the main API endpoints.
+
+Seeds a scratch database with the size charts and custom fabrics from the
+seed_*.py scripts plus generated products and orders, starts the API under
+uvicorn against it (or targets --base-url), then drives each scenario with
+--concurrency clients for --requests requests and prints one JSON document:
+
+    {"meta": {...}, "results": {"catalog_list": {"rps": ..., "p50_ms": ..., ...}}}
+
+Runs are reproducible: data and request mixes come from --seed, and the git
+revision is recorded so results can be compared across commits.
+
+Usage (from the server directory; the database is created and filled):
+    python benchmarks/load.py --database-url sqlite:///bench.db --seed-data
+    python benchmarks/load.py --database-url postgresql://postgres:pw@localhost/darven_bench \\
+        --seed-data --products 5000 --orders 20000 --concurrency 32 --workers 4 > results.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+import httpx
+
+SIZES = ["XS", "S", "M", "L", "XL"]
+CITIES = [("Karachi", "Sindh"), ("Lahore", "Punjab"), ("Islamabad", "Islamabad"), ("Peshawar", "Khyber Pakhtunkhwa")]
+MATERIALS = ["Cotton", "Lawn", "Khaddar", "Linen", "Wash & Wear", "Boski"]
+
+
+# ── Seeding ───────────────────────────────────────────────────────────────────
+
+def seed_database(products: int, orders: int, rng: random.Random) -> Dict[str, int]:
+    """Fill the database DATABASE_URL points at; returns row counts"""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import insert, select
+    from database import SessionLocal
+    from models import ReadyMadeProduct, NewCollectionProduct, WaistCoatProduct, Fabric, Order, OrderLineItem, OrderStatus
+    from order_items import line_item_rows
+    import seed_sizes
+    import seed_pajama_sizes
+    import seed_custom_fabrics
+
+    command.upgrade(Config(os.path.join(SERVER_DIR, "alembic.ini")), "head")
+    seed_sizes.seed_sizes()
+    seed_pajama_sizes.seed_pajama_sizes()
+    seed_custom_fabrics.seed_custom_fabrics()
+
+    # Stock is large enough that order creation never runs out mid-run
+    garment_models = [ReadyMadeProduct, NewCollectionProduct, WaistCoatProduct]
+    db = SessionLocal()
+    try:
+        per_type = max(products // 4, 1)
+        for model in garment_models:
+            db.execute(insert(model), [
+                {
+                    "name": f"{model.__name__} {i}",
+                    "description": "Premium kurta with embroidered collar and cuffs. " * rng.randint(2, 8),
+                    "price": float(rng.randrange(2500, 15000, 50)),
+                    "material": rng.choice(MATERIALS),
+                    "fabric_category": rng.choice(MATERIALS).lower(),
+                    "size": ",".join(SIZES),
+                    "colors": rng.sample(["white", "black", "navy", "grey", "olive", "maroon"], 3),
+                    "images": [f"https://api.shopdarven.pk/uploads/ready-made/{i}-{n}.jpg" for n in range(rng.randint(1, 5))],
+                    "stock": 1_000_000,
+                }
+                for i in range(per_type)
+            ])
+        db.execute(insert(Fabric), [
+            {
+                "name": f"Fabric {i}",
+                "description": "Easy-care fabric for everyday shalwar kameez. " * rng.randint(2, 6),
+                "price_per_meter": float(rng.randrange(500, 3000, 25)),
+                "material": rng.choice(MATERIALS),
+                "fabric_category": rng.choice(MATERIALS).lower(),
+                "colors": rng.sample(["white", "black", "navy", "grey", "olive", "maroon"], 3),
+                "images": [f"https://api.shopdarven.pk/uploads/fabrics/{i}.jpg"],
+                "stock_meters": 1_000_000.0,
+            }
+            for i in range(per_type)
+        ])
+        db.commit()
+
+        catalog = db.execute(select(ReadyMadeProduct.id, ReadyMadeProduct.name, ReadyMadeProduct.price)).all()
+        now = datetime.now(timezone.utc)
+        statuses = [OrderStatus.PENDING, OrderStatus.COMPLETED, OrderStatus.COMPLETED, OrderStatus.CANCELLED]
+        for start in range(0, orders, 1000):
+            batch = []
+            for i in range(start, min(start + 1000, orders)):
+                lines = [_order_line(rng.choice(catalog), rng) for _ in range(rng.randint(1, 4))]
+                subtotal = sum(line["price"] * line["quantity"] for line in lines)
+                city, state = rng.choice(CITIES)
+                batch.append({
+                    "customer_name": f"Customer {i}",
+                    "phone": "03001234567",
+                    "address": "House 1, Street 2, Block 3",
+                    "postal_code": "75500",
+                    "city": city,
+                    "state": state,
+                    "items": lines,
+                    "subtotal": subtotal,
+                    "delivery_charges": 200.0,
+                    "total": subtotal + 200.0,
+                    "status": rng.choice(statuses),
+                    "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                })
+            order_ids = db.execute(insert(Order).returning(Order.id, sort_by_parameter_order=True), batch).scalars().all()
+            rows = [row for order_id, order in zip(order_ids, batch) for row in line_item_rows(order_id, order["items"])]
+            db.execute(insert(OrderLineItem), rows)
+            db.commit()
+        return {"products": per_type * 4, "orders": orders}
+    finally:
+        db.close()
+
+
+def _order_line(product, rng: random.Random) -> dict:
+    product_id, name, price = product
+    size = rng.choice(SIZES)
+    return {
+        "id": f"ready-made-{product_id}-{size}",
+        "type": "ready-made",
+        "name": name,
+        "price": price,
+        "quantity": rng.randint(1, 3),
+        "image": "",
+        "details": {"size": size},
+    }
+
+
+# ── Server ────────────────────────────────────────────────────────────────────
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(database_url: str, workers: int, upload_dir: str) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        UPLOAD_DIR=upload_dir,
+        # Background jobs would compete with the measured requests
+        RANKINGS_REFRESH_SECONDS="0",
+        LOW_STOCK_SCAN_SECONDS="0",
+        RESERVATION_SWEEP_SECONDS="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        cwd=SERVER_DIR, env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"API server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("API server did not become healthy within 60 s")
+
+
+# ── Scenarios ─────────────────────────────────────────────────────────────────
+
+def _jpeg(rng: random.Random) -> bytes:
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 1000), tuple(rng.randrange(256) for _ in range(3))).save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def build_scenarios(client_state: dict, rng: random.Random) -> Dict[str, Callable[[], dict]]:
+    """name -> function returning httpx request arguments for one request"""
+    product_ids = client_state["product_ids"]
+    admin = {"Authorization": f"Bearer {client_state['token']}"}
+    image = _jpeg(rng)
+
+    def order():
+        product_id, price = rng.choice(product_ids)
+        size = rng.choice(SIZES)
+        quantity = rng.randint(1, 2)
+        city, state = rng.choice(CITIES)
+        return {"method": "POST", "url": "/orders", "json": {
+            "customer_name": "Load Test", "phone": "03001234567", "address": "House 1",
+            "postal_code": "75500", "city": city, "state": state,
+            "items": [{"id": f"ready-made-{product_id}-{size}", "type": "ready-made", "name": "Kurta",
+                       "price": price, "quantity": quantity, "image": "", "details": {"size": size}}],
+            "subtotal": price * quantity, "delivery_charges": 200.0, "total": price * quantity + 200.0,
+        }}
+
+    def upload():
+        return {"method": "POST", "url": "/ready-made", "headers": admin,
+                "data": {"name": "Load test kurta", "description": "Uploaded by the load test", "price": "4500",
+                         "material": "Cotton", "size": "M", "stock": "10"},
+                "files": [("files", ("kurta.jpg", image, "image/jpeg"))]}
+
+    return {
+        "catalog_list": lambda: {"method": "GET", "url": rng.choice(["/ready-made", "/new-collection", "/waist-coat", "/fabrics"])},
+        "catalog_cards": lambda: {"method": "GET", "url": "/ready-made", "params": {"view": "card"}},
+        "product_detail": lambda: {"method": "GET", "url": f"/ready-made/{rng.choice(product_ids)[0]}"},
+        "order_create": order,
+        "admin_revenue": lambda: {"method": "GET", "url": "/admin/revenue", "headers": admin},
+        "size_recommend": lambda: {"method": "POST", "url": "/sizes/recommend", "json": {
+            "chest": round(rng.uniform(20, 28), 1), "shoulder": round(rng.uniform(16, 21), 1),
+            "kameez_length": round(rng.uniform(38, 45), 1), "unit": "inches"}},
+        "upload": upload,
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def run_scenario(base_url: str, make_request: Callable[[], dict], requests: int, concurrency: int, warmup: int) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        for _ in range(warmup):
+            await client.request(**make_request())
+
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                arguments = make_request()
+                started = time.perf_counter()
+                try:
+                    response = await client.request(**arguments)
+                    await response.aread()
+                    status = str(response.status_code)
+                except httpx.HTTPError:
+                    status = "error"
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == "error" or status[0] == "5" or status[0] == "4":
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _login(base_url: str) -> str:
+    credentials = {"username": os.getenv("ADMIN_USERNAME", "admin"), "password": os.getenv("ADMIN_PASSWORD", "admin123")}
+    response = httpx.post(f"{base_url}/admin/login", json=credentials, timeout=30)
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="scratch database to seed and serve from (required unless --base-url)")
+    parser.add_argument("--base-url", help="benchmark an already running API instead of starting one")
+    parser.add_argument("--seed-data", action="store_true", help="create tables and seed before the run")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--scenarios", default="all", help="comma separated names, or 'all'")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when starting the API")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for data and request mixes")
+    args = parser.parse_args()
+
+    if not args.base_url and not args.database_url:
+        parser.error("--database-url is required unless --base-url points at a running API")
+    if args.database_url:
+        # The API runs from the server directory, so relative SQLite paths are pinned here
+        if args.database_url.startswith("sqlite:///") and not args.database_url.startswith("sqlite:////"):
+            args.database_url = "sqlite:///" + os.path.abspath(args.database_url[len("sqlite:///"):])
+        # database.py reads DATABASE_URL at import
+        os.environ["DATABASE_URL"] = args.database_url
+
+    rng = random.Random(args.seed)
+    meta = {
+        "git_revision": _git_revision(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "workers": args.workers,
+        "seed": args.seed,
+    }
+
+    if args.seed_data:
+        started = time.perf_counter()
+        # The seed scripts print progress; stdout carries only the JSON result
+        with contextlib.redirect_stdout(sys.stderr):
+            meta["seeded"] = seed_database(args.products, args.orders, rng)
+        meta["seed_seconds"] = round(time.perf_counter() - started, 2)
+        print(f"Seeded {meta['seeded']} in {meta['seed_seconds']} s", file=sys.stderr)
+
+    server = None
+    upload_dir = tempfile.mkdtemp(prefix="darven-bench-uploads-")
+    try:
+        base_url = args.base_url
+        if base_url is None:
+            server, base_url = start_server(args.database_url, args.workers, upload_dir)
+
+        products = httpx.get(f"{base_url}/ready-made", timeout=60).json()
+        state = {"token": _login(base_url), "product_ids": [(product["id"], product["price"]) for product in products]}
+        if not state["product_ids"]:
+            raise SystemExit("The catalog is empty; run with --seed-data first")
+
+        scenarios = build_scenarios(state, rng)
+        selected = list(scenarios) if args.scenarios == "all" else [name.strip() for name in args.scenarios.split(",")]
+        unknown = [name for name in selected if name not in scenarios]
+        if unknown:
+            parser.error(f"unknown scenarios {unknown}; choose from {list(scenarios)}")
+
+        results = {}
+        for name in selected:
+            results[name] = asyncio.run(run_scenario(base_url, scenarios[name], args.requests, args.concurrency, args.warmup))
+            summary = results[name]
+            print(
+                f"{name:16} {summary['rps']:>8} req/s  p50 {summary['p50_ms']:>8} ms  "
+                f"p99 {summary['p99_ms']:>8} ms  errors {summary['errors']}",
+                file=sys.stderr
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    print(json.dumps({"meta": meta, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
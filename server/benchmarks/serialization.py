@@ -0,0 +1,133 @@
+"""
+Microbenchmark: per-request CPU of list responses, ORM + Pydantic vs fast path.
+
+Seeds an in-memory SQLite database with N products and N orders, then times
+building the response body both ways:
+
+  * orm  - db.query(Model).all() -> Pydantic from_attributes -> stdlib JSON
+  * fast - core SELECT -> dict rows -> orjson (projections.fast_list)
+
+Usage (from the server directory):
+    python benchmarks/serialization.py --items 1000 --repeat 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import ReadyMadeProduct, Order, OrderStatus
+from schemas import ReadyMadeProductResponse, OrderResponse
+from projections import fast_list
+
+
+def seed(db, items: int):
+    now = datetime.utcnow()
+    db.bulk_save_objects([
+        ReadyMadeProduct(
+            name=f"Kurta {i}",
+            description="Premium cotton kurta with embroidered collar. " * 8,
+            price=3500 + i,
+            material="Cotton",
+            fabric_category="cotton",
+            size="S,M,L,XL",
+            colors=["white", "black", "navy"],
+            images=[f"https://api.shopdarven.pk/uploads/ready-made/{i}-{n}.jpg" for n in range(4)],
+            stock=i % 20,
+            created_at=now,
+        )
+        for i in range(items)
+    ])
+    db.bulk_save_objects([
+        Order(
+            customer_name=f"Customer {i}",
+            phone="03001234567",
+            address="House 1, Street 2, Block 3",
+            postal_code="75500",
+            city="Karachi",
+            state="Sindh",
+            items=[{"id": str(i), "type": "ready-made", "name": f"Kurta {i}", "price": 3500.0, "quantity": 2, "image": ""}],
+            subtotal=7000,
+            delivery_charges=200,
+            total=7200,
+            status=OrderStatus.PENDING,
+            created_at=now,
+        )
+        for i in range(items)
+    ])
+    db.commit()
+
+
+def orm_path(db, model, schema, order_by):
+    rows = db.query(model).order_by(order_by).all()
+    adapter = TypeAdapter(List[schema])
+    content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    return JSONResponse(content=content).body
+
+
+def fast_path(db, model, schema, order_by):
+    return fast_list(db, model, schema, order_by=order_by).body
+
+
+def measure(fn, session_factory, repeat: int, *args):
+    samples = []
+    body = b""
+    for _ in range(repeat):
+        # A fresh session per iteration mirrors one request / one get_db()
+        db = session_factory()
+        start = time.process_time()
+        body = fn(db, *args)
+        samples.append(time.process_time() - start)
+        db.close()
+    samples.sort()
+    return {
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    db = session_factory()
+    seed(db, args.items)
+    db.close()
+
+    targets = {
+        "ready-made": (ReadyMadeProduct, ReadyMadeProductResponse, ReadyMadeProduct.id),
+        "orders": (Order, OrderResponse, Order.created_at.desc()),
+    }
+    results = {}
+    for name, (model, schema, order_by) in targets.items():
+        orm = measure(orm_path, session_factory, args.repeat, model, schema, order_by)
+        fast = measure(fast_path, session_factory, args.repeat, model, schema, order_by)
+        results[name] = {
+            "orm": orm,
+            "fast": fast,
+            "speedup": round(orm["mean_ms"] / fast["mean_ms"], 2) if fast["mean_ms"] else None,
+        }
+
+    print(json.dumps({"items": args.items, "repeat": args.repeat, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
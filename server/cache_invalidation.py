@@ -0,0 +1,69 @@
+"""
+Cross-worker cache invalidation.
+
+Admin handlers call `invalidate(db, cache, key)` before committing a change;
+once the transaction commits, every worker evicts the affected entries from
+its in-process caches through the event bus (events.py). The writing worker
+evicts right on commit, so the admin's next request already sees the change.
+
+Caches register an evictor at import time:
+    register(SIZE_CHART, lambda key: invalidate_chart())
+An evictor receives the changed key, or None when the whole cache is stale.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+import events
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+# Cache names
+CATALOG = "catalog"  # key: "<product type>:<id>"
+LANDING = "landing"
+SIZE_CHART = "size_chart"
+DELIVERY_RULES = "delivery_rules"
+
+Evictor = Callable[[Optional[str]], None]
+
+_evictors: Dict[str, List[Evictor]] = defaultdict(list)
+
+
+def register(cache: str, evict: Evictor):
+    _evictors[cache].append(evict)
+
+
+def invalidate(db: Session, cache: str, key: Optional[str] = None):
+    """Evict `key` (or all of `cache`) on every worker once `db` commits"""
+    events.publish(db, CHANNEL, {"cache": cache, "key": key}, deliver_locally=True)
+
+
+def catalog_key(product_type: str, product_id: int) -> str:
+    return f"{product_type}:{product_id}"
+
+
+def _evict(cache: str, key: Optional[str]):
+    for evict in list(_evictors.get(cache, ())):
+        try:
+            evict(key)
+        except Exception as e:
+            logger.error(f"Failed to evict {cache} cache: {str(e)}")
+
+
+def _on_event(payload: dict):
+    _evict(payload.get("cache"), payload.get("key"))
+
+
+def _evict_all():
+    # Events sent while this worker was not listening are lost
+    for cache in list(_evictors):
+        _evict(cache, None)
+
+
+events.add_listener(CHANNEL, _on_event)
+events.add_reconnect_listener(_evict_all)
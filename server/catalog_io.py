@@ -0,0 +1,449 @@
+"""
+Bulk catalog import and export.
+
+One CSV covers every catalog type, one product per row:
+    product_type     ready-made | new-collection | waist-coat | fabric
+    name, description, material, fabric_category
+    price            per piece, or per meter for fabric
+    size             required except for fabric
+    colors           "Black|Navy" (a JSON array is accepted too)
+    stock            units, or meters for fabric
+    images           "|"-separated paths inside the images ZIP, or existing
+                     image URLs, which are kept as they are
+
+Import streams the CSV row by row and validates each row. Every
+IMPORT_CHUNK_SIZE valid rows, the chunk's images are read from the ZIP,
+verified and written to UPLOAD_DIR in parallel, then the products and their
+opening stock movements are bulk inserted in one transaction. A bad row or a
+failed chunk is reported and never aborts the rest of the import.
+
+Export streams a ZIP of catalog.csv plus the images it references, entry by
+entry, so the whole catalog is never held in memory and the archive can be
+imported again as is.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from PIL import Image
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, set_transaction_timeouts
+from models import ReadyMadeProduct, NewCollectionProduct, WaistCoatProduct, Fabric, StockMovement
+from file_utils import UPLOADS_DIR, get_file_url, delete_multiple_files_local
+from inventory import OPENING
+from cache_invalidation import invalidate, CATALOG
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = int(os.getenv("CATALOG_IMPORT_CHUNK_SIZE", "200"))
+IMPORT_IMAGE_WORKERS = int(os.getenv("CATALOG_IMPORT_IMAGE_WORKERS", "8"))
+IMPORT_MAX_IMAGE_BYTES = int(os.getenv("CATALOG_IMPORT_MAX_IMAGE_BYTES", str(10 * 1024 * 1024)))
+# Keeps the response bounded when a whole file is malformed
+IMPORT_MAX_REPORTED_ERRORS = 1000
+EXPORT_STREAM_BATCH = 500
+
+CSV_COLUMNS = ["product_type", "name", "description", "price", "material", "fabric_category", "size", "colors", "stock", "images"]
+REQUIRED_COLUMNS = ["product_type", "name", "description", "price", "material", "images"]
+CSV_NAME = "catalog.csv"
+LIST_SEPARATOR = "|"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+# product type -> (model, price column, stock column, upload folder)
+CATALOG_TYPES = {
+    "ready-made": (ReadyMadeProduct, "price", "stock", "ready-made"),
+    "new-collection": (NewCollectionProduct, "price", "stock", "new-collection"),
+    "waist-coat": (WaistCoatProduct, "price", "stock", "waist-coat"),
+    "fabric": (Fabric, "price_per_meter", "stock_meters", "fabrics"),
+}
+
+
+class CatalogFormatError(ValueError):
+    """The file as a whole cannot be imported (as opposed to a bad row)"""
+
+
+def _is_url(ref: str) -> bool:
+    return ref.startswith(("http://", "https://", "/uploads/"))
+
+
+def _split_list(value: str) -> List[str]:
+    value = (value or "").strip()
+    if value.startswith("["):
+        parsed = json.loads(value)
+        if not isinstance(parsed, list):
+            raise ValueError
+        return [str(item).strip() for item in parsed if str(item).strip()]
+    return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+
+
+def _number(row: dict, column: str, errors: List[str], default: Optional[float] = None) -> Optional[float]:
+    raw = (row.get(column) or "").strip()
+    if not raw:
+        if default is None:
+            errors.append(f"{column} is required")
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        errors.append(f"{column} must be a number")
+        return None
+    if value < 0:
+        errors.append(f"{column} cannot be negative")
+        return None
+    return value
+
+
+def parse_row(row: dict) -> Tuple[Optional[dict], List[str]]:
+    """Validate one CSV row; returns (parsed row, errors)"""
+    errors: List[str] = []
+    product_type = (row.get("product_type") or "").strip()
+    if product_type not in CATALOG_TYPES:
+        errors.append(f"product_type must be one of: {', '.join(CATALOG_TYPES)}")
+
+    text = {column: (row.get(column) or "").strip() for column in ("name", "description", "material", "fabric_category", "size")}
+    for column in ("name", "description", "material"):
+        if not text[column]:
+            errors.append(f"{column} is required")
+    if product_type != "fabric" and not text["size"]:
+        errors.append("size is required")
+
+    price = _number(row, "price", errors)
+    stock = _number(row, "stock", errors, default=0.0)
+    if stock is not None and product_type != "fabric" and not float(stock).is_integer():
+        errors.append("stock must be a whole number")
+
+    try:
+        colors = _split_list(row.get("colors"))
+    except ValueError:
+        errors.append("colors must be a |-separated list or a JSON array")
+        colors = []
+    try:
+        images = _split_list(row.get("images"))
+        if not images:
+            errors.append("at least one image is required")
+    except ValueError:
+        errors.append("images must be a |-separated list or a JSON array")
+
+    if errors:
+        return None, errors
+
+    _, price_column, stock_column, _ = CATALOG_TYPES[product_type]
+    values = {
+        "name": text["name"],
+        "description": text["description"],
+        "material": text["material"],
+        "fabric_category": text["fabric_category"] or None,
+        "colors": colors or None,
+        price_column: price,
+        stock_column: stock if product_type == "fabric" else int(stock),
+    }
+    if product_type != "fabric":
+        values["size"] = text["size"]
+    return {"product_type": product_type, "values": values, "images": images}, []
+
+
+def _store_image(archive: Optional[zipfile.ZipFile], ref: str, folder: str) -> str:
+    """Verify one image from the ZIP and write it to the uploads folder; returns its URL"""
+    if _is_url(ref):
+        return ref
+    if archive is None:
+        raise ValueError(f"{ref}: no images ZIP was uploaded")
+    try:
+        info = archive.getinfo(ref.lstrip("/"))
+    except KeyError:
+        raise ValueError(f"{ref}: not found in the images ZIP")
+
+    extension = os.path.splitext(info.filename)[1].lower()
+    if extension not in IMAGE_EXTENSIONS:
+        raise ValueError(f"{ref}: unsupported image type")
+    if info.file_size > IMPORT_MAX_IMAGE_BYTES:
+        raise ValueError(f"{ref}: image is larger than {IMPORT_MAX_IMAGE_BYTES} bytes")
+
+    data = archive.read(info)
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+    except Exception:
+        raise ValueError(f"{ref}: not a valid image")
+
+    folder_path = os.path.join(UPLOADS_DIR, folder)
+    os.makedirs(folder_path, exist_ok=True)
+    filename = f"{uuid4()}{extension}"
+    with open(os.path.join(folder_path, filename), "wb") as f:
+        f.write(data)
+    return get_file_url(f"uploads/{folder}/{filename}")
+
+
+def _stored_files(urls: List[str], refs: List[str]) -> List[str]:
+    # Only files this import wrote may be cleaned up, never pre-existing URLs
+    return [url for url, ref in zip(urls, refs) if url and not _is_url(ref)]
+
+
+def _store_chunk_images(pool: ThreadPoolExecutor, archive, chunk: List[dict]) -> List[Tuple[dict, List[str]]]:
+    """Store the images of every row in parallel; returns (row, errors) for rows that failed"""
+    futures = [
+        [pool.submit(_store_image, archive, ref, CATALOG_TYPES[row["product_type"]][3]) for ref in row["images"]]
+        for row in chunk
+    ]
+    failed = []
+    for row, row_futures in zip(chunk, futures):
+        urls, errors = [], []
+        for future in row_futures:
+            try:
+                urls.append(future.result())
+            except ValueError as e:
+                urls.append(None)
+                errors.append(str(e))
+        if errors:
+            delete_multiple_files_local(_stored_files(urls, row["images"]))
+            failed.append((row, errors))
+        else:
+            row["values"]["images"] = urls
+    return failed
+
+
+def _insert_chunk(db: Session, chunk: List[dict]) -> Dict[str, int]:
+    """Bulk insert one chunk of products and their opening stock; caller commits"""
+    by_type: Dict[str, List[dict]] = defaultdict(list)
+    for row in chunk:
+        by_type[row["product_type"]].append(row)
+
+    created = {}
+    movements = []
+    for product_type, rows in by_type.items():
+        model, _, stock_column, _ = CATALOG_TYPES[product_type]
+        ids = db.execute(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [row["values"] for row in rows]
+        ).scalars().all()
+        for product_id, row in zip(ids, rows):
+            stock = row["values"][stock_column]
+            if stock:
+                movements.append({
+                    "product_type": product_type,
+                    "product_id": product_id,
+                    "delta": stock,
+                    "balance": stock,
+                    "reason": OPENING,
+                })
+        created[product_type] = len(ids)
+
+    if movements:
+        db.execute(insert(StockMovement), movements)
+    invalidate(db, CATALOG)
+    return created
+
+
+def _open_csv(csv_file: Optional[IO[bytes]], archive: Optional[zipfile.ZipFile]) -> IO[str]:
+    if csv_file is None:
+        # An exported archive carries its own catalog.csv
+        if archive is None or CSV_NAME not in archive.namelist():
+            raise CatalogFormatError(f"Upload a CSV file or a ZIP containing {CSV_NAME}")
+        csv_file = archive.open(CSV_NAME)
+    return io.TextIOWrapper(csv_file, encoding="utf-8-sig", newline="")
+
+
+def import_catalog(
+    db: Session,
+    csv_file: Optional[IO[bytes]],
+    archive: Optional[zipfile.ZipFile] = None,
+    dry_run: bool = False
+) -> dict:
+    """
+    Import products from a CSV stream; see the module docstring for the format.
+
+    `dry_run` only validates the rows: images and the database are not touched.
+    """
+    reader = csv.DictReader(_open_csv(csv_file, archive))
+    try:
+        header = reader.fieldnames or []
+    except UnicodeDecodeError:
+        raise CatalogFormatError("CSV must be UTF-8 encoded")
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise CatalogFormatError(f"CSV is missing columns: {', '.join(missing)}")
+
+    report = {"created": 0, "failed": 0, "dry_run": dry_run, "created_by_type": defaultdict(int), "errors": []}
+
+    def fail(line: int, errors: List[str]):
+        report["failed"] += 1
+        if len(report["errors"]) < IMPORT_MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line, "errors": errors})
+
+    def flush(chunk: List[dict]):
+        if not chunk:
+            return
+        for row, errors in _store_chunk_images(pool, archive, chunk):
+            fail(row["line"], errors)
+        stored = [row for row in chunk if "images" in row["values"]]
+        if not stored:
+            return
+        try:
+            created = _insert_chunk(db, stored)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Catalog import chunk failed: {str(e)}")
+            for row in stored:
+                delete_multiple_files_local(_stored_files(row["values"]["images"], row["images"]))
+                fail(row["line"], [f"Database error: {str(e)}"])
+            return
+        for product_type, count in created.items():
+            report["created"] += count
+            report["created_by_type"][product_type] += count
+
+    with ThreadPoolExecutor(max_workers=IMPORT_IMAGE_WORKERS) as pool:
+        chunk: List[dict] = []
+        try:
+            for row in reader:
+                # Line of the row in the file, counting the header and quoted newlines
+                line = reader.line_num
+                if None in row:
+                    fail(line, ["row has more fields than the header"])
+                    continue
+                parsed, errors = parse_row(row)
+                if errors:
+                    fail(line, errors)
+                    continue
+                parsed["line"] = line
+                if dry_run:
+                    report["created"] += 1
+                    report["created_by_type"][parsed["product_type"]] += 1
+                    continue
+                chunk.append(parsed)
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    flush(chunk)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            fail(reader.line_num, [f"Unreadable CSV from this line on: {str(e)}"])
+        flush(chunk)
+
+    report["created_by_type"] = dict(report["created_by_type"])
+    report["errors"].sort(key=lambda error: error["line"])
+    logger.info(f"Catalog import: {report['created']} created, {report['failed']} failed (dry run: {dry_run})")
+    return report
+
+
+# ── Export ───────────────────────────────────────────────────────────────────
+
+class _StreamSink(io.RawIOBase):
+    """Write-only, non-seekable buffer that zipfile streams into"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _local_path(url: str) -> Optional[str]:
+    if "/uploads/" not in url:
+        return None
+    path = os.path.join(UPLOADS_DIR, url.split("/uploads/", 1)[1])
+    return path if os.path.isfile(path) else None
+
+
+def _archive_name(url: str) -> str:
+    return "images/" + url.split("/uploads/", 1)[1]
+
+
+def _catalog_rows(db: Session) -> Iterator[Tuple[str, object]]:
+    for product_type, (model, _, _, _) in CATALOG_TYPES.items():
+        stmt = select(model).order_by(model.id).execution_options(yield_per=EXPORT_STREAM_BATCH)
+        for product in db.scalars(stmt):
+            yield product_type, product
+
+
+def _csv_line(values: List) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _export_row(product_type: str, product, with_images: bool) -> Tuple[List, List[Tuple[str, str]]]:
+    _, price_column, stock_column, _ = CATALOG_TYPES[product_type]
+    refs, files = [], []
+    for url in product.images or []:
+        path = _local_path(url) if with_images else None
+        if path:
+            refs.append(_archive_name(url))
+            files.append((path, _archive_name(url)))
+        else:
+            refs.append(url)
+    values = [
+        product_type,
+        product.name,
+        product.description,
+        getattr(product, price_column),
+        product.material,
+        product.fabric_category or "",
+        getattr(product, "size", "") or "",
+        LIST_SEPARATOR.join(product.colors or []),
+        getattr(product, stock_column) or 0,
+        LIST_SEPARATOR.join(refs),
+    ]
+    return values, files
+
+
+def export_csv() -> Iterator[bytes]:
+    """Stream the catalog as CSV with image URLs"""
+    db = SessionLocal()
+    try:
+        # The client paces the cursor; a slow download must not trip the idle timeout
+        set_transaction_timeouts(db, idle_ms=0)
+        yield _csv_line(CSV_COLUMNS)
+        for product_type, product in _catalog_rows(db):
+            yield _csv_line(_export_row(product_type, product, with_images=False)[0])
+    finally:
+        db.close()
+
+
+def export_archive() -> Iterator[bytes]:
+    """Stream a ZIP of catalog.csv and every local image it references"""
+    # Own session: the response outlives the request's dependencies
+    db = SessionLocal()
+    sink = _StreamSink()
+    try:
+        set_transaction_timeouts(db, idle_ms=0)
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            files: Dict[str, str] = {}
+            with archive.open(CSV_NAME, "w", force_zip64=True) as entry:
+                entry.write(_csv_line(CSV_COLUMNS))
+                for count, (product_type, product) in enumerate(_catalog_rows(db), 1):
+                    values, row_files = _export_row(product_type, product, with_images=True)
+                    entry.write(_csv_line(values))
+                    files.update((name, path) for path, name in row_files)
+                    if count % EXPORT_STREAM_BATCH == 0:
+                        yield sink.drain()
+            yield sink.drain()
+
+            for name, path in files.items():
+                # Images are already compressed
+                archive.write(path, name, compress_type=zipfile.ZIP_STORED)
+                yield sink.drain()
+        yield sink.drain()
+    finally:
+        db.close()
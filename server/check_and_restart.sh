@@ -22,6 +22,10 @@ fi
 echo ""
 echo "=== To restart the server, run one of these commands: ==="
 echo ""
+echo "First, in every case, apply pending database migrations (workers refuse to"
+echo "start on an outdated schema):"
+echo "  source ../.venv/bin/activate && alembic upgrade head"
+echo ""
 echo "If using systemd service:"
 echo "  sudo systemctl restart darven-backend"
 echo "  sudo systemctl status darven-backend"
@@ -29,7 +33,7 @@ echo ""
 echo "If using screen:"
 echo "  screen -ls  # List screens"
 echo "  screen -r <session_name>  # Attach to session"
-echo "  # Then Ctrl+C and run: source ../.venv/bin/activate && python run.py"
+echo "  # Then Ctrl+C and run: source ../.venv/bin/activate && alembic upgrade head && python run.py"
 echo ""
 echo "If using PM2:"
 echo "  pm2 restart darven-backend"
@@ -37,5 +41,6 @@ echo "  pm2 logs darven-backend"
 echo ""
 echo "If running manually:"
 echo "  source ../.venv/bin/activate"
+echo "  alembic upgrade head"
 echo "  python run.py > server.log 2>&1 &"
 echo ""
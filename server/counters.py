@@ -0,0 +1,150 @@
+"""
+Buffered product view and add-to-cart counters.
+
+Page views are far too frequent for a database write each, so every worker
+accumulates increments in memory and a background task flushes them as one
+batched upsert every COUNTER_FLUSH_SECONDS (and once more at shutdown).
+Counts read from the database may therefore lag by one flush interval.
+
+Add-to-cart events come from an anonymous endpoint that doesn't load the
+product, so a flush drops increments for products that don't exist, and each
+worker buffers at most COUNTER_MAX_KEYS distinct products between flushes
+(increments for further products are dropped and counted).
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import ProductCounter
+from rankings import CATALOG
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FLUSH_SECONDS = int(os.getenv("COUNTER_FLUSH_SECONDS", "30"))
+# Distinct products one worker buffers between flushes
+COUNTER_MAX_KEYS = int(os.getenv("COUNTER_MAX_KEYS", "10000"))
+
+VIEWS = 0
+ADD_TO_CART = 1
+
+_buffer: Dict[Tuple[str, int], List[int]] = defaultdict(lambda: [0, 0])
+_buffer_lock = threading.Lock()
+_dropped = 0
+
+
+def _record(product_type: str, product_id: int, counter: int):
+    global _dropped
+    key = (product_type, product_id)
+    with _buffer_lock:
+        if key not in _buffer and len(_buffer) >= COUNTER_MAX_KEYS:
+            _dropped += 1
+            return
+        _buffer[key][counter] += 1
+
+
+def record_view(product_type: str, product_id: int):
+    _record(product_type, product_id, VIEWS)
+
+
+def record_add_to_cart(product_type: str, product_id: int):
+    _record(product_type, product_id, ADD_TO_CART)
+
+
+def _existing(db: Session, keys) -> set:
+    """The (product type, id) keys that name an existing catalog product"""
+    ids_by_type: Dict[str, set] = defaultdict(set)
+    for product_type, product_id in keys:
+        if product_type in CATALOG:
+            ids_by_type[product_type].add(product_id)
+    existing = set()
+    for product_type, ids in ids_by_type.items():
+        model = CATALOG[product_type][0]
+        existing.update((product_type, product_id) for product_id in db.execute(select(model.id).where(model.id.in_(ids))).scalars())
+    return existing
+
+
+def _upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(ProductCounter)
+    if dialect == "sqlite":
+        return sqlite.insert(ProductCounter)
+    raise RuntimeError(f"Unsupported database for counter upserts: {dialect}")
+
+
+def flush(db: Session) -> int:
+    """Write buffered increments in one upsert; returns the number of products touched"""
+    global _buffer, _dropped
+    with _buffer_lock:
+        pending, _buffer = _buffer, defaultdict(lambda: [0, 0])
+        dropped, _dropped = _dropped, 0
+    if dropped:
+        logger.warning(f"Dropped {dropped} counter increments: more than {COUNTER_MAX_KEYS} products buffered")
+    if not pending:
+        return 0
+
+    stmt = _upsert(db)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProductCounter.product_type, ProductCounter.product_id],
+        set_={
+            "views": ProductCounter.views + stmt.excluded.views,
+            "add_to_cart": ProductCounter.add_to_cart + stmt.excluded.add_to_cart,
+            "updated_at": func.now(),
+        }
+    )
+    try:
+        existing = _existing(db, pending)
+        rows = [
+            {"product_type": product_type, "product_id": product_id, "views": views, "add_to_cart": add_to_cart}
+            for (product_type, product_id), (views, add_to_cart) in pending.items()
+            if (product_type, product_id) in existing
+        ]
+        if rows:
+            db.execute(stmt, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        # Put the increments back so the next flush retries them
+        with _buffer_lock:
+            for key, (views, add_to_cart) in pending.items():
+                _buffer[key][VIEWS] += views
+                _buffer[key][ADD_TO_CART] += add_to_cart
+        raise
+    return len(rows)
+
+
+def flush_now() -> int:
+    db = SessionLocal()
+    try:
+        return flush(db)
+    finally:
+        db.close()
+
+
+def popularity(model, product_type: str):
+    """Order-by expression ranking `model` rows by view count, most viewed first"""
+    views = select(ProductCounter.views).where(
+        ProductCounter.product_type == product_type,
+        ProductCounter.product_id == model.id
+    ).scalar_subquery()
+    return func.coalesce(views, 0).desc()
+
+
+async def run_periodically():
+    """Background loop started on app startup"""
+    while True:
+        await asyncio.sleep(COUNTER_FLUSH_SECONDS)
+        try:
+            await run_in_threadpool(flush_now)
+        except Exception as e:
+            logger.error(f"Failed to flush product counters: {str(e)}")
@@ -0,0 +1,98 @@
+"""
+In-memory delivery rule lookup.
+
+Active rules are read once into dicts keyed by normalized city and state,
+so pricing a cart or an order needs no database query. Admin changes evict
+the table on every worker through cache_invalidation; DELIVERY_RULES_TTL_SECONDS
+bounds staleness if an invalidation event is ever missed.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from models import DeliveryRule
+from cache_invalidation import register, DELIVERY_RULES
+
+DELIVERY_RULES_TTL_SECONDS = int(os.getenv("DELIVERY_RULES_TTL_SECONDS", "60"))
+
+# Used when no rule matches and no default rule has been configured
+FALLBACK_RULE = {"base_charge": 200.0, "free_shipping_threshold": 10000.0, "per_meter_charge": 0.0}
+
+
+def normalize(name: Optional[str]) -> Optional[str]:
+    if not name or not name.strip():
+        return None
+    return " ".join(name.split()).lower()
+
+
+class RuleTable:
+    def __init__(self, rules):
+        self.by_city: Dict[str, dict] = {}
+        self.by_state: Dict[str, dict] = {}
+        self.default: dict = FALLBACK_RULE
+        self.loaded_at = time.monotonic()
+
+        for rule in rules:
+            entry = {
+                "base_charge": rule.base_charge or 0.0,
+                "free_shipping_threshold": rule.free_shipping_threshold,
+                "per_meter_charge": rule.per_meter_charge or 0.0,
+            }
+            city, state = normalize(rule.city), normalize(rule.state)
+            if city:
+                self.by_city[city] = entry
+            elif state:
+                self.by_state[state] = entry
+            else:
+                self.default = entry
+
+    def lookup(self, city: Optional[str], state: Optional[str]) -> dict:
+        return (
+            self.by_city.get(normalize(city) or "")
+            or self.by_state.get(normalize(state) or "")
+            or self.default
+        )
+
+
+_table: Optional[RuleTable] = None
+_table_lock = threading.Lock()
+
+
+def get_rules(db: Session) -> RuleTable:
+    global _table
+    table = _table
+    if table is not None and time.monotonic() - table.loaded_at < DELIVERY_RULES_TTL_SECONDS:
+        return table
+
+    with _table_lock:
+        if _table is None or time.monotonic() - _table.loaded_at >= DELIVERY_RULES_TTL_SECONDS:
+            rules = db.query(DeliveryRule).filter(DeliveryRule.is_active.is_(True)).order_by(DeliveryRule.id).all()
+            _table = RuleTable(rules)
+        return _table
+
+
+def invalidate_rules():
+    global _table
+    with _table_lock:
+        _table = None
+
+
+register(DELIVERY_RULES, lambda key: invalidate_rules())
+
+
+def delivery_charge(
+    db: Session,
+    city: Optional[str],
+    state: Optional[str],
+    order_value: float,
+    fabric_meters: float = 0.0
+) -> float:
+    rule = get_rules(db).lookup(city, state)
+    threshold = rule["free_shipping_threshold"]
+    if threshold is not None and order_value >= threshold:
+        return 0.0
+    return rule["base_charge"] + rule["per_meter_charge"] * fabric_meters
@@ -0,0 +1,241 @@
+"""
+Change-event bus shared by every request handler and uvicorn worker.
+
+Handlers call `publish(db, channel, payload)` inside their transaction and
+subscribers only hear about it once that transaction commits; a rolled back
+write publishes nothing.
+
+Two transports, picked with EVENT_BUS:
+- "postgres": the payload is sent with pg_notify() in the writer's own
+  transaction, and each worker keeps one LISTEN connection (in a background
+  thread) that fans notifications out to its local subscribers. Every worker,
+  including the one that made the change, receives the event.
+- "local": events are delivered in-process after commit. Used for SQLite,
+  tests and single-worker setups.
+The default is "postgres" for PostgreSQL databases and "local" otherwise.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import select
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUS = os.getenv("EVENT_BUS") or ("postgres" if engine.dialect.name == "postgresql" else "local")
+LISTEN_RECONNECT_SECONDS = float(os.getenv("EVENT_LISTEN_RECONNECT_SECONDS", "5"))
+
+# Channels double as LISTEN identifiers, so keep them to plain names
+CHANNEL_PATTERN = re.compile(r"^[a-z_][a-z0-9_]*$")
+# NOTIFY payloads are limited to 8000 bytes; publish summaries, not full rows
+MAX_PAYLOAD_BYTES = 7900
+
+_PENDING_KEY = "pending_events"
+
+Listener = Callable[[dict], None]
+
+_listeners: Dict[str, List[Listener]] = defaultdict(list)
+_reconnect_callbacks: List[Callable[[], None]] = []
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_pg_listener: Optional["_PostgresListener"] = None
+
+
+def add_listener(channel: str, callback: Listener):
+    """Call `callback(payload)` on the event loop for every event on `channel`"""
+    if not CHANNEL_PATTERN.match(channel):
+        raise ValueError(f"Invalid event channel name: {channel}")
+    _listeners[channel].append(callback)
+
+
+def remove_listener(channel: str, callback: Listener):
+    callbacks = _listeners.get(channel)
+    if callbacks and callback in callbacks:
+        callbacks.remove(callback)
+
+
+def add_reconnect_listener(callback: Callable[[], None]):
+    """Call `callback()` after the LISTEN connection comes back, since events may have been missed"""
+    _reconnect_callbacks.append(callback)
+
+
+def _resync():
+    for callback in list(_reconnect_callbacks):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"Event reconnect listener failed: {str(e)}")
+
+
+def _dispatch(channel: str, payload: dict):
+    for callback in list(_listeners.get(channel, ())):
+        try:
+            callback(payload)
+        except Exception as e:
+            logger.error(f"Event listener for {channel} failed: {str(e)}")
+
+
+def _on_loop_thread(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+def _deliver(channel: str, payload: dict):
+    # Commits in sync handlers and the LISTEN thread run off the event loop thread
+    loop = _loop
+    if loop is not None and loop.is_running() and not _on_loop_thread(loop):
+        loop.call_soon_threadsafe(_dispatch, channel, payload)
+    else:
+        _dispatch(channel, payload)
+
+
+def publish(db: Session, channel: str, payload: dict, deliver_locally: bool = False):
+    """
+    Queue an event that is delivered when `db` commits.
+
+    `deliver_locally` also hands the event to this process's subscribers right
+    on commit when the Postgres transport is used, so they see it before the
+    next request; they then get it a second time through LISTEN, so only use it
+    for idempotent listeners such as cache eviction.
+    """
+    if not CHANNEL_PATTERN.match(channel):
+        raise ValueError(f"Invalid event channel name: {channel}")
+    message = json.dumps(payload, default=str)
+    if len(message.encode("utf-8")) > MAX_PAYLOAD_BYTES:
+        raise ValueError(f"Event payload for {channel} is too large")
+
+    if EVENT_BUS == "postgres":
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": message})
+    if EVENT_BUS != "postgres" or deliver_locally:
+        # Round-trip through JSON so local subscribers see what Postgres would deliver
+        db.info.setdefault(_PENDING_KEY, []).append((channel, json.loads(message)))
+
+
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session: Session):
+    for channel, payload in session.info.pop(_PENDING_KEY, ()):
+        _deliver(channel, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+class Subscription:
+    """Bounded queue of the events of one channel, for a single consumer such as an SSE stream"""
+
+    def __init__(self, channel: str, maxsize: int = 100):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        add_listener(channel, self._put)
+
+    def _put(self, payload: dict):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # A stalled consumer must not grow memory without bound
+            logger.warning(f"Dropping {self.channel} event for a slow subscriber")
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next event, or None if nothing arrived within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        remove_listener(self.channel, self._put)
+
+
+class _PostgresListener(threading.Thread):
+    """One LISTEN connection per worker, outside the SQLAlchemy pool"""
+
+    def __init__(self):
+        super().__init__(name="event-listener", daemon=True)
+        self._stopped = threading.Event()
+        self._connected_before = False
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.error(f"Event listener connection lost: {str(e)}")
+            self._stopped.wait(LISTEN_RECONNECT_SECONDS)
+
+    def _resync(self):
+        loop = _loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(_resync)
+        else:
+            _resync()
+
+    def _listen(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        conn = psycopg2.connect(dsn)
+        try:
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            cursor = conn.cursor()
+            listening = set()
+            for channel in list(_listeners):
+                cursor.execute(f"LISTEN {channel}")
+                listening.add(channel)
+            if self._connected_before:
+                self._resync()
+            self._connected_before = True
+
+            while not self._stopped.is_set():
+                # Channels can gain their first listener after startup
+                for channel in set(_listeners) - listening:
+                    cursor.execute(f"LISTEN {channel}")
+                    listening.add(channel)
+
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        payload = json.loads(notify.payload)
+                    except ValueError:
+                        logger.warning(f"Ignoring malformed event on {notify.channel}")
+                        continue
+                    _deliver(notify.channel, payload)
+        finally:
+            conn.close()
+
+
+def start():
+    """Bind delivery to the running event loop; called on app startup"""
+    global _loop, _pg_listener
+    _loop = asyncio.get_running_loop()
+    if EVENT_BUS == "postgres" and _pg_listener is None:
+        _pg_listener = _PostgresListener()
+        _pg_listener.start()
+    logger.info(f"Event bus started ({EVENT_BUS})")
+
+
+def stop():
+    global _loop, _pg_listener
+    if _pg_listener is not None:
+        _pg_listener.stop()
+        _pg_listener = None
+    _loop = None
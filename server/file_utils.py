@@ -1,12 +1,17 @@
 import os
+import logging
 import aiofiles
 from uuid import uuid4
 from typing import Optional
 from fastapi import UploadFile
 from dotenv import load_dotenv
 
+from tracing import traced, annotate
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Local file storage configuration
 # Support both UPLOAD_DIR (production) and UPLOADS_DIR (local)
 UPLOADS_DIR = os.getenv("UPLOAD_DIR") or os.getenv("UPLOADS_DIR", "uploads")
@@ -18,6 +23,7 @@ def get_file_url(path: str) -> str:
     return f"{BASE_URL}/{path}"
 
 
+@traced("file.upload")
 async def upload_file_local(
     file: UploadFile,
     folder: str,
@@ -52,6 +58,7 @@ async def upload_file_local(
         
         async with aiofiles.open(file_path, 'wb') as f:
             await f.write(file_content)
+        annotate({"file.folder": folder, "file.size": len(file_content)})
         
         # Reset file pointer for potential reuse
         await file.seek(0)
@@ -63,6 +70,7 @@ async def upload_file_local(
         raise Exception(f"Failed to upload file: {str(e)}")
 
 
+@traced("file.delete")
 def delete_file_local(file_url: str) -> bool:
     """
     Delete file from local filesystem
@@ -90,6 +98,7 @@ def delete_file_local(file_url: str) -> bool:
         file_path = os.path.join(UPLOADS_DIR, relative_path)
         
         # Delete file if it exists
+        annotate({"file.path": relative_path})
         if os.path.exists(file_path):
             os.remove(file_path)
             return True
@@ -97,7 +106,7 @@ def delete_file_local(file_url: str) -> bool:
         return False
     
     except Exception as e:
-        print(f"Failed to delete file: {str(e)}")
+        logger.error(f"Failed to delete file {file_url}: {str(e)}")
         return False
 
 
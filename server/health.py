@@ -0,0 +1,152 @@
+"""
+Dependency checks behind the readiness probe (GET /health/ready).
+
+Each check keeps its last result for a short while (HEALTH_CACHE_SECONDS,
+HEALTH_SMTP_CACHE_SECONDS for the external SMTP server), and only one thread
+re-runs a stale check while the others answer with the previous result, so
+probes from several load balancers cost a handful of cheap operations per
+interval, not one per probe.
+
+A failing check in HEALTH_CRITICAL_CHECKS makes the worker unready (503);
+the others only mark it degraded. By default SMTP is not critical: the shop
+works without the contact form.
+"""
+
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from database import DATABASE_URL, ENGINES, PRIMARY, REPLICAS, DB_MAX_OVERFLOW, DB_POOL_SIZE, REPLICA_MAX_LAG_SECONDS, _connect_args
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+HEALTH_SMTP_CACHE_SECONDS = float(os.getenv("HEALTH_SMTP_CACHE_SECONDS", "60"))
+HEALTH_CRITICAL_CHECKS = {name.strip() for name in os.getenv("HEALTH_CRITICAL_CHECKS", "database,pool,disk").split(",") if name.strip()}
+# Unready once this share of the primary pool (size plus overflow) is checked out
+HEALTH_MAX_POOL_SATURATION = float(os.getenv("HEALTH_MAX_POOL_SATURATION", "1.0"))
+HEALTH_MIN_FREE_MB = float(os.getenv("HEALTH_MIN_FREE_MB", "500"))  # Free space required under UPLOAD_DIR
+HEALTH_SMTP_TIMEOUT = float(os.getenv("HEALTH_SMTP_TIMEOUT", "3"))
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR") or os.getenv("UPLOADS_DIR", "uploads")
+
+OK = "ok"
+FAIL = "fail"
+SKIPPED = "skipped"
+
+Outcome = Tuple[str, dict]
+
+# Outside the pool, so an exhausted pool can't hang the connectivity check and
+# the check doesn't take a connection from requests; at most one connection
+# every HEALTH_CACHE_SECONDS per worker
+_probe_engine = create_engine(DATABASE_URL, poolclass=NullPool, connect_args=_connect_args(DATABASE_URL))
+
+
+def check_database() -> Outcome:
+    started = time.perf_counter()
+    with _probe_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return OK, {"latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+def check_pool() -> Outcome:
+    capacity = DB_POOL_SIZE + max(DB_MAX_OVERFLOW, 0)
+    pools = {}
+    for name, bound in ENGINES.items():
+        checked_out = bound.pool.checkedout()
+        pools[name] = {"checked_out": checked_out, "saturation": round(checked_out / capacity, 3) if capacity else 0.0}
+    status = FAIL if pools[PRIMARY]["saturation"] >= HEALTH_MAX_POOL_SATURATION else OK
+    return status, {"capacity": capacity, "pools": pools}
+
+
+def check_replicas() -> Outcome:
+    if not REPLICAS:
+        return SKIPPED, {"reason": "no replicas configured"}
+    # Lag as last measured by the read routing; reads fall back to the primary
+    lags = {replica.name: replica.lag for replica in REPLICAS}
+    usable = [name for name, lag in lags.items() if lag <= REPLICA_MAX_LAG_SECONDS]
+    return (OK if usable else FAIL), {"lag_seconds": {name: (lag if lag != float("inf") else None) for name, lag in lags.items()}}
+
+
+def check_disk() -> Outcome:
+    usage = shutil.disk_usage(UPLOAD_DIR)
+    free_mb = usage.free / (1024 * 1024)
+    return (OK if free_mb >= HEALTH_MIN_FREE_MB else FAIL), {
+        "free_mb": round(free_mb),
+        "total_mb": round(usage.total / (1024 * 1024)),
+    }
+
+
+def check_smtp() -> Outcome:
+    # Same settings as the contact form (api/contact.py)
+    host = os.getenv("SMTP_HOST", os.getenv("SMTP_SERVER", "smtp.gmail.com"))
+    port = int(os.getenv("SMTP_PORT", "587"))
+    if not os.getenv("SMTP_USER", os.getenv("SMTP_EMAIL")):
+        return SKIPPED, {"reason": "SMTP credentials not configured"}
+    started = time.perf_counter()
+    with socket.create_connection((host, port), timeout=HEALTH_SMTP_TIMEOUT) as sock:
+        sock.settimeout(HEALTH_SMTP_TIMEOUT)
+        greeting = sock.recv(512)
+    if not greeting.startswith(b"220"):
+        return FAIL, {"reason": "unexpected greeting"}
+    return OK, {"latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+class Check:
+    """A dependency check whose result is reused for `ttl` seconds"""
+
+    def __init__(self, name: str, function: Callable[[], Outcome], ttl: float = HEALTH_CACHE_SECONDS):
+        self.name = name
+        self.function = function
+        self.ttl = ttl
+        self.critical = name in HEALTH_CRITICAL_CHECKS
+        self.result: Optional[dict] = None
+        self.checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _run(self) -> dict:
+        try:
+            status, detail = self.function()
+        except Exception as e:
+            # Probes are unauthenticated: the type only, the message goes to the log
+            logger.warning(f"Health check {self.name} failed: {str(e)}")
+            status, detail = FAIL, {"error": type(e).__name__}
+        if status == FAIL and (self.result is None or self.result["status"] != FAIL):
+            logger.warning(f"Health check {self.name} is failing: {detail}")
+        return {"status": status, "critical": self.critical, **detail}
+
+    def get(self) -> dict:
+        # The first caller runs it; later ones go by the last result while one thread refreshes it
+        if time.monotonic() - self.checked_at >= self.ttl:
+            if self._lock.acquire(blocking=self.result is None):
+                try:
+                    if time.monotonic() - self.checked_at >= self.ttl:
+                        self.result = self._run()
+                        self.checked_at = time.monotonic()
+                finally:
+                    self._lock.release()
+        return {**self.result, "age_seconds": round(time.monotonic() - self.checked_at, 1)}
+
+
+CHECKS: List[Check] = [
+    Check("database", check_database),
+    Check("pool", check_pool),
+    Check("replicas", check_replicas),
+    Check("disk", check_disk),
+    Check("smtp", check_smtp, HEALTH_SMTP_CACHE_SECONDS),
+]
+
+
+def summarize(results: Dict[str, dict]) -> str:
+    """ready, degraded (a non-critical check failed) or unready (a critical one did)"""
+    failed = [result for result in results.values() if result["status"] == FAIL]
+    if any(result["critical"] for result in failed):
+        return "unready"
+    return "degraded" if failed else "ready"
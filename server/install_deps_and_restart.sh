@@ -17,16 +17,20 @@ pip install email-validator
 echo "3. Installing pydantic[email]..."
 pip install 'pydantic[email]'
 
+# Apply pending schema migrations once, before any worker starts
+echo "4. Migrating database..."
+alembic upgrade head || { echo "ERROR: Database migration failed!"; exit 1; }
+
 # Start the server
-echo "4. Starting server..."
+echo "5. Starting server..."
 nohup uvicorn main:app --host 0.0.0.0 --port 8000 --workers 4 > server.log 2>&1 &
 
 # Wait for server to start
-echo "5. Waiting for server to start..."
+echo "6. Waiting for server to start..."
 sleep 5
 
 # Check if server is running
-echo "6. Testing server..."
+echo "7. Testing server..."
 if curl -f http://localhost:8000/health > /dev/null 2>&1; then
     echo "✓ Server is running successfully!"
     echo ""
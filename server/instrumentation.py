@@ -0,0 +1,137 @@
+"""
+Request timing and database query instrumentation.
+
+MetricsMiddleware times every request and records its status, response size
+and route template (never the raw path, which would explode label
+cardinality). SQLAlchemy cursor hooks on every engine count statements and DB
+time into a per-request RequestStats held in a contextvar, which also spots
+N+1 patterns: the same statement run N_PLUS_ONE_THRESHOLD or more times in
+one request. Everything is exported by GET /metrics (api/metrics.py).
+"""
+
+import logging
+import os
+import time
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database import ENGINES
+from metrics import Counter, Gauge, Histogram, SIZE_BUCKETS, COUNT_BUCKETS
+from request_context import RequestStats, _current, current_stats  # noqa: F401 (re-exported)
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+METRICS_EXCLUDE_PATHS = tuple(
+    path.strip()
+    for path in os.getenv("METRICS_EXCLUDE_PATHS", "/metrics").split(",")
+    if path.strip()
+)
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served", ("method",))
+HTTP_RESPONSE_SIZE = Histogram("http_response_size_bytes", "HTTP response body size as sent", ("route",), SIZE_BUCKETS)
+DB_QUERIES = Histogram("db_queries_per_request", "SQL statements executed per request", ("route",), COUNT_BUCKETS)
+DB_TIME = Histogram("db_time_per_request_seconds", "Time spent in SQL statements per request", ("route",))
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "SQL statement latency")
+N_PLUS_ONE = Counter("db_n_plus_one_requests_total", "Requests that repeated one statement N_PLUS_ONE_THRESHOLD+ times", ("route",))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        stats.statements[statement] += 1
+
+
+def _handle_error(context):
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+for _bound in ENGINES.values():
+    event.listen(_bound, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_bound, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_bound, "handle_error", _handle_error)
+
+
+def route_label(scope: Scope, status: int) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    if status == 404:
+        return "unmatched"
+    # Mounted apps such as /uploads have no route object; label by mount point
+    return "/" + scope["path"].lstrip("/").split("/", 1)[0]
+
+
+def _check_n_plus_one(stats: RequestStats, route: str):
+    if not stats.statements:
+        return
+    statement, count = stats.statements.most_common(1)[0]
+    if count >= N_PLUS_ONE_THRESHOLD:
+        N_PLUS_ONE.inc((route,))
+        logger.warning(
+            f"Possible N+1 in {stats.method} {route}: statement ran {count} times: "
+            f"{' '.join(statement.split())[:200]}"
+        )
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses pass through untouched"""
+
+    def __init__(self, app: ASGIApp, exclude_paths=METRICS_EXCLUDE_PATHS):
+        self.app = app
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats(method, scope["path"], scope)
+        token = _current.set(stats)
+        status = 500
+        size = 0
+        event_stream = False
+
+        async def send_wrapper(message: Message):
+            nonlocal status, size, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-type" and value.startswith(b"text/event-stream"):
+                        event_stream = True
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec((method,))
+            _current.reset(token)
+
+            route = route_label(scope, status)
+            HTTP_REQUESTS.inc((method, route, str(status)))
+            # An event stream lasts as long as the client stays connected
+            if not event_stream:
+                HTTP_DURATION.observe(elapsed, (method, route))
+            HTTP_RESPONSE_SIZE.observe(size, (route,))
+            DB_QUERIES.observe(stats.queries, (route,))
+            DB_TIME.observe(stats.db_time, (route,))
+            _check_n_plus_one(stats, route)
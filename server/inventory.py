@@ -0,0 +1,250 @@
+"""
+Inventory ledger and low-stock alerts.
+
+Every stock change (admin adjustment, order, cancellation) appends a row to
+`stock_movements` in the same transaction that updates the product's stock
+column, so the stock column is the materialized balance of the ledger.
+
+The low-stock scan keeps a cursor on the ledger id and only re-checks
+products that moved since its last run, never the full ledger. Ids are
+handed out before commit, so a movement committed late can have an id below
+the cursor; each scan re-reads LOW_STOCK_RESCAN_MARGIN ids below it to pick
+those up (re-checking a product is harmless).
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import (
+    ReadyMadeProduct, NewCollectionProduct, WaistCoatProduct, Fabric,
+    OrderLineItem, StockMovement, LowStockThreshold, StockAlert, JobCursor
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOW_STOCK_THRESHOLD = float(os.getenv("DEFAULT_LOW_STOCK_THRESHOLD", "3"))
+LOW_STOCK_SCAN_SECONDS = int(os.getenv("LOW_STOCK_SCAN_SECONDS", "300"))
+LOW_STOCK_CURSOR = "low_stock_scan"
+# Ledger ids below the cursor re-read by every scan, for late commits
+LOW_STOCK_RESCAN_MARGIN = int(os.getenv("LOW_STOCK_RESCAN_MARGIN", "1000"))
+
+OPENING = "opening"
+ADJUSTMENT = "adjustment"
+ORDER = "order"
+CANCELLATION = "cancellation"
+
+# product type -> (model, stock column)
+STOCKED_TYPES = {
+    "ready-made": (ReadyMadeProduct, "stock"),
+    "new-collection": (NewCollectionProduct, "stock"),
+    "waist-coat": (WaistCoatProduct, "stock"),
+    "fabric": (Fabric, "stock_meters"),
+}
+
+
+def record_opening(db: Session, product_type: str, product_id: int, stock):
+    """Log the stock a new product was created with; caller commits"""
+    if not stock:
+        return
+    db.add(StockMovement(
+        product_type=product_type,
+        product_id=product_id,
+        delta=stock,
+        balance=stock,
+        reason=OPENING
+    ))
+
+
+def set_stock(db: Session, product_type: str, product_id: int, new_stock, reason: str = ADJUSTMENT):
+    """
+    Set the stock an admin entered and log the difference; caller commits.
+
+    The row is locked before the old value is read, so an order applied
+    concurrently (apply_movement) can't land between the read and the write
+    and be lost from the delta.
+    """
+    model, stock_column = STOCKED_TYPES[product_type]
+    column = getattr(model, stock_column)
+    old_stock = db.execute(select(column).where(model.id == product_id).with_for_update()).scalar()
+    db.execute(update(model).where(model.id == product_id).values({stock_column: new_stock}))
+    delta = (new_stock or 0) - (old_stock or 0)
+    if delta == 0:
+        return
+    db.add(StockMovement(
+        product_type=product_type,
+        product_id=product_id,
+        delta=delta,
+        balance=new_stock,
+        reason=reason
+    ))
+
+
+def apply_movement(db: Session, product_type: str, product_id: int, delta: float, reason: str, order_id: Optional[int] = None):
+    """Change stock atomically in SQL and append the movement; caller commits"""
+    model, stock_column = STOCKED_TYPES[product_type]
+    column = getattr(model, stock_column)
+    balance = db.execute(
+        update(model)
+        .where(model.id == product_id)
+        .values({stock_column: func.coalesce(column, 0) + delta})
+        .returning(column)
+    ).scalar()
+    if balance is None:
+        # Product deleted since the order was placed; nothing to move
+        return
+    db.execute(insert(StockMovement).values(
+        product_type=product_type,
+        product_id=product_id,
+        delta=delta,
+        balance=balance,
+        reason=reason,
+        order_id=order_id
+    ))
+
+
+def _order_quantities(db: Session, order_id: int) -> Dict[Tuple[str, int], float]:
+    quantities: Dict[Tuple[str, int], float] = defaultdict(float)
+    rows = db.execute(
+        select(OrderLineItem.product_type, OrderLineItem.product_id, OrderLineItem.quantity, OrderLineItem.details)
+        .where(OrderLineItem.order_id == order_id)
+    )
+    for product_type, product_id, quantity, details in rows:
+        if product_type not in STOCKED_TYPES or product_id is None:
+            continue
+        amount = float(quantity or 0)
+        if product_type == "fabric":
+            try:
+                amount *= float((details or {}).get("length") or 0)
+            except (TypeError, ValueError):
+                amount = 0.0
+        if amount < 0:
+            # A negative line would turn a sale into a restock (and back on cancellation)
+            logger.warning(f"Order {order_id}: ignoring negative quantity for {product_type} {product_id}")
+            continue
+        quantities[(product_type, product_id)] += amount
+    return quantities
+
+
+def apply_order(db: Session, order_id: int, reason: str):
+    """Take (order) or return (cancellation) the stock of every line of an order; caller commits"""
+    sign = 1 if reason == CANCELLATION else -1
+    for (product_type, product_id), amount in sorted(_order_quantities(db, order_id).items()):
+        if amount > 0:
+            apply_movement(db, product_type, product_id, sign * amount, reason, order_id)
+
+
+def current_stock(db: Session, product_type: str, product_id: int) -> Optional[float]:
+    model, stock_column = STOCKED_TYPES[product_type]
+    return db.execute(select(getattr(model, stock_column)).where(model.id == product_id)).scalar()
+
+
+def ledger_balance(db: Session, product_type: str, product_id: int) -> float:
+    return db.execute(
+        select(func.coalesce(func.sum(StockMovement.delta), 0)).where(
+            StockMovement.product_type == product_type,
+            StockMovement.product_id == product_id
+        )
+    ).scalar()
+
+
+def _evaluate(db: Session, product_type: str, product_id: int, threshold: float, alert: Optional[StockAlert]) -> Optional[dict]:
+    """Open or resolve the alert of one product; returns the alert raised, if any"""
+    stock = current_stock(db, product_type, product_id)
+    if stock is not None and stock <= threshold:
+        if alert is None:
+            db.add(StockAlert(product_type=product_type, product_id=product_id, stock=stock, threshold=threshold))
+            logger.warning(f"Low stock: {product_type} {product_id} has {stock} left (threshold {threshold})")
+            return {"product_type": product_type, "product_id": product_id, "stock": stock, "threshold": threshold}
+    elif alert is not None:
+        alert.resolved_at = func.now()
+    return None
+
+
+def check_product(db: Session, product_type: str, product_id: int, threshold: float) -> Optional[dict]:
+    """Re-check one product right away, e.g. after its threshold changed; caller commits"""
+    alert = db.query(StockAlert).filter(
+        StockAlert.product_type == product_type,
+        StockAlert.product_id == product_id,
+        StockAlert.resolved_at.is_(None)
+    ).first()
+    return _evaluate(db, product_type, product_id, threshold, alert)
+
+
+def _create_cursor(db: Session, name: str):
+    """Insert a job cursor at 0 unless another worker already did"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(JobCursor)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(JobCursor)
+    else:
+        raise RuntimeError(f"Unsupported database for job cursors: {dialect}")
+    db.execute(stmt.values(name=name, position=0).on_conflict_do_nothing(index_elements=[JobCursor.name]))
+
+
+def scan_low_stock(db: Session) -> List[dict]:
+    """Raise/resolve alerts for products that moved since the last scan"""
+    _create_cursor(db, LOW_STOCK_CURSOR)
+    cursor = db.query(JobCursor).filter(JobCursor.name == LOW_STOCK_CURSOR).with_for_update().one()
+
+    moved = db.execute(
+        select(StockMovement.product_type, StockMovement.product_id, func.max(StockMovement.id))
+        .where(StockMovement.id > cursor.position - LOW_STOCK_RESCAN_MARGIN)
+        .group_by(StockMovement.product_type, StockMovement.product_id)
+    ).all()
+    if not moved:
+        db.commit()
+        return []
+
+    product_ids = {product_id for _, product_id, _ in moved}
+    thresholds = {
+        (row.product_type, row.product_id): row.threshold
+        for row in db.query(LowStockThreshold).filter(LowStockThreshold.product_id.in_(product_ids))
+    }
+    open_alerts = {
+        (alert.product_type, alert.product_id): alert
+        for alert in db.query(StockAlert).filter(
+            StockAlert.resolved_at.is_(None),
+            StockAlert.product_id.in_(product_ids)
+        )
+    }
+
+    raised = []
+    for product_type, product_id, _ in moved:
+        if product_type not in STOCKED_TYPES:
+            continue
+        key = (product_type, product_id)
+        alert = _evaluate(db, product_type, product_id, thresholds.get(key, DEFAULT_LOW_STOCK_THRESHOLD), open_alerts.get(key))
+        if alert:
+            raised.append(alert)
+
+    cursor.position = max(cursor.position, max(last_id for _, _, last_id in moved))
+    db.commit()
+    return raised
+
+
+def _scan_once():
+    db = SessionLocal()
+    try:
+        scan_low_stock(db)
+    finally:
+        db.close()
+
+
+async def run_periodically():
+    """Background loop started on app startup"""
+    while True:
+        await asyncio.sleep(LOW_STOCK_SCAN_SECONDS)
+        try:
+            await run_in_threadpool(_scan_once)
+        except Exception as e:
+            logger.error(f"Low stock scan failed: {str(e)}")
@@ -0,0 +1,192 @@
+"""
+Logging setup: JSON lines written off the request path.
+
+configure_logging() replaces the root handlers with a QueueHandler, so a log
+call only builds the record and puts it on a bounded queue; a QueueListener
+thread formats and writes it to stderr. When the queue is full records are
+dropped (and counted) rather than blocking the event loop.
+
+Each line is one JSON object:
+
+    {"ts": "...", "level": "INFO", "logger": "api.orders", "message": "...",
+     "request_id": "...", "trace_id": "...", ...}
+
+request_id comes from RequestIdMiddleware (request_context.py), trace_id from
+the current span when tracing is on; fields passed with `extra={...}` are
+included as they are.
+
+LOG_SAMPLE_RATES keeps only a fraction of the records below WARNING from hot
+loggers, e.g. "uvicorn.access=0.1,instrumentation=0.05" (a rate applies to the
+logger and its children). LOG_FORMAT=text restores the plain format for
+local development.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from typing import Dict, Optional
+
+from metrics import Counter
+from request_context import current_request_id
+from tracing import current_span
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").strip().lower()  # json | text
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+# Loggers that install their own handlers; routed through the queue instead
+ADOPTED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+LOGS_DROPPED = Counter("log_records_dropped_total", "Log records dropped because the log queue was full")
+LOGS_SAMPLED_OUT = Counter("log_records_sampled_out_total", "Log records skipped by LOG_SAMPLE_RATES", ("logger",))
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+_OWN_FIELDS = {"request_id", "trace_id"}
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the request and trace ids; runs in the caller's thread, where the contextvars are set"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = current_request_id()
+        current = current_span()
+        record.trace_id = current.trace_id if current is not None else None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the sub-WARNING records of the configured loggers"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, Optional[str]] = {}
+
+    def _rule(self, name: str) -> Optional[str]:
+        # Most specific configured ancestor of the logger, resolved once per logger
+        if name not in self._resolved:
+            candidate = name
+            while candidate and candidate not in self.rates:
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = candidate or None
+        return self._resolved[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rule = self._rule(record.name)
+        if rule is None or random.random() < self.rates[rule]:
+            return True
+        LOGS_SAMPLED_OUT.inc((rule,))
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking or erroring when the queue is full"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here, keep the record structured
+        # for the formatter on the listener side
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOGS_DROPPED.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("request_id", "trace_id"):
+            value = getattr(record, key, None)
+            if value:
+                data[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and key not in _OWN_FIELDS:
+                data[key] = value
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = record.stack_info
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = "-"
+        return super().format(record)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging():
+    """Route all logging through the queue; safe to call more than once"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else _TextFormatter(TEXT_FORMAT))
+
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max(LOG_QUEUE_SIZE, 1))
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES)))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+
+    for name in ADOPTED_LOGGERS:
+        adopted = logging.getLogger(name)
+        adopted.handlers.clear()
+        adopted.propagate = True
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+
+def shutdown():
+    """Write out the queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
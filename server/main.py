@@ -2,38 +2,41 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from api import new_collection
+import asyncio
 import os
 import logging
-import traceback
 
-from api import admin, landing, ready_made, fabrics, custom, orders, sizes, contact, waist_coat
-from database import engine, Base
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from api import admin, landing, ready_made, fabrics, custom, orders, sizes, contact, waist_coat, sitemap, products, cart, delivery, inventory, catalog, metrics, profiling, health
+from database import engine
+from compression import CompressionMiddleware
+from instrumentation import MetricsMiddleware
+from tracing import TracingMiddleware, shutdown as shutdown_tracing
+from profiling import ProfilingMiddleware
+from request_context import RequestIdMiddleware
+from logging_config import configure_logging
+import rankings
+import counters
+import inventory as stock_ledger
+import reservations
+import events
+from schema_version import check_schema_version
+
+# JSON log lines, written by a background thread until exit (logging_config.py)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Create database tables
-try:
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables created successfully")
-except Exception as e:
-    logger.error(f"Failed to create database tables: {str(e)}")
-    logger.error(traceback.format_exc())
-
 app = FastAPI(title="Darven API", version="1.0.0")
 
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Global exception handler caught: {str(exc)}")
-    logger.error(f"Request URL: {request.url}")
-    logger.error(f"Request method: {request.method}")
-    logger.error(traceback.format_exc())
+    logger.error(
+        f"Global exception handler caught: {str(exc)}",
+        exc_info=exc,
+        extra={"method": request.method, "url": str(request.url)},
+    )
 
     return JSONResponse(
         status_code=500,
@@ -65,6 +68,21 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Compress JSON/XML responses; uploaded images are served as-is
+app.add_middleware(CompressionMiddleware)
+
+# Outside compression, so latency and response sizes include it
+app.add_middleware(MetricsMiddleware)
+
+# Request spans enclose everything above, including metrics bookkeeping
+app.add_middleware(TracingMiddleware)
+
+# Admin requests sent with "X-Profile: 1" are profiled end to end
+app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so every log line of a request carries its id
+app.add_middleware(RequestIdMiddleware)
+
 # ── Upload directories ────────────────────────────────────────────────────────
 uploads_directory = os.getenv("UPLOAD_DIR") or os.getenv("UPLOADS_DIR", "uploads")
 
@@ -92,15 +110,53 @@ app.include_router(sizes.router, prefix="/sizes", tags=["sizes"])
 app.include_router(contact.router, tags=["contact"])
 app.include_router(new_collection.router, prefix="/new-collection", tags=["new-collection"])
 app.include_router(waist_coat.router, prefix="/waist-coat", tags=["waist-coat"])
+app.include_router(sitemap.router, tags=["sitemap"])
+app.include_router(products.router, prefix="/products", tags=["products"])
+app.include_router(cart.router, prefix="/cart", tags=["cart"])
+app.include_router(delivery.router, prefix="/delivery-rules", tags=["delivery"])
+app.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
+app.include_router(catalog.router, prefix="/catalog", tags=["catalog"])
+app.include_router(metrics.router, tags=["metrics"])
+app.include_router(profiling.router, prefix="/profile", tags=["profiling"])
+app.include_router(health.router, prefix="/health", tags=["health"])
+
+# ── Background tasks ──────────────────────────────────────────────────────────
+background_tasks = []
+
+# Tables are created and changed by `alembic upgrade head` (migrations/), run
+# once per deploy; workers only check that it has been
+@app.on_event("startup")
+async def check_schema():
+    await run_in_threadpool(check_schema_version, engine)
+
+@app.on_event("startup")
+async def start_background_tasks():
+    events.start()
+    if rankings.RANKINGS_REFRESH_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(rankings.run_periodically()))
+    background_tasks.append(asyncio.create_task(counters.run_periodically()))
+    if stock_ledger.LOW_STOCK_SCAN_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(stock_ledger.run_periodically()))
+    if reservations.RESERVATION_SWEEP_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(reservations.run_periodically()))
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in background_tasks:
+        task.cancel()
+    events.stop()
+    shutdown_tracing()
+    # Don't lose the views buffered since the last periodic flush
+    try:
+        await run_in_threadpool(counters.flush_now)
+    except Exception as e:
+        logger.error(f"Failed to flush product counters on shutdown: {str(e)}")
+# ─────────────────────────────────────────────────────────────────────────────
 
 @app.get("/")
 async def root():
     return {"message": "Darven API - Premium Kurta Pajama & Shalwar Kameez"}
 
-@app.get("/health")
-async def health():
-    return {"status": "healthy"}
-
 @app.options("/{full_path:path}")
 async def options_handler(full_path: str):
     return {"message": "OK"}
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""
+Alembic environment: runs the migrations in versions/ against DATABASE_URL.
+
+Each migration runs in its own transaction (transaction_per_migration), so a
+migration that leaves it for concurrent index builds or batched backfills
+(helpers.py) doesn't take the earlier ones with it. On PostgreSQL, DDL waits
+at most MIGRATION_LOCK_TIMEOUT_MS for its lock instead of queueing every
+request behind it; re-run the upgrade when it gives up.
+"""
+
+import os
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from database import DATABASE_URL, Base
+import models  # noqa: F401 - registers the tables on Base.metadata for --autogenerate
+
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", "5000"))
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def run_migrations():
+    # Not the app's engine: no pool, and none of its statement timeouts
+    connectable = create_engine(DATABASE_URL, poolclass=NullPool)
+
+    with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text(f"SET lock_timeout = {MIGRATION_LOCK_TIMEOUT_MS}"))
+            connection.execute(text("SET statement_timeout = 0"))
+            connection.commit()
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    # The migrations look at what the database already has (helpers.py)
+    raise SystemExit("Offline (--sql) mode is not supported; run against the database")
+run_migrations()
@@ -0,0 +1,100 @@
+"""
+Building blocks for online-safe migrations.
+
+Each step checks what the database already has, so databases built by the
+old create_all() at startup, or patched by the old migrate_*.py scripts,
+upgrade from the baseline without errors:
+
+- create_table / add_column skip what already exists. New columns are
+  nullable with no default, which PostgreSQL adds without rewriting the table.
+- create_index uses CREATE INDEX CONCURRENTLY on PostgreSQL, outside the
+  migration's transaction, so writes to the table continue while it builds.
+- backfill copies rows in keyset-paginated batches, committing each batch
+  separately, so no long transaction holds locks. Re-runs skip the batches
+  already done.
+"""
+
+import logging
+import os
+from typing import Callable, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+BACKFILL_BATCH_SIZE = int(os.getenv("BACKFILL_BATCH_SIZE", "500"))
+
+# Under "alembic", which alembic.ini logs at INFO
+logger = logging.getLogger("alembic.migrations")
+
+
+def has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def has_column(table: str, column: str) -> bool:
+    return column in {existing["name"] for existing in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def has_index(table: str, name: str) -> bool:
+    return name in {existing["name"] for existing in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def create_table(name: str, *columns, **kwargs) -> bool:
+    """Create a table (with the indexes its columns ask for) unless it exists; True if created"""
+    if has_table(name):
+        return False
+    op.create_table(name, *columns, **kwargs)
+    return True
+
+
+def add_column(table: str, column: sa.Column):
+    if not has_column(table, column.name):
+        op.add_column(table, column)
+
+
+def create_index(name: str, table: str, columns: Sequence[str], unique: bool = False):
+    """Build an index without blocking writes to the table (concurrently on PostgreSQL)"""
+    if op.get_bind().dialect.name != "postgresql":
+        if not has_index(table, name):
+            op.create_index(name, table, list(columns), unique=unique)
+        return
+    with op.get_context().autocommit_block():
+        valid = op.get_bind().execute(sa.text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+        ), {"name": name}).scalar()
+        if valid:
+            return
+        if valid is False:
+            # Left behind by a concurrent build that failed (e.g. a duplicate for a unique index)
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        op.create_index(name, table, list(columns), unique=unique, postgresql_concurrently=True)
+
+
+def backfill(
+    label: str,
+    fetch_batch: Callable[[sa.engine.Connection, object, int], Sequence[sa.Row]],
+    write_batch: Callable[[sa.engine.Connection, Sequence[sa.Row]], int],
+    batch_size: int = BACKFILL_BATCH_SIZE,
+    start: Optional[object] = None,
+):
+    """
+    Copy data in batches, each in its own short transaction.
+
+    fetch_batch(connection, after, limit) returns up to `limit` rows ordered by
+    their first column, all greater than `after` (None on the first call). It
+    should leave out rows that are already done so a re-run picks up where a
+    failed one stopped. write_batch(connection, rows) writes one batch in a
+    single statement and returns the number of rows written.
+    """
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        after, read, written = start, 0, 0
+        while True:
+            rows = fetch_batch(connection, after, batch_size)
+            if not rows:
+                break
+            written += write_batch(connection, rows)
+            read += len(rows)
+            after = rows[-1][0]
+            logger.info(f"{label}: {read} rows read, {written} written (last key {after})")
+    logger.info(f"{label}: done, {written} rows written")
@@ -0,0 +1,162 @@
+"""Baseline: the catalog, order, admin and size tables
+
+Databases created by the old create_all() at startup already have these
+tables; they are skipped, so such a database upgrades straight to head.
+The colors columns of fabrics and ready_made_products come in 0002.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_table
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLAlchemy stores enum member names
+ORDER_STATUSES = ("PENDING", "COMPLETED", "CANCELLED")
+SIZES = ("XS", "S", "M", "L", "XL")
+
+
+def _enum(name: str, values: Sequence[str]) -> sa.types.TypeEngine:
+    # The PostgreSQL type is created once in upgrade(), not by every table using it
+    return sa.Enum(*values, name=name).with_variant(postgresql.ENUM(*values, name=name, create_type=False), "postgresql")
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+
+def _garment_columns(colors: bool):
+    columns = [
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("name", sa.String(), index=True),
+        sa.Column("description", sa.Text()),
+        sa.Column("price", sa.Float()),
+        sa.Column("material", sa.String()),
+        sa.Column("fabric_category", sa.String(), nullable=True, index=True),
+        sa.Column("size", sa.String()),
+    ]
+    if colors:
+        columns.append(sa.Column("colors", sa.JSON(), nullable=True))
+    return columns + [
+        sa.Column("images", sa.JSON()),
+        sa.Column("stock", sa.Integer()),
+        *_timestamps(),
+    ]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        postgresql.ENUM(*ORDER_STATUSES, name="orderstatus").create(bind, checkfirst=True)
+        postgresql.ENUM(*SIZES, name="sizetype").create(bind, checkfirst=True)
+
+    create_table(
+        "landing_images",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("category", sa.String(), index=True),
+        sa.Column("image_url", sa.String()),
+        sa.Column("portrait_image_url", sa.String(), nullable=True),
+        sa.Column("title", sa.String()),
+        sa.Column("link", sa.String(), nullable=True),
+        *_timestamps(),
+    )
+    create_table("ready_made_products", *_garment_columns(colors=False))
+    create_table("new_collection_products", *_garment_columns(colors=True))
+    create_table("waist_coat_products", *_garment_columns(colors=True))
+    create_table(
+        "fabrics",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("name", sa.String(), index=True),
+        sa.Column("description", sa.Text()),
+        sa.Column("price_per_meter", sa.Float()),
+        sa.Column("material", sa.String()),
+        sa.Column("fabric_category", sa.String(), nullable=True, index=True),
+        sa.Column("images", sa.JSON()),
+        sa.Column("stock_meters", sa.Float()),
+        *_timestamps(),
+    )
+    create_table(
+        "custom_fabrics",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("name", sa.String(), index=True),
+        sa.Column("description", sa.Text()),
+        sa.Column("price", sa.Float()),
+        sa.Column("material", sa.String()),
+        sa.Column("colors", sa.JSON(), nullable=True),
+        sa.Column("image_url", sa.String()),
+        *_timestamps(),
+    )
+    create_table(
+        "orders",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("customer_name", sa.String()),
+        sa.Column("phone", sa.String()),
+        sa.Column("address", sa.Text()),
+        sa.Column("postal_code", sa.String()),
+        sa.Column("city", sa.String()),
+        sa.Column("state", sa.String()),
+        sa.Column("landmark", sa.String(), nullable=True),
+        sa.Column("items", sa.JSON()),
+        sa.Column("subtotal", sa.Float()),
+        sa.Column("delivery_charges", sa.Float()),
+        sa.Column("total", sa.Float()),
+        sa.Column("status", _enum("orderstatus", ORDER_STATUSES)),
+        *_timestamps(),
+    )
+    create_table(
+        "admins",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("username", sa.String(), unique=True, index=True),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_table(
+        "kameez_sizes",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("size", _enum("sizetype", SIZES), unique=True, index=True),
+        sa.Column("collar", sa.Float()),
+        sa.Column("shoulder", sa.Float()),
+        sa.Column("chest", sa.Float()),
+        sa.Column("sleeves", sa.Float()),
+        sa.Column("length", sa.Float()),
+        *_timestamps(),
+    )
+    create_table(
+        "shalwar_sizes",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("size", _enum("sizetype", SIZES), unique=True, index=True),
+        sa.Column("length", sa.Float()),
+        *_timestamps(),
+    )
+    create_table(
+        "pajama_sizes",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("size", _enum("sizetype", SIZES), unique=True, index=True),
+        sa.Column("length", sa.Float()),
+        sa.Column("waist", sa.Float()),
+        sa.Column("hips", sa.Float()),
+        *_timestamps(),
+    )
+
+
+def downgrade() -> None:
+    for table in ("pajama_sizes", "shalwar_sizes", "kameez_sizes", "admins", "orders", "custom_fabrics",
+                  "fabrics", "waist_coat_products", "new_collection_products", "ready_made_products", "landing_images"):
+        op.drop_table(table)
+    if op.get_bind().dialect.name == "postgresql":
+        postgresql.ENUM(name="sizetype").drop(op.get_bind(), checkfirst=True)
+        postgresql.ENUM(name="orderstatus").drop(op.get_bind(), checkfirst=True)
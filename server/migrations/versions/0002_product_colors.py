@@ -0,0 +1,60 @@
+"""colors JSON column on fabrics and ready_made_products
+
+Replaces migrate_add_colors.py: the single `color` string of older
+ready-made products becomes a one-element colors list, copied in batches,
+then the old column is dropped.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column, backfill, has_column
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+products = sa.table(
+    "ready_made_products",
+    sa.column("id", sa.Integer),
+    sa.column("color", sa.String),
+    sa.column("colors", sa.JSON),
+)
+
+
+def _uncopied(connection, after, limit):
+    return connection.execute(
+        sa.select(products.c.id, products.c.color)
+        .where(products.c.id > after, products.c.colors.is_(None), products.c.color.isnot(None), products.c.color != "")
+        .order_by(products.c.id)
+        .limit(limit)
+    ).all()
+
+
+def _copy(connection, rows):
+    connection.execute(
+        products.update().where(products.c.id == sa.bindparam("row_id")).values(colors=sa.bindparam("new_colors")),
+        [{"row_id": row_id, "new_colors": [color]} for row_id, color in rows],
+    )
+    return len(rows)
+
+
+def upgrade() -> None:
+    add_column("fabrics", sa.Column("colors", sa.JSON(), nullable=True))
+    add_column("ready_made_products", sa.Column("colors", sa.JSON(), nullable=True))
+
+    if has_column("ready_made_products", "color"):
+        backfill("ready_made_products.color -> colors", _uncopied, _copy, start=0)
+        op.drop_column("ready_made_products", "color")
+
+
+def downgrade() -> None:
+    op.drop_column("ready_made_products", "colors")
+    op.drop_column("fabrics", "colors")
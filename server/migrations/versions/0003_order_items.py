@@ -0,0 +1,116 @@
+"""order_items: one row per cart line of an order
+
+Replaces migrate_order_items.py. Existing orders are backfilled from their
+JSON items in batches; the product index is built afterwards, concurrently,
+instead of slowing down every batch. The cart line parsing is a frozen copy
+of order_items.py as of this revision, so later changes to the app can't
+change what this migration writes.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import List, Optional, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import backfill, create_index, create_table
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+orders = sa.table("orders", sa.column("id", sa.Integer), sa.column("items", sa.JSON))
+order_items = sa.table(
+    "order_items",
+    sa.column("order_id", sa.Integer),
+    sa.column("product_type", sa.String),
+    sa.column("product_id", sa.Integer),
+    sa.column("item_key", sa.String),
+    sa.column("name", sa.String),
+    sa.column("quantity", sa.Integer),
+    sa.column("unit_price", sa.Float),
+    sa.column("line_total", sa.Float),
+    sa.column("details", sa.JSON),
+)
+
+
+# Longest prefixes first so "new-collection-" is not read as something shorter
+PRODUCT_TYPES = ("new-collection", "ready-made", "waist-coat", "fabric", "custom")
+
+
+def _parse_product_ref(item_key: str, item_type: str) -> Tuple[str, Optional[int]]:
+    for product_type in PRODUCT_TYPES:
+        prefix = f"{product_type}-"
+        if item_key.startswith(prefix):
+            head = item_key[len(prefix):].split("-", 1)[0]
+            try:
+                return product_type, int(head)
+            except ValueError:
+                return product_type, None
+    return item_type, None
+
+
+def _line_item_rows(order_id: int, items: List[dict]) -> List[dict]:
+    rows = []
+    for item in items:
+        product_type, product_id = _parse_product_ref(str(item.get("id", "")), item.get("type") or "unknown")
+        quantity = int(item.get("quantity") or 0)
+        unit_price = float(item.get("price") or 0)
+        rows.append({
+            "order_id": order_id,
+            "product_type": product_type,
+            "product_id": product_id,
+            "item_key": item.get("id"),
+            "name": item.get("name"),
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "line_total": unit_price * quantity,
+            "details": item.get("details"),
+        })
+    return rows
+
+
+def _orders_without_items(connection, after, limit):
+    return connection.execute(
+        sa.select(orders.c.id, orders.c["items"])
+        .where(orders.c.id > after)
+        .where(~sa.exists().where(order_items.c.order_id == orders.c.id))
+        .order_by(orders.c.id)
+        .limit(limit)
+    ).all()
+
+
+def _insert_items(connection, batch):
+    rows = []
+    for order_id, items in batch:
+        rows.extend(_line_item_rows(order_id, items or []))
+    if rows:
+        connection.execute(sa.insert(order_items), rows)
+    return len(rows)
+
+
+def upgrade() -> None:
+    create_table(
+        "order_items",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("order_id", sa.Integer(), sa.ForeignKey("orders.id", ondelete="CASCADE"), index=True, nullable=False),
+        sa.Column("product_type", sa.String(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=True),
+        sa.Column("item_key", sa.String()),
+        sa.Column("name", sa.String()),
+        sa.Column("quantity", sa.Integer()),
+        sa.Column("unit_price", sa.Float()),
+        sa.Column("line_total", sa.Float()),
+        sa.Column("details", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    backfill("order_items from orders.items", _orders_without_items, _insert_items, start=0)
+    create_index("ix_order_items_product", "order_items", ["product_type", "product_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("order_items")
@@ -0,0 +1,35 @@
+"""product_counters: buffered view and add-to-cart counters
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_table
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_table(
+        "product_counters",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("product_type", sa.String(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("views", sa.Integer(), nullable=False),
+        sa.Column("add_to_cart", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Index("ix_product_counters_product", "product_type", "product_id", unique=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("product_counters")
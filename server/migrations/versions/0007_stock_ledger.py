@@ -0,0 +1,111 @@
+"""Inventory ledger tables and opening balances
+
+Replaces migrate_stock_ledger.py: creates stock_movements,
+low_stock_thresholds, stock_alerts and job_cursors, then records an opening
+movement, in batches, for every stocked product with no ledger history yet.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import backfill, create_index, create_table
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# product_type -> (table, stock column), as in inventory.STOCKED_TYPES
+STOCKED_TABLES = {
+    "ready-made": ("ready_made_products", "stock"),
+    "new-collection": ("new_collection_products", "stock"),
+    "waist-coat": ("waist_coat_products", "stock"),
+    "fabric": ("fabrics", "stock_meters"),
+}
+
+movements = sa.table(
+    "stock_movements",
+    sa.column("product_type", sa.String),
+    sa.column("product_id", sa.Integer),
+    sa.column("delta", sa.Float),
+    sa.column("balance", sa.Float),
+    sa.column("reason", sa.String),
+)
+
+
+def _opening_balances(product_type: str, table_name: str, stock_column: str):
+    products = sa.table(table_name, sa.column("id", sa.Integer), sa.column(stock_column, sa.Float))
+
+    def fetch(connection, after, limit):
+        return connection.execute(
+            sa.select(products.c.id, products.c[stock_column])
+            .where(products.c.id > after)
+            .where(~sa.exists().where(movements.c.product_type == product_type, movements.c.product_id == products.c.id))
+            .order_by(products.c.id)
+            .limit(limit)
+        ).all()
+
+    def write(connection, rows):
+        connection.execute(sa.insert(movements), [
+            {"product_type": product_type, "product_id": product_id, "delta": stock or 0, "balance": stock or 0, "reason": "opening"}
+            for product_id, stock in rows
+        ])
+        return len(rows)
+
+    return fetch, write
+
+
+def upgrade() -> None:
+    create_table(
+        "stock_movements",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("product_type", sa.String(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("delta", sa.Float(), nullable=False),
+        sa.Column("balance", sa.Float(), nullable=True),
+        sa.Column("reason", sa.String(), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create_table(
+        "low_stock_thresholds",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("product_type", sa.String(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("threshold", sa.Float(), nullable=False),
+        sa.Index("ix_low_stock_thresholds_product", "product_type", "product_id", unique=True),
+    )
+    create_table(
+        "stock_alerts",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("product_type", sa.String(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("stock", sa.Float()),
+        sa.Column("threshold", sa.Float()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("resolved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Index("ix_stock_alerts_open", "product_type", "product_id", "resolved_at"),
+    )
+    create_table(
+        "job_cursors",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    # The ledger index serves the "no history yet" check of every batch below
+    create_index("ix_stock_movements_product", "stock_movements", ["product_type", "product_id", "id"])
+    for product_type, (table_name, stock_column) in STOCKED_TABLES.items():
+        fetch, write = _opening_balances(product_type, table_name, stock_column)
+        backfill(f"opening balances of {table_name}", fetch, write, start=0)
+
+
+def downgrade() -> None:
+    for table in ("job_cursors", "stock_alerts", "low_stock_thresholds", "stock_movements"):
+        op.drop_table(table)
@@ -0,0 +1,40 @@
+"""stock_reservations: stock held for checkout sessions
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_table
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_table(
+        "stock_reservations",
+        sa.Column("id", sa.Integer(), primary_key=True, index=True),
+        sa.Column("session_id", sa.String(), nullable=False, index=True),
+        sa.Column("product_type", sa.String(), nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("order_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Index("ix_stock_reservations_expiry", "status", "expires_at"),
+        sa.Index("ix_stock_reservations_product", "product_type", "product_id", "status"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stock_reservations")
@@ -0,0 +1,29 @@
+"""stock_reservations.client: caps what one client holds across sessions
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column, create_index
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable: holds taken before this revision have no client and simply expire
+    add_column("stock_reservations", sa.Column("client", sa.String(), nullable=True))
+    create_index("ix_stock_reservations_client", "stock_reservations", ["client", "status", "expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_reservations_client", table_name="stock_reservations")
+    op.drop_column("stock_reservations", "client")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Enum as SQLEnum, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, JSON, Enum as SQLEnum, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from database import Base
 import enum
@@ -116,6 +116,138 @@ class Order(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+class OrderLineItem(Base):
+    """One row per cart line of an order, so sales can be aggregated in SQL"""
+    __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_product", "product_type", "product_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), index=True, nullable=False)
+    product_type = Column(String, nullable=False)  # ready-made, new-collection, waist-coat, fabric, custom
+    product_id = Column(Integer, nullable=True)
+    item_key = Column(String)  # cart line id sent by the client
+    name = Column(String)
+    quantity = Column(Integer)
+    unit_price = Column(Float)
+    line_total = Column(Float)
+    details = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ProductRanking(Base):
+    """Precomputed best-seller and co-purchase rankings, rebuilt by rankings.py"""
+    __tablename__ = "product_rankings"
+    __table_args__ = (
+        Index("ix_product_rankings_lookup", "kind", "product_type", "product_id", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # "best_sellers" or "related"
+    product_type = Column(String, nullable=False)  # "all" for the overall best sellers
+    product_id = Column(Integer, nullable=False, default=0)  # 0 for best sellers
+    ranked = Column(JSON)  # [[product_type, product_id, score], ...] best first
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ProductCounter(Base):
+    """Merchandising counters, written in batches by counters.py"""
+    __tablename__ = "product_counters"
+    __table_args__ = (
+        Index("ix_product_counters_product", "product_type", "product_id", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_type = Column(String, nullable=False)
+    product_id = Column(Integer, nullable=False)
+    views = Column(Integer, nullable=False, default=0)
+    add_to_cart = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DeliveryRule(Base):
+    """Delivery pricing; the most specific active rule (city, then state, then default) wins"""
+    __tablename__ = "delivery_rules"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    city = Column(String, nullable=True)  # both empty = default rule
+    state = Column(String, nullable=True)
+    base_charge = Column(Float, default=200.0)
+    free_shipping_threshold = Column(Float, nullable=True)
+    per_meter_charge = Column(Float, default=0.0)  # added per meter of fabric shipped
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class StockMovement(Base):
+    """Append-only inventory ledger; product stock columns hold the running balance"""
+    __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_product", "product_type", "product_id", "id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_type = Column(String, nullable=False)
+    product_id = Column(Integer, nullable=False)
+    delta = Column(Float, nullable=False)  # units, or meters for fabric
+    balance = Column(Float, nullable=True)  # stock right after this movement
+    reason = Column(String, nullable=False)  # opening, adjustment, order, cancellation
+    order_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class LowStockThreshold(Base):
+    __tablename__ = "low_stock_thresholds"
+    __table_args__ = (
+        Index("ix_low_stock_thresholds_product", "product_type", "product_id", unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_type = Column(String, nullable=False)
+    product_id = Column(Integer, nullable=False)
+    threshold = Column(Float, nullable=False)
+
+class StockAlert(Base):
+    __tablename__ = "stock_alerts"
+    __table_args__ = (
+        Index("ix_stock_alerts_open", "product_type", "product_id", "resolved_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_type = Column(String, nullable=False)
+    product_id = Column(Integer, nullable=False)
+    stock = Column(Float)
+    threshold = Column(Float)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True), nullable=True)
+
+class JobCursor(Base):
+    """Position of a background job in an append-only table"""
+    __tablename__ = "job_cursors"
+    
+    name = Column(String, primary_key=True)
+    position = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class StockReservation(Base):
+    """Time-boxed stock hold for a checkout session; held stock is unavailable to other carts"""
+    __tablename__ = "stock_reservations"
+    __table_args__ = (
+        # The sweeper walks held rows by expiry; availability checks look up held rows per product
+        Index("ix_stock_reservations_expiry", "status", "expires_at"),
+        Index("ix_stock_reservations_product", "product_type", "product_id", "status"),
+        Index("ix_stock_reservations_client", "client", "status", "expires_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False, index=True)
+    client = Column(String, nullable=True)  # address of the caller, for the per-client cap
+    product_type = Column(String, nullable=False)
+    product_id = Column(Integer, nullable=False)
+    quantity = Column(Float, nullable=False)  # units, or meters for fabric
+    status = Column(String, nullable=False, default="held")  # held, converted, expired, released
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    order_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
 class Admin(Base):
     __tablename__ = "admins"
     
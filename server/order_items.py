@@ -0,0 +1,57 @@
+"""
+Helpers to normalize an order's JSON `items` into `order_items` rows.
+
+The storefront encodes the product reference in each cart line id, e.g.
+"ready-made-12-M-Black-1718000000000", "fabric-3-2.5" or "custom-4-1718...".
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from models import OrderLineItem
+
+# Longest prefixes first so "new-collection-" is not read as something shorter
+PRODUCT_TYPES = ("new-collection", "ready-made", "waist-coat", "fabric", "custom")
+
+
+def parse_product_ref(item_key: str, item_type: str) -> Tuple[str, Optional[int]]:
+    """Return (product_type, product_id) for a cart line id"""
+    for product_type in PRODUCT_TYPES:
+        prefix = f"{product_type}-"
+        if item_key.startswith(prefix):
+            head = item_key[len(prefix):].split("-", 1)[0]
+            try:
+                return product_type, int(head)
+            except ValueError:
+                return product_type, None
+    return item_type, None
+
+
+def line_item_rows(order_id: int, items: List[dict]) -> List[dict]:
+    rows = []
+    for item in items:
+        product_type, product_id = parse_product_ref(str(item.get("id", "")), item.get("type") or "unknown")
+        quantity = int(item.get("quantity") or 0)
+        unit_price = float(item.get("price") or 0)
+        rows.append({
+            "order_id": order_id,
+            "product_type": product_type,
+            "product_id": product_id,
+            "item_key": item.get("id"),
+            "name": item.get("name"),
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "line_total": unit_price * quantity,
+            "details": item.get("details"),
+        })
+    return rows
+
+
+def insert_line_items(db: Session, order_id: int, items: List[dict]) -> int:
+    """Bulk insert the line items of one order; caller commits"""
+    rows = line_item_rows(order_id, items)
+    if rows:
+        db.execute(insert(OrderLineItem), rows)
+    return len(rows)
@@ -0,0 +1,154 @@
+"""
+Server-side cart pricing shared by the cart quote endpoint and order creation.
+
+Every product referenced by a cart is resolved with one query per catalog
+table, then each line is priced, checked against stock (less what other
+checkout sessions currently hold), and the delivery rules applied to the
+order value and fabric meters.
+"""
+
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import ReadyMadeProduct, NewCollectionProduct, WaistCoatProduct, Fabric, CustomFabric
+from order_items import parse_product_ref
+from delivery_rules import delivery_charge
+from reservations import held_quantities
+
+STITCHING_COST = 3500.0
+# Custom fabric prices are for a full suit of this many meters
+CUSTOM_SUIT_METERS = 4.0
+
+# product type -> (model, price column, stock column or None)
+PRICED_TYPES = {
+    "ready-made": (ReadyMadeProduct, "price", "stock"),
+    "new-collection": (NewCollectionProduct, "price", "stock"),
+    "waist-coat": (WaistCoatProduct, "price", "stock"),
+    "fabric": (Fabric, "price_per_meter", "stock_meters"),
+    "custom": (CustomFabric, "price", None),
+}
+
+
+def _meters(item) -> Optional[float]:
+    if getattr(item, "meters", None) is not None:
+        return item.meters
+    details = item.details or {}
+    value = details.get("length", details.get("meters"))
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_products(db: Session, refs: Dict[str, set]) -> Dict[Tuple[str, int], dict]:
+    products = {}
+    for product_type, ids in refs.items():
+        model, price_column, stock_column = PRICED_TYPES[product_type]
+        columns = [model.id, model.name, getattr(model, price_column).label("price")]
+        if stock_column:
+            columns.append(getattr(model, stock_column).label("stock"))
+        for row in db.execute(select(*columns).where(model.id.in_(ids))):
+            products[(product_type, row.id)] = row._asdict()
+    return products
+
+
+def quote_cart(
+    db: Session,
+    items: list,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    session_id: Optional[str] = None
+) -> dict:
+    """
+    Price `items` (CartQuoteItem or OrderItem objects) against the current catalog.
+
+    Stock held by checkout sessions other than `session_id` counts as unavailable.
+    """
+    resolved = []
+    refs: Dict[str, set] = defaultdict(set)
+    for item in items:
+        product_type, product_id = parse_product_ref(item.id, item.type)
+        if getattr(item, "product_id", None) is not None:
+            product_id = item.product_id
+        resolved.append((item, product_type, product_id))
+        if product_type in PRICED_TYPES and product_id is not None:
+            refs[product_type].add(product_id)
+
+    products = _load_products(db, refs)
+    held = held_quantities(db, refs, exclude_session=session_id)
+
+    # Stock is checked against the whole cart, not line by line
+    requested: Dict[Tuple[str, int], float] = defaultdict(float)
+    for item, product_type, product_id in resolved:
+        amount = item.quantity
+        if product_type == "fabric":
+            amount *= _meters(item) or 0
+        requested[(product_type, product_id)] += amount
+
+    lines = []
+    subtotal = 0.0
+    stitching_total = 0.0
+    fabric_meters = 0.0
+    for item, product_type, product_id in resolved:
+        product = products.get((product_type, product_id))
+        line = {
+            "id": item.id,
+            "type": product_type,
+            "product_id": product_id,
+            "name": product["name"] if product else None,
+            "quantity": item.quantity,
+            "unit_price": 0.0,
+            "stitching_cost": 0.0,
+            "line_total": 0.0,
+            "meters": None,
+            "available": False,
+            "message": None,
+        }
+        if product is None:
+            line["message"] = "Product not found"
+            lines.append(line)
+            continue
+
+        price = product["price"] or 0.0
+        if product_type == "fabric":
+            meters = _meters(item)
+            if not meters or meters <= 0:
+                line["message"] = "Fabric length in meters is required"
+                lines.append(line)
+                continue
+            line["unit_price"] = price * meters
+            line["meters"] = meters
+            fabric_meters += meters * item.quantity
+        elif product_type == "custom":
+            meters = _meters(item) or CUSTOM_SUIT_METERS
+            line["unit_price"] = float(round(price / CUSTOM_SUIT_METERS * meters))
+            line["stitching_cost"] = STITCHING_COST * item.quantity
+        else:
+            line["unit_price"] = price
+
+        stock = product.get("stock")
+        if stock is not None:
+            stock -= held.get((product_type, product_id), 0.0)
+        if stock is not None and requested[(product_type, product_id)] > stock:
+            line["message"] = "Not enough stock"
+        else:
+            line["available"] = True
+
+        line["line_total"] = line["unit_price"] * item.quantity
+        subtotal += line["line_total"]
+        stitching_total += line["stitching_cost"]
+        lines.append(line)
+
+    order_value = subtotal + stitching_total
+    delivery = delivery_charge(db, city, state, order_value, fabric_meters) if lines else 0.0
+    return {
+        "lines": lines,
+        "subtotal": subtotal,
+        "stitching_cost": stitching_total,
+        "delivery_charges": delivery,
+        "total": order_value + delivery,
+        "all_available": all(line["available"] for line in lines),
+    }
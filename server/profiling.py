@@ -0,0 +1,197 @@
+"""
+Sampling profiler for live workers.
+
+A Sampler thread snapshots the Python stack of every other thread each
+`interval` seconds (sys._current_frames) and counts identical stacks. The
+result is in the collapsed format flamegraph.pl, speedscope and inferno read:
+
+    MainThread;uvicorn.main.run;...;api.orders.create_order 42
+
+Two entry points, both admin-only:
+- GET /profile?seconds=N profiles the whole worker (api/profiling.py)
+- a request sent with "X-Profile: 1" and an admin token is profiled while it
+  runs; the stacks go to PROFILE_DIR and the response carries the profile id
+  in X-Profile-Id, to fetch with GET /profile/requests/{id}
+
+Stacks of the whole worker are sampled, so a per-request profile also shows
+whatever else the worker was doing meanwhile.
+"""
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+from uuid import uuid4
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auth import admin_exists, decode_admin_token
+
+logger = logging.getLogger(__name__)
+
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("cache", "profiles"))
+# Per-request profiles kept in PROFILE_DIR, oldest deleted first
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+# Per-request profiles running at once on one worker; more are served unprofiled
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+
+# Innermost Python frames of threads that are waiting rather than working
+IDLE_LEAVES = {
+    "threading.Condition.wait",
+    "threading.Event.wait",
+    "threading.Thread._wait_for_tstate_lock",
+    "selectors.EpollSelector.select",
+    "selectors.KqueueSelector.select",
+    "selectors.SelectSelector.select",
+    "concurrent.futures.thread._worker",
+    "queue.Queue.get",
+    "socket.socket.accept",
+    "profiling.Sampler._run",
+}
+
+
+class Sampler:
+    """Counts the stacks of all other threads every `interval` seconds until stopped"""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_MS / 1000):
+        self.interval = max(interval, 0.001)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        self._labels: Dict[object, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> "Sampler":
+        self.started_at = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+        return self.stacks
+
+    def _label(self, frame) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            module = frame.f_globals.get("__name__", "?")
+            label = self._labels[code] = f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+        return label
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.reverse()
+                self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+
+def collapse(stacks: Counter, include_idle: bool = False) -> str:
+    """Collapsed-stack text, hottest stacks first"""
+    lines = [
+        f"{stack} {count}"
+        for stack, count in stacks.most_common()
+        if include_idle or stack.rsplit(";", 1)[-1] not in IDLE_LEAVES
+    ]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def profile_path(profile_id: str) -> Optional[str]:
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    return os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+
+
+def new_profile_id() -> str:
+    # Sorts by time, which _prune relies on
+    return f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid4().hex[:8]}"
+
+
+def save(profile_id: str, stacks: Counter):
+    """Write a profile to PROFILE_DIR, dropping the oldest beyond PROFILE_KEEP"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(profile_path(profile_id), "w", encoding="utf-8") as f:
+        f.write(collapse(stacks))
+    _prune()
+
+
+def _prune():
+    try:
+        names = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith(".folded"))
+        for name in names[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else ():
+            os.remove(os.path.join(PROFILE_DIR, name))
+    except OSError as e:
+        logger.warning(f"Failed to prune old profiles: {str(e)}")
+
+
+async def _wants_profile(scope: Scope) -> bool:
+    headers = dict(scope.get("headers", ()))
+    if headers.get(PROFILE_HEADER, b"").strip() not in (b"1", b"true"):
+        return False
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    username = decode_admin_token(token) if scheme.lower() == "bearer" else None
+    # Same check as get_current_admin: a token outlives a deleted admin account
+    return username is not None and await run_in_threadpool(admin_exists, username)
+
+
+_slots = threading.BoundedSemaphore(max(PROFILE_MAX_CONCURRENT, 1))
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware profiling requests that ask for it with X-Profile: 1"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not await _wants_profile(scope) or not _slots.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+        sampler = Sampler().start()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stacks = sampler.stop()
+            _slots.release()
+            try:
+                save(profile_id, stacks)
+                logger.info(
+                    f"Profile {profile_id}: {scope['method']} {scope['path']} took "
+                    f"{sampler.elapsed * 1000:.1f} ms, {sampler.samples} samples"
+                )
+            except OSError as e:
+                logger.error(f"Failed to save profile {profile_id}: {str(e)}")
@@ -0,0 +1,113 @@
+"""
+Lean column projections for catalog list endpoints.
+
+Listing pages only need a handful of columns per product, so instead of
+hydrating full ORM objects (long descriptions, every image URL) these helpers
+run a core SELECT over just the requested columns and return plain dicts.
+
+Rows read this way already match the response schemas column for column, so
+they skip Pydantic validation and the ORM identity map and are encoded
+straight to bytes by `FastJSONResponse`.
+"""
+
+from typing import Any, List, Optional, Sequence, Type
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Virtual field: first entry of the `images` JSON array, extracted in SQL
+IMAGE_FIELD = "image"
+
+# Columns a product card needs (name, price, first image, colors + filters)
+PRODUCT_CARD_FIELDS = ("id", "name", "price", "fabric_category", "colors", IMAGE_FIELD, "stock")
+FABRIC_CARD_FIELDS = ("id", "name", "price_per_meter", "fabric_category", "colors", IMAGE_FIELD, "stock_meters")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson, falling back to the stdlib encoder"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        # orjson natively handles datetimes and enums found in core rows; UTC
+        # is written as "Z", like Pydantic, and naive timestamps are UTC
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC)
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Parse a comma separated `fields=` value and validate it against a response schema"""
+    if not fields:
+        return None
+
+    allowed = list(schema.model_fields) + [IMAGE_FIELD]
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+
+    # Clients always need the id to link to the detail page
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return list(dict.fromkeys(requested))
+
+
+def _column(model, name: str):
+    if name == IMAGE_FIELD:
+        return model.images[0].as_string().label(IMAGE_FIELD)
+    return getattr(model, name)
+
+
+def select_columns(db: Session, model, columns: Sequence[str], order_by=None, ids=None) -> List[dict]:
+    """Run a core SELECT over only `columns` and return one dict per row"""
+    stmt = select(*[_column(model, name) for name in columns])
+    if ids is not None:
+        stmt = stmt.where(model.id.in_(ids))
+    # id last so equal sort keys still come back in a stable order
+    stmt = stmt.order_by(order_by, model.id) if order_by is not None else stmt.order_by(model.id)
+    return [dict(row._mapping) for row in db.execute(stmt)]
+
+
+def fast_list(db: Session, model, schema: Type[BaseModel], order_by=None) -> FastJSONResponse:
+    """Serve the full representation of every row of `model` without ORM hydration"""
+    missing = [name for name in schema.model_fields if not hasattr(model, name)]
+    if missing:
+        # Validation is skipped, so these would silently vanish from the response
+        raise TypeError(f"{schema.__name__} fields without a {model.__name__} column: {', '.join(missing)}")
+    columns = list(schema.model_fields)
+    return FastJSONResponse(content=select_columns(db, model, columns, order_by))
+
+
+def project_list(
+    db: Session,
+    model,
+    schema: Type[BaseModel],
+    card_fields: Sequence[str],
+    view: str,
+    fields: Optional[str],
+    order_by=None
+) -> Optional[FastJSONResponse]:
+    """
+    Serve a list endpoint as a card or sparse-fieldset projection.
+
+    Returns None when the client asked for the full representation so the
+    caller can serve it with `fast_list`.
+    """
+    columns = parse_fields(fields, schema)
+    if columns is None and view == "card":
+        columns = list(card_fields)
+    if columns is None:
+        return None
+
+    return FastJSONResponse(content=select_columns(db, model, columns, order_by))
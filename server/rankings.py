@@ -0,0 +1,240 @@
+"""
+Best-seller and "you may also like" rankings built from order history.
+
+The rebuild streams non-cancelled order line items once, counts units per
+product and product pairs bought together (sparse: only pairs that actually
+co-occur are stored), and writes the top entries of each ranking into the
+compact `product_rankings` table. Request handlers then read a single row
+by its unique index.
+
+Every worker runs the refresh loop; a PostgreSQL advisory lock lets one of
+them rebuild at a time (the others skip that round), and freshness is
+checked under the lock, so concurrent rebuilds can't collide on the unique
+index.
+
+Run once from the command line, or let the background task started in
+main.py refresh it every RANKINGS_REFRESH_SECONDS:
+    python rankings.py
+"""
+
+import asyncio
+import logging
+import math
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, try_advisory_xact_lock
+from models import (
+    Order, OrderStatus, OrderLineItem, ProductRanking,
+    ReadyMadeProduct, NewCollectionProduct, WaistCoatProduct, Fabric
+)
+from projections import select_columns, IMAGE_FIELD
+
+logger = logging.getLogger(__name__)
+
+RANKINGS_REFRESH_SECONDS = int(os.getenv("RANKINGS_REFRESH_SECONDS", "3600"))
+RANKINGS_TOP_N = int(os.getenv("RANKINGS_TOP_N", "24"))
+STREAM_BATCH_SIZE = 1000
+# pg_try_advisory_xact_lock key serializing rebuilds across workers
+RANKINGS_LOCK_KEY = 720_032
+
+BEST_SELLERS = "best_sellers"
+RELATED = "related"
+ALL_TYPES = "all"
+
+# product type -> (model, price column) for the catalog pages rankings point at
+CATALOG = {
+    "ready-made": (ReadyMadeProduct, "price"),
+    "new-collection": (NewCollectionProduct, "price"),
+    "waist-coat": (WaistCoatProduct, "price"),
+    "fabric": (Fabric, "price_per_meter"),
+}
+
+ProductRef = Tuple[str, int]
+
+
+def _count(db: Session):
+    units: Counter = Counter()
+    pairs: Counter = Counter()
+    orders_per_product: Counter = Counter()
+
+    stmt = (
+        select(OrderLineItem.order_id, OrderLineItem.product_type, OrderLineItem.product_id, OrderLineItem.quantity)
+        .join(Order, Order.id == OrderLineItem.order_id)
+        .where(Order.status != OrderStatus.CANCELLED)
+        .where(OrderLineItem.product_id.isnot(None))
+        .where(OrderLineItem.product_type.in_(list(CATALOG)))
+        .order_by(OrderLineItem.order_id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+
+    current_order = None
+    basket: set = set()
+
+    def close_basket():
+        products = sorted(basket)
+        for product in products:
+            orders_per_product[product] += 1
+        for i, a in enumerate(products):
+            for b in products[i + 1:]:
+                pairs[(a, b)] += 1
+
+    for order_id, product_type, product_id, quantity in db.execute(stmt):
+        if order_id != current_order:
+            close_basket()
+            basket = set()
+            current_order = order_id
+        product = (product_type, product_id)
+        basket.add(product)
+        units[product] += quantity or 0
+    close_basket()
+
+    return units, pairs, orders_per_product
+
+
+def build_rankings(db: Session) -> List[dict]:
+    """Compute ranking rows (not yet written) from the order history"""
+    units, pairs, orders_per_product = _count(db)
+
+    rows = []
+    by_type: Dict[str, List[Tuple[ProductRef, int]]] = defaultdict(list)
+    for product, count in units.items():
+        by_type[product[0]].append((product, count))
+    by_type[ALL_TYPES] = list(units.items())
+
+    for product_type, counts in by_type.items():
+        top = sorted(counts, key=lambda item: (-item[1], item[0]))[:RANKINGS_TOP_N]
+        rows.append({
+            "kind": BEST_SELLERS,
+            "product_type": product_type,
+            "product_id": 0,
+            "ranked": [[ref[0], ref[1], count] for ref, count in top],
+        })
+
+    # Cosine similarity over order baskets: co-purchases / sqrt(orders_a * orders_b)
+    neighbours: Dict[ProductRef, List[Tuple[ProductRef, float]]] = defaultdict(list)
+    for (a, b), together in pairs.items():
+        score = together / math.sqrt(orders_per_product[a] * orders_per_product[b])
+        neighbours[a].append((b, score))
+        neighbours[b].append((a, score))
+
+    for product, candidates in neighbours.items():
+        top = sorted(candidates, key=lambda item: (-item[1], item[0]))[:RANKINGS_TOP_N]
+        rows.append({
+            "kind": RELATED,
+            "product_type": product[0],
+            "product_id": product[1],
+            "ranked": [[ref[0], ref[1], round(score, 4)] for ref, score in top],
+        })
+
+    return rows
+
+
+def rebuild_rankings(db: Session, if_stale: bool = False) -> Optional[int]:
+    """
+    Replace the stored rankings in one transaction; returns the row count, or
+    None when skipped: another worker is rebuilding, or (with if_stale) the
+    rankings were rebuilt less than RANKINGS_REFRESH_SECONDS ago.
+    """
+    if not try_advisory_xact_lock(db, RANKINGS_LOCK_KEY):
+        db.rollback()
+        logger.info("Product rankings are being rebuilt by another worker; skipping")
+        return None
+    if if_stale and _rankings_are_fresh(db):
+        db.rollback()
+        return None
+
+    rows = build_rankings(db)
+    db.execute(delete(ProductRanking))
+    if rows:
+        db.execute(insert(ProductRanking), rows)
+    db.commit()
+    logger.info(f"Rebuilt product rankings: {len(rows)} rows")
+    return len(rows)
+
+
+def get_ranking(db: Session, kind: str, product_type: str, product_id: int = 0) -> List[list]:
+    """Single indexed row lookup"""
+    ranked = db.execute(
+        select(ProductRanking.ranked).where(
+            ProductRanking.kind == kind,
+            ProductRanking.product_type == product_type,
+            ProductRanking.product_id == product_id
+        )
+    ).scalar()
+    return ranked or []
+
+
+def resolve_cards(db: Session, ranked: List[list], limit: int) -> List[dict]:
+    """Attach card fields to ranked references, one query per product type"""
+    ids_by_type: Dict[str, List[int]] = defaultdict(list)
+    for product_type, product_id, _ in ranked[:limit * 2]:
+        if product_type in CATALOG:
+            ids_by_type[product_type].append(product_id)
+
+    cards: Dict[ProductRef, dict] = {}
+    for product_type, ids in ids_by_type.items():
+        model, price_column = CATALOG[product_type]
+        columns = ["id", "name", price_column, "colors", IMAGE_FIELD]
+        for row in select_columns(db, model, columns, ids=ids):
+            cards[(product_type, row["id"])] = {
+                "product_type": product_type,
+                "product_id": row["id"],
+                "name": row["name"],
+                "price": row[price_column],
+                "colors": row["colors"],
+                "image": row[IMAGE_FIELD],
+            }
+
+    # Keep ranking order and drop products that have since been deleted
+    results = []
+    for product_type, product_id, score in ranked:
+        card = cards.get((product_type, product_id))
+        if card:
+            results.append(dict(card, score=score))
+            if len(results) == limit:
+                break
+    return results
+
+
+def _rankings_are_fresh(db: Session) -> bool:
+    computed_at = db.execute(select(func.max(ProductRanking.computed_at))).scalar()
+    if computed_at is None:
+        return False
+    if computed_at.tzinfo is None:
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - computed_at < timedelta(seconds=RANKINGS_REFRESH_SECONDS)
+
+
+def _refresh_once():
+    db = SessionLocal()
+    try:
+        rebuild_rankings(db, if_stale=True)
+    finally:
+        db.close()
+
+
+async def run_periodically():
+    """Background loop started on app startup"""
+    while True:
+        try:
+            await run_in_threadpool(_refresh_once)
+        except Exception as e:
+            logger.error(f"Failed to rebuild product rankings: {str(e)}")
+        await asyncio.sleep(RANKINGS_REFRESH_SECONDS)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        count = rebuild_rankings(session)
+        print("Another worker is rebuilding the rankings" if count is None else f"Rebuilt {count} ranking rows")
+    finally:
+        session.close()
@@ -0,0 +1,93 @@
+"""
+Per-request context shared by the middleware and the database hooks.
+
+MetricsMiddleware (instrumentation.py) opens a RequestStats for every request
+and the SQLAlchemy cursor hooks (database.py, instrumentation.py) find it
+through a contextvar, which follows the request into run_in_threadpool calls.
+RequestIdMiddleware does the same for the request id that log records carry.
+This module imports nothing from the app so database.py can use it.
+"""
+
+import re
+from collections import Counter as Tally
+from contextvars import ContextVar
+from typing import Optional
+from uuid import uuid4
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestStats:
+    """Database work done on behalf of one request"""
+    __slots__ = ("method", "path", "scope", "queries", "db_time", "statements", "over_budget")
+
+    def __init__(self, method: str, path: str, scope: Optional[dict] = None):
+        self.method = method
+        self.path = path
+        self.scope = scope
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements: Tally = Tally()
+        self.over_budget = False
+
+    @property
+    def route(self) -> str:
+        """Route template once routing has matched (e.g. /orders/{order_id}), else the raw path"""
+        route = self.scope.get("route") if self.scope is not None else None
+        return getattr(route, "path", None) or self.path
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being served, or None outside a request (background tasks)"""
+    return _current.get()
+
+
+# ── Request ids ───────────────────────────────────────────────────────────────
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Ids accepted from clients and proxies; anything else is replaced
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    """Id of the request being served, or None outside a request"""
+    return _request_id.get()
+
+
+class RequestIdMiddleware:
+    """Pure ASGI middleware giving each request an id, taken from X-Request-ID or generated, and echoing it back"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1").strip()
+                break
+        if not request_id or not _REQUEST_ID.match(request_id):
+            request_id = uuid4().hex
+        encoded = request_id.encode("latin-1")
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, encoded))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(token)
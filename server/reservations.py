@@ -0,0 +1,283 @@
+"""
+Time-boxed stock reservations for checkout sessions.
+
+A checkout session holds the stock of its cart for RESERVATION_TTL_SECONDS.
+Held stock is subtracted from what other carts see as available (see
+pricing.quote_cart) but the product stock columns are untouched: the order
+takes the stock through the inventory ledger as usual and converts the holds.
+
+A hold locks the product rows (in key order, as the inventory ledger does)
+and re-checks stock less the other sessions' holds before inserting, and
+order creation makes the same check, so two checkouts can't both hold or buy
+the last unit. RESERVATION_MAX_QUANTITY caps what one (anonymous) session
+may hold, and RESERVATION_MAX_PER_CLIENT what one client address may hold
+across all its sessions, so minting session ids can't take the catalog off
+sale either.
+
+Holds past their expiry already stop counting against availability; the
+sweeper started in main.py marks them expired in batches, walking the
+(status, expires_at) index, so abandoned checkouts leave no live rows behind.
+"""
+
+import asyncio
+import logging
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import StockReservation
+from metrics import FunctionMetric
+from inventory import STOCKED_TYPES
+
+logger = logging.getLogger(__name__)
+
+RESERVATION_TTL_SECONDS = int(os.getenv("RESERVATION_TTL_SECONDS", "900"))
+RESERVATION_SWEEP_SECONDS = int(os.getenv("RESERVATION_SWEEP_SECONDS", "60"))
+RESERVATION_SWEEP_BATCH = int(os.getenv("RESERVATION_SWEEP_BATCH", "500"))
+# Most one checkout session may hold, units and fabric meters together
+RESERVATION_MAX_QUANTITY = float(os.getenv("RESERVATION_MAX_QUANTITY", "50"))
+# Most one client address may hold over all its sessions (shared NAT addresses included)
+RESERVATION_MAX_PER_CLIENT = float(os.getenv("RESERVATION_MAX_PER_CLIENT", "200"))
+
+HELD = "held"
+CONVERTED = "converted"
+EXPIRED = "expired"
+RELEASED = "released"
+
+# Product types with a stock column
+RESERVABLE_TYPES = ("ready-made", "new-collection", "waist-coat", "fabric")
+
+# Holds created/expired/converted/released by this process, exported on /metrics
+metrics: Counter = Counter()
+FunctionMetric(
+    "stock_reservations_total", "Stock holds by outcome", "counter",
+    lambda: {(outcome,): count for outcome, count in metrics.items()}, ("outcome",)
+)
+
+
+class ReservationError(Exception):
+    """Raised when a hold or an order can't have the stock it asks for"""
+
+
+class ReservationLimitExceeded(ReservationError):
+    pass
+
+
+class InsufficientStock(ReservationError):
+    def __init__(self, shortages: List[dict]):
+        super().__init__(f"Not enough stock for {len(shortages)} product(s)")
+        self.shortages = shortages
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def held_quantities(db: Session, refs: Dict[str, set], exclude_session: Optional[str] = None) -> Dict[Tuple[str, int], float]:
+    """Stock currently held per product, optionally ignoring one session's own holds"""
+    types = [product_type for product_type in refs if product_type in RESERVABLE_TYPES]
+    if not types:
+        return {}
+    ids = {product_id for product_type in types for product_id in refs[product_type]}
+
+    stmt = (
+        select(StockReservation.product_type, StockReservation.product_id, func.sum(StockReservation.quantity))
+        .where(
+            StockReservation.status == HELD,
+            StockReservation.expires_at > _now(),
+            StockReservation.product_type.in_(types),
+            StockReservation.product_id.in_(ids)
+        )
+        .group_by(StockReservation.product_type, StockReservation.product_id)
+    )
+    if exclude_session:
+        stmt = stmt.where(StockReservation.session_id != exclude_session)
+
+    return {
+        (product_type, product_id): float(quantity or 0)
+        for product_type, product_id, quantity in db.execute(stmt)
+        if product_id in refs[product_type]
+    }
+
+
+def requested_amounts(lines: List[dict]) -> Dict[Tuple[str, int], float]:
+    """Stock asked for by quoted lines (pricing.quote_cart), per stocked product"""
+    amounts: Dict[Tuple[str, int], float] = defaultdict(float)
+    for line in lines:
+        if line["type"] not in RESERVABLE_TYPES or line["product_id"] is None:
+            continue
+        amount = line["quantity"] * ((line["meters"] or 0) if line["type"] == "fabric" else 1)
+        if amount > 0:
+            amounts[(line["type"], line["product_id"])] += amount
+    return dict(amounts)
+
+
+def lock_available(db: Session, amounts: Dict[Tuple[str, int], float], exclude_session: Optional[str] = None):
+    """
+    Lock the rows of the requested products and check their stock less the
+    other sessions' holds; raises InsufficientStock. The locks are held until
+    the caller's transaction ends, so the hold or order it writes next can't
+    be raced.
+    """
+    stock: Dict[Tuple[str, int], Optional[float]] = {}
+    # Key order, like inventory.apply_order, so concurrent checkouts can't deadlock
+    for product_type, product_id in sorted(amounts):
+        model, stock_column = STOCKED_TYPES[product_type]
+        row = db.execute(
+            select(getattr(model, stock_column)).where(model.id == product_id).with_for_update()
+        ).first()
+        stock[(product_type, product_id)] = None if row is None else float(row[0] or 0)
+
+    refs: Dict[str, set] = defaultdict(set)
+    for product_type, product_id in amounts:
+        refs[product_type].add(product_id)
+    held = held_quantities(db, refs, exclude_session=exclude_session)
+
+    shortages = []
+    for key, amount in sorted(amounts.items()):
+        available = stock[key]
+        if available is not None:
+            available -= held.get(key, 0.0)
+        if available is None or amount > available:
+            shortages.append({"type": key[0], "product_id": key[1], "requested": amount, "available": max(available or 0.0, 0.0)})
+    if shortages:
+        raise InsufficientStock(shortages)
+
+
+def held_by_client(db: Session, client: str, exclude_session: Optional[str] = None) -> float:
+    """Stock currently held by every session of one client"""
+    stmt = select(func.coalesce(func.sum(StockReservation.quantity), 0)).where(
+        StockReservation.client == client,
+        StockReservation.status == HELD,
+        StockReservation.expires_at > _now()
+    )
+    if exclude_session:
+        stmt = stmt.where(StockReservation.session_id != exclude_session)
+    return float(db.execute(stmt).scalar())
+
+
+def reserve(db: Session, session_id: str, lines: List[dict], client: Optional[str] = None) -> datetime:
+    """Replace the holds of a session with the quoted lines; caller commits"""
+    amounts = requested_amounts(lines)
+    total = sum(amounts.values())
+    if total > RESERVATION_MAX_QUANTITY:
+        raise ReservationLimitExceeded(f"A checkout can hold at most {RESERVATION_MAX_QUANTITY:g} items")
+    if client and held_by_client(db, client, exclude_session=session_id) + total > RESERVATION_MAX_PER_CLIENT:
+        raise ReservationLimitExceeded("Too many items held by open checkouts; complete or abandon one first")
+
+    release(db, session_id)
+    lock_available(db, amounts, exclude_session=session_id)
+
+    expires_at = _now() + timedelta(seconds=RESERVATION_TTL_SECONDS)
+    rows = [
+        {
+            "session_id": session_id,
+            "client": client,
+            "product_type": product_type,
+            "product_id": product_id,
+            "quantity": amount,
+            "status": HELD,
+            "expires_at": expires_at,
+        }
+        for (product_type, product_id), amount in amounts.items()
+    ]
+    if rows:
+        db.execute(insert(StockReservation), rows)
+        metrics["created"] += len(rows)
+    return expires_at
+
+
+def _finish(db: Session, session_id: str, status: str, order_id: Optional[int] = None) -> int:
+    values = {"status": status}
+    if order_id is not None:
+        values["order_id"] = order_id
+    result = db.execute(
+        update(StockReservation)
+        .where(StockReservation.session_id == session_id, StockReservation.status == HELD)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def convert(db: Session, session_id: str, order_id: int) -> int:
+    """Mark a session's holds as turned into an order; caller commits"""
+    count = _finish(db, session_id, CONVERTED, order_id)
+    metrics["converted"] += count
+    return count
+
+
+def release(db: Session, session_id: str) -> int:
+    """Drop a session's holds, e.g. when the cart is abandoned or re-reserved; caller commits"""
+    count = _finish(db, session_id, RELEASED)
+    metrics["released"] += count
+    return count
+
+
+def sweep_expired(db: Session) -> int:
+    """Mark every expired hold as expired, RESERVATION_SWEEP_BATCH rows per transaction"""
+    total = 0
+    while True:
+        now = _now()
+        # SKIP LOCKED lets the sweepers of several workers split the backlog
+        ids = db.execute(
+            select(StockReservation.id)
+            .where(StockReservation.status == HELD, StockReservation.expires_at <= now)
+            .order_by(StockReservation.expires_at)
+            .limit(RESERVATION_SWEEP_BATCH)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+
+        result = db.execute(
+            update(StockReservation)
+            .where(StockReservation.id.in_(ids), StockReservation.status == HELD)
+            .values(status=EXPIRED)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += result.rowcount
+        if len(ids) < RESERVATION_SWEEP_BATCH:
+            break
+
+    db.commit()
+    metrics["expired"] += total
+    if total:
+        logger.info(f"Expired {total} stock reservations")
+    return total
+
+
+def reservation_stats(db: Session, since: Optional[datetime] = None) -> dict:
+    """Hold counts by status across all workers, optionally only holds created since `since`"""
+    stmt = select(StockReservation.status, func.count()).group_by(StockReservation.status)
+    if since is not None:
+        stmt = stmt.where(StockReservation.created_at >= since)
+    counts = dict(db.execute(stmt).all())
+    stats = {status: counts.get(status, 0) for status in (HELD, CONVERTED, EXPIRED, RELEASED)}
+    stats["since"] = since
+    return stats
+
+
+def _sweep_once():
+    db = SessionLocal()
+    try:
+        sweep_expired(db)
+    finally:
+        db.close()
+
+
+async def run_periodically():
+    """Background loop started on app startup"""
+    while True:
+        try:
+            await run_in_threadpool(_sweep_once)
+        except Exception as e:
+            logger.error(f"Stock reservation sweep failed: {str(e)}")
+        await asyncio.sleep(RESERVATION_SWEEP_SECONDS)
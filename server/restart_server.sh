@@ -24,6 +24,10 @@ else
     exit 1
 fi
 
+# Apply pending schema migrations once, before any worker starts
+echo "Migrating database..."
+alembic upgrade head || { echo "ERROR: Database migration failed!"; exit 1; }
+
 # Start the server in the background
 nohup python run.py > server.log 2>&1 &
 
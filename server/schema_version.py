@@ -0,0 +1,73 @@
+"""
+Startup check of the database schema version.
+
+Workers no longer create tables; `alembic upgrade head` (migrations/) runs
+once per deploy, before the workers start. At startup each worker only reads
+the revision in alembic_version and compares it with the newest migration it
+ships:
+
+- at head: fine
+- behind head: the deploy skipped the upgrade. Startup fails with
+  SCHEMA_CHECK=enforce (the default) and only logs a warning with warn.
+- a revision this code doesn't know: the database was already migrated by a
+  newer release (a rolling deploy, or a rollback of the code). This only
+  logs a warning: migrations are written to stay compatible with the
+  previous release.
+
+SCHEMA_CHECK=off skips the check.
+"""
+
+import logging
+import os
+from typing import Tuple
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "enforce").strip().lower()  # enforce | warn | off
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+
+class SchemaVersionError(RuntimeError):
+    """Raised at startup when the database has not been migrated to this release's schema"""
+
+
+def script_directory() -> ScriptDirectory:
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI))
+
+
+def database_revisions(bound: Engine) -> Tuple[str, ...]:
+    with bound.connect() as conn:
+        return MigrationContext.configure(conn).get_current_heads()
+
+
+def check_schema_version(bound: Engine):
+    if SCHEMA_CHECK == "off":
+        return
+    script = script_directory()
+    heads = set(script.get_heads())
+    current = set(database_revisions(bound))
+    if current == heads:
+        logger.info(f"Database schema at revision {', '.join(sorted(current))}")
+        return
+
+    known = {revision.revision for revision in script.walk_revisions()}
+    if current and not current <= known:
+        logger.warning(
+            f"Database schema at revision {', '.join(sorted(current))}, newer than this release "
+            f"({', '.join(sorted(heads))}); continuing"
+        )
+        return
+
+    message = (
+        f"Database schema at revision {', '.join(sorted(current)) or 'none'}, "
+        f"this release needs {', '.join(sorted(heads))}: run `alembic upgrade head` in the server directory"
+    )
+    if SCHEMA_CHECK == "enforce":
+        raise SchemaVersionError(message)
+    logger.warning(message)
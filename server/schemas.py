@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Any
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Any
 from datetime import datetime
 
 # Landing Images
@@ -82,7 +82,7 @@ class OrderItem(BaseModel):
     type: str  # ready-made, custom, fabric
     name: str
     price: float
-    quantity: int
+    quantity: int = Field(..., gt=0)
     image: str
     details: Optional[dict] = None
 
@@ -98,6 +98,7 @@ class OrderCreate(BaseModel):
     subtotal: float
     delivery_charges: float = 200.0
     total: float
+    checkout_session_id: Optional[str] = None
 
 class OrderResponse(BaseModel):
     id: int
@@ -118,6 +119,118 @@ class OrderResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Cart quote
+class CartQuoteItem(BaseModel):
+    id: str  # cart line id, e.g. "fabric-3-2.5"
+    type: str  # ready-made, new-collection, waist-coat, fabric, custom
+    quantity: int = 1
+    product_id: Optional[int] = None  # parsed from id when omitted
+    meters: Optional[float] = None  # fabric length; read from details when omitted
+    details: Optional[dict] = None
+
+class CartQuoteRequest(BaseModel):
+    items: List[CartQuoteItem]
+    city: Optional[str] = None
+    state: Optional[str] = None
+    checkout_session_id: Optional[str] = None  # excludes this session's own stock holds
+
+class QuotedLine(BaseModel):
+    id: str
+    type: str
+    product_id: Optional[int] = None
+    name: Optional[str] = None
+    quantity: int
+    unit_price: float
+    stitching_cost: float
+    line_total: float
+    meters: Optional[float] = None
+    available: bool
+    message: Optional[str] = None
+
+class CartQuoteResponse(BaseModel):
+    lines: List[QuotedLine]
+    subtotal: float
+    stitching_cost: float
+    delivery_charges: float
+    total: float
+    all_available: bool
+
+class CartReservationResponse(CartQuoteResponse):
+    checkout_session_id: str
+    reserved: bool
+    expires_at: Optional[datetime] = None
+
+class ReservationStatsResponse(BaseModel):
+    held: int
+    converted: int
+    expired: int
+    released: int
+    since: Optional[datetime] = None
+
+# Delivery Rules
+class DeliveryRuleCreate(BaseModel):
+    city: Optional[str] = None
+    state: Optional[str] = None
+    base_charge: float = 200.0
+    free_shipping_threshold: Optional[float] = None
+    per_meter_charge: float = 0.0
+    is_active: bool = True
+
+class DeliveryRuleResponse(DeliveryRuleCreate):
+    id: int
+    
+    class Config:
+        from_attributes = True
+
+# Inventory
+class StockMovementResponse(BaseModel):
+    id: int
+    product_type: str
+    product_id: int
+    delta: float
+    balance: Optional[float] = None
+    reason: str
+    order_id: Optional[int] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class StockHistoryResponse(BaseModel):
+    product_type: str
+    product_id: int
+    stock: Optional[float] = None
+    ledger_balance: float
+    threshold: float
+    movements: List[StockMovementResponse]
+
+class LowStockThresholdUpdate(BaseModel):
+    threshold: float
+
+class StockAlertResponse(BaseModel):
+    id: int
+    product_type: str
+    product_id: int
+    stock: Optional[float] = None
+    threshold: Optional[float] = None
+    created_at: datetime
+    resolved_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# Catalog import
+class CatalogRowError(BaseModel):
+    line: int
+    errors: List[str]
+
+class CatalogImportResponse(BaseModel):
+    created: int
+    failed: int
+    dry_run: bool
+    created_by_type: Dict[str, int]
+    errors: List[CatalogRowError]
+
 # Admin
 class AdminLogin(BaseModel):
     username: str
@@ -134,6 +247,34 @@ class RevenueResponse(BaseModel):
     completed_orders: int
     total_orders: int
 
+# Sales
+class ProductSalesResponse(BaseModel):
+    product_type: str
+    product_id: Optional[int] = None
+    name: Optional[str] = None
+    units_sold: int
+    revenue: float
+    order_count: int
+
+class ProductStatsResponse(BaseModel):
+    product_type: str
+    product_id: int
+    views: int
+    add_to_cart: int
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class RankedProductResponse(BaseModel):
+    product_type: str
+    product_id: int
+    name: str
+    price: float
+    colors: Optional[List[str]] = None
+    image: Optional[str] = None
+    score: float
+
 # Size Charts
 class KameezSizeCreate(BaseModel):
     size: str  # XS, S, M, L, XL
@@ -197,10 +338,35 @@ class UserMeasurements(BaseModel):
     # Pajama measurements
     pajama_length: Optional[float] = None
     waist: Optional[float] = None
-    thigh: Optional[float] = None
+    hips: Optional[float] = None
+    thigh: Optional[float] = None  # not on the size charts, kept for custom stitching
+
+class GarmentRecommendation(BaseModel):
+    garment: str  # "kameez", "shalwar", "pajama"
+    recommended_size: str
+    confidence: str
+    score: float
+    measurements: dict
+    notes: List[str]
 
 class SizeRecommendation(BaseModel):
+    # Top-level fields describe the kameez (or the first garment measured)
     recommended_size: str
     confidence: str  # "perfect", "good", "consider_custom"
     measurements: dict
     notes: List[str]
+    garments: Dict[str, GarmentRecommendation] = {}
+
+class CustomerMeasurements(UserMeasurements):
+    reference: Optional[str] = None  # e.g. customer name on a wholesale order
+
+# Customers per batch recommendation call; larger orders are split by the client
+MAX_SIZE_BATCH = 500
+
+class BatchSizeRequest(BaseModel):
+    customers: List[CustomerMeasurements] = Field(..., max_length=MAX_SIZE_BATCH)
+
+class BatchSizeRecommendation(BaseModel):
+    reference: Optional[str] = None
+    recommendation: Optional[SizeRecommendation] = None
+    error: Optional[str] = None
@@ -3,12 +3,11 @@ Seed script to populate custom fabrics with colors
 Run this script to add/update fabric types with their available colors
 """
 
-from database import SessionLocal, engine, Base
+from database import SessionLocal
 from models import CustomFabric
 import os
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Tables come from the migrations: run `alembic upgrade head` first
 
 db = SessionLocal()
 
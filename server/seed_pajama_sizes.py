@@ -3,7 +3,7 @@ Seed script to populate pajama size chart data
 Run this script to add pajama sizes to the database
 """
 
-from database import SessionLocal, engine, Base
+from database import SessionLocal
 from models import PajamaSize, SizeType
 
 def seed_pajama_sizes():
@@ -47,10 +47,7 @@ def seed_pajama_sizes():
         db.close()
 
 if __name__ == "__main__":
-    # Create tables if they don't exist
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    
+    # Tables come from the migrations: run `alembic upgrade head` first
     # Seed data
     print("Seeding pajama size data...")
     seed_pajama_sizes()
@@ -3,7 +3,7 @@ Seed script to populate size chart data for Kameez and Shalwar
 Run this script once after creating the database tables
 """
 
-from database import SessionLocal, engine, Base
+from database import SessionLocal
 from models import KameezSize, ShalwarSize, SizeType
 
 def seed_sizes():
@@ -58,10 +58,7 @@ def seed_sizes():
         db.close()
 
 if __name__ == "__main__":
-    # Create tables if they don't exist
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    
+    # Tables come from the migrations: run `alembic upgrade head` first
     # Seed data
     print("Seeding size data...")
     seed_sizes()
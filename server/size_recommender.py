@@ -0,0 +1,181 @@
+"""
+Vectorized size recommendation across kameez, shalwar and pajama charts.
+
+All three size charts are flattened into one matrix (one row per size, one
+column per chart measurement) and cached in memory until an admin changes a
+size, which evicts it on every worker through cache_invalidation.
+Recommending for N customers is a single NumPy pass: weighted absolute
+differences against every size, summed per garment, then argmin per garment.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models import KameezSize, ShalwarSize, PajamaSize, SizeType
+from schemas import UserMeasurements
+from cache_invalidation import register, SIZE_CHART
+
+# garment -> (chart model, [(chart column, UserMeasurements field, weight)])
+# Girth measurements decide fit more than lengths, which are easy to alter.
+GARMENTS = {
+    "kameez": (KameezSize, [
+        ("collar", "collar", 1.0),
+        ("shoulder", "shoulder", 1.25),
+        ("chest", "chest", 1.5),
+        ("sleeves", "sleeves", 0.75),
+        ("length", "kameez_length", 0.75),
+    ]),
+    "shalwar": (ShalwarSize, [
+        ("length", "shalwar_length", 1.0),
+    ]),
+    "pajama": (PajamaSize, [
+        ("length", "pajama_length", 0.75),
+        ("waist", "waist", 1.5),
+        ("hips", "hips", 1.25),
+    ]),
+}
+
+SIZE_ORDER = [size for size in SizeType]
+
+
+class SizeChart:
+    """Size charts of every garment flattened into a single matrix"""
+
+    def __init__(self, matrix: np.ndarray):
+        self.sizes = SIZE_ORDER
+        # shape (sizes, measurements); NaN where a garment has no row for a size
+        self.matrix = matrix
+        self.columns = [(garment, column, field) for garment, (_, spec) in GARMENTS.items() for column, field, _ in spec]
+        self.weights = np.array([weight for _, spec in GARMENTS.values() for _, _, weight in spec])
+        self.garments = list(GARMENTS)
+        self.starts = np.cumsum([0] + [len(spec) for _, spec in GARMENTS.values()])[:-1]
+
+    @property
+    def empty(self) -> bool:
+        return bool(np.isnan(self.matrix).all())
+
+    def chart_row(self, garment: str, size_index: int) -> dict:
+        return {
+            column: float(self.matrix[size_index, i])
+            for i, (name, column, _) in enumerate(self.columns)
+            if name == garment
+        }
+
+
+_chart: Optional[SizeChart] = None
+_chart_lock = threading.Lock()
+
+
+def load_chart(db: Session) -> SizeChart:
+    """Return the cached size chart, reading all three tables on a cache miss"""
+    global _chart
+    chart = _chart
+    if chart is not None:
+        return chart
+
+    with _chart_lock:
+        if _chart is not None:
+            return _chart
+
+        columns = [column for _, spec in GARMENTS.values() for column in spec]
+        matrix = np.full((len(SIZE_ORDER), len(columns)), np.nan)
+        offset = 0
+        for model, spec in GARMENTS.values():
+            for row in db.query(model).all():
+                size_index = SIZE_ORDER.index(row.size)
+                for i, (column, _, _) in enumerate(spec):
+                    value = getattr(row, column)
+                    if value is not None:
+                        matrix[size_index, offset + i] = value
+            offset += len(spec)
+
+        _chart = SizeChart(matrix)
+        return _chart
+
+
+def invalidate_chart():
+    """Drop the cached chart; the next recommendation reloads it"""
+    global _chart
+    with _chart_lock:
+        _chart = None
+
+
+register(SIZE_CHART, lambda key: invalidate_chart())
+
+
+def _measurement_matrix(chart: SizeChart, customers: List[UserMeasurements]) -> np.ndarray:
+    # Missing or non-positive measurements are treated as not provided
+    values = [
+        [getattr(customer, field) or np.nan for _, _, field in chart.columns]
+        for customer in customers
+    ]
+    matrix = np.array(values, dtype=float).reshape(len(customers), len(chart.columns))
+    matrix[matrix <= 0] = np.nan
+    return matrix
+
+
+def _confidence(score: float):
+    if score < 0.5:
+        return "perfect", ["This size is an excellent match for your measurements!"]
+    if score < 1.5:
+        return "good", ["This size should fit you well.", "Minor adjustments may be needed."]
+    return "consider_custom", [
+        "Your measurements fall between standard sizes.",
+        "Consider our custom stitching service for the perfect fit."
+    ]
+
+
+def recommend(chart: SizeChart, customers: List[UserMeasurements]) -> List[Dict[str, dict]]:
+    """
+    Recommend a size per garment for every customer in one vectorized pass.
+
+    Returns one dict per customer mapping garment name to its recommendation;
+    garments the customer gave no measurements for are left out.
+    """
+    if not customers:
+        return []
+
+    user = _measurement_matrix(chart, customers)                       # (n, m)
+    provided = ~np.isnan(user)
+
+    # Weighted |customer - chart| for every customer, size and measurement
+    diff = np.abs(user[:, None, :] - chart.matrix[None, :, :]) * chart.weights
+    diff[np.isnan(diff)] = 0.0                                        # (n, s, m)
+
+    # Per-garment sums: reduceat over the measurement axis
+    diff_sum = np.add.reduceat(diff, chart.starts, axis=2)            # (n, s, g)
+    weight_sum = np.add.reduceat(provided * chart.weights, chart.starts, axis=1)  # (n, g)
+
+    # A size only counts for a garment if the chart has every measurement the customer gave
+    missing = np.isnan(chart.matrix)[None, :, :] & provided[:, None, :]
+    unusable = np.add.reduceat(missing, chart.starts, axis=2) > 0     # (n, s, g)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = diff_sum / weight_sum[:, None, :]
+    scores[unusable] = np.inf
+    scores[np.broadcast_to((weight_sum == 0)[:, None, :], scores.shape)] = np.inf
+
+    best = np.argmin(scores, axis=1)                                  # (n, g)
+    best_scores = np.take_along_axis(scores, best[:, None, :], axis=1)[:, 0, :]
+
+    results = []
+    for n in range(len(customers)):
+        garments = {}
+        for g, garment in enumerate(chart.garments):
+            score = best_scores[n, g]
+            if not np.isfinite(score):
+                continue
+            confidence, notes = _confidence(float(score))
+            garments[garment] = {
+                "garment": garment,
+                "recommended_size": chart.sizes[best[n, g]].value,
+                "confidence": confidence,
+                "score": round(float(score), 3),
+                "measurements": chart.chart_row(garment, best[n, g]),
+                "notes": notes,
+            }
+        results.append(garments)
+    return results
@@ -0,0 +1,382 @@
+"""
+Lightweight tracing with OpenTelemetry-compatible spans.
+
+TracingMiddleware opens a server span per request, continuing the trace of
+an incoming W3C `traceparent` header. SQL statements, session commits,
+upload/delete of local files and SMTP sends become child spans:
+
+    with span("smtp.send", {"server.address": host}, CLIENT):
+        ...
+
+    @traced("file.upload")
+    async def upload_file_local(...):
+
+Finished spans are written by a background thread as OTLP/JSON
+ExportTraceServiceRequest lines, one batch per line: to stdout with
+TRACE_EXPORTER=console, or appended to TRACE_FILE with TRACE_EXPORTER=file
+(the format the OpenTelemetry collector's otlpjsonfile receiver reads).
+Tracing is off by default (TRACE_EXPORTER=none) and then costs one check
+per hook.
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database import ENGINES
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").strip().lower()  # none | console | file
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join("logs", "traces.jsonl"))
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "darven-api")
+ENABLED = TRACE_EXPORTER in ("console", "file")
+
+# OTLP span kinds
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def _attribute_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "sampled",
+                 "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], sampled: bool, kind: int, attributes: Optional[dict]):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, object] = dict(attributes or {})
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = str(error)[:500]
+        self.attributes["exception.type"] = type(error).__name__
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            _exporter.submit(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> dict:
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _attribute_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message} if self.status else {},
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        return data
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(name: str, attributes: Optional[dict] = None, kind: int = INTERNAL, parent: Optional[Span] = None) -> Optional[Span]:
+    """Start a span under `parent` (default: the current span) without making it current; None when tracing is off"""
+    if not ENABLED:
+        return None
+    parent = parent or _current.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, parent.sampled, kind, attributes)
+    return Span(name, os.urandom(16).hex(), None, random.random() < TRACE_SAMPLE_RATE, kind, attributes)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[dict] = None, kind: int = INTERNAL) -> Iterator[Optional[Span]]:
+    """Run a block inside a child span of the current one; yields None when tracing is off"""
+    current = start_span(name, attributes, kind)
+    if current is None:
+        yield None
+        return
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+def traced(name: str, kind: int = INTERNAL):
+    """Decorator running each call of a function, sync or async, inside a span"""
+    def decorate(function):
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                with span(name, kind=kind):
+                    return await function(*args, **kwargs)
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with span(name, kind=kind):
+                    return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def annotate(attributes: dict):
+    """Add attributes to the current span, if any"""
+    current = _current.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+def _parse_traceparent(header: str) -> Optional[Span]:
+    match = _TRACEPARENT.match(header.strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None
+    remote = Span("remote", match.group(1), None, bool(int(match.group(3), 16) & 1), SERVER, None)
+    remote.span_id = match.group(2)
+    return remote
+
+
+# ── Export ────────────────────────────────────────────────────────────────────
+
+class _Exporter:
+    """Batches finished spans and writes them from a daemon thread"""
+
+    def __init__(self):
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, finished: Span):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(finished)
+
+    def _run(self):
+        while True:
+            batch: List[Span] = [self._queue.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get(timeout=0.5))
+                except queue.Empty:
+                    break
+            stop = None in batch
+            spans = [item for item in batch if item is not None]
+            if spans:
+                try:
+                    self._write(spans)
+                except Exception as e:
+                    logger.error(f"Failed to export {len(spans)} spans: {str(e)}")
+            if stop:
+                return
+
+    def _write(self, spans: List[Span]):
+        line = json.dumps({
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}},
+                    {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+                ]},
+                "scopeSpans": [{"scope": {"name": "darven"}, "spans": [item.to_otlp() for item in spans]}],
+            }]
+        }, separators=(",", ":"))
+        if TRACE_EXPORTER == "file":
+            directory = os.path.dirname(TRACE_FILE)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        else:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    def shutdown(self, timeout: float = 5.0):
+        """Write out every queued span; called on app shutdown and at exit"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+
+_exporter = _Exporter()
+shutdown = _exporter.shutdown
+atexit.register(shutdown)
+
+
+# ── SQL statements and commits ────────────────────────────────────────────────
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Only inside a trace; startup DDL and background jobs would each be a trace of one span
+    if not ENABLED or _current.get() is None:
+        return
+    statement_span = start_span(statement.lstrip().split(" ", 1)[0].upper() or "SQL", {
+        "db.system": conn.dialect.name,
+        "db.statement": " ".join(statement.split())[:1000],
+    }, CLIENT)
+    if executemany:
+        statement_span.set_attribute("db.executemany", True)
+    conn.info.setdefault("trace_spans", []).append(statement_span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        finished = spans.pop()
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            finished.set_attribute("db.rows", cursor.rowcount)
+        finished.end()
+
+
+def _handle_error(context):
+    spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+    if spans:
+        failed = spans.pop()
+        failed.record_exception(context.original_exception)
+        failed.end()
+
+
+for _bound in ENGINES.values():
+    event.listen(_bound, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_bound, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_bound, "handle_error", _handle_error)
+
+
+@event.listens_for(Session, "before_commit")
+def _start_commit_span(session):
+    if _current.get() is None:
+        return
+    commit_span = start_span("db.commit")
+    if commit_span is not None:
+        # Statements flushed by the commit nest under it
+        session.info["trace_commit"] = (commit_span, _current.get())
+        _current.set(commit_span)
+
+
+def _end_commit_span(session, error: bool):
+    entry = session.info.pop("trace_commit", None)
+    if entry is not None:
+        commit_span, previous = entry
+        if error:
+            commit_span.status = STATUS_ERROR
+        _current.set(previous)
+        commit_span.end()
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    _end_commit_span(session, error=False)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _after_transaction_end(session, transaction):
+    # Still open here only when the commit failed (e.g. its flush raised)
+    if transaction.parent is None:
+        _end_commit_span(session, error=True)
+
+
+# ── Requests ──────────────────────────────────────────────────────────────────
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening the server span of each request"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                parent = _parse_traceparent(value.decode("latin-1"))
+                break
+
+        method = scope["method"]
+        server_span = start_span(method, {
+            "http.request.method": method,
+            "url.path": scope["path"],
+        }, SERVER, parent)
+        token = _current.set(server_span)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                server_span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    server_span.status = STATUS_ERROR
+                headers = list(message.get("headers", []))
+                headers.append((b"traceparent", server_span.traceparent.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            server_span.record_exception(e)
+            raise
+        finally:
+            _current.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                server_span.name = f"{method} {route}"
+                server_span.set_attribute("http.route", route)
+            server_span.end()